@@ -0,0 +1,511 @@
+"""
+📏 BENCHMARK DO ANALISADOR DE CÓDIGO PRO
+Gera projetos Python sintéticos e determinísticos, mede cada etapa e o
+pipeline completo (frio, quente e só segurança) e compara execuções para achar regressões.
+
+Uso:
+    python benchmarks/benchmark_analise.py executar --escalas 100,1000 --saida atual.json
+    python benchmarks/benchmark_analise.py comparar base.json atual.json
+    python benchmarks/benchmark_analise.py gerar --escalas 10000
+
+Roda offline: só precisa do radon. Sem flake8/bandit as etapas deles (e o
+pipeline:seguranca) saem marcadas como indisponíveis.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tokenize
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de memória
+    resource = None
+
+RAIZ_REPOSITORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIO_ANALISADOR = os.path.join(RAIZ_REPOSITORIO, "src")
+
+# ===== CONFIGURAÇÃO =====
+VERSAO_CORPUS = 1  # mude ao alterar o gerador: invalida corpora antigos
+SEMENTE = 1234
+ESCALAS_PADRAO = [100, 1000]  # também: 10000, 50000
+ARQUIVOS_POR_PACOTE = 50
+CORPUS_DIR = os.path.join(tempfile.gettempdir(), "analise_benchmark")
+TOLERANCIA_REGRESSAO = 0.10  # 10% mais lento (ou mais memória) = regressão
+RUIDO_MINIMO_S = 0.05  # diferenças de tempo menores que isso são ruído
+TIMEOUT_CENARIO = 3600
+
+ETAPAS = [
+    "leitura", "tokens", "parse", "imports", "complexidade", "docstrings",
+    "metricas", "impressoes", "duplicacao", "simbolos", "codigo_morto", "grafo_imports",
+    "pep8", "seguranca"
+]
+CENARIOS = ([f"etapa:{etapa}" for etapa in ETAPAS]
+            + ["pipeline:frio", "pipeline:quente", "pipeline:seguranca", "cli:inicio"])
+
+MODULOS_STDLIB = ["os", "sys", "json", "re", "time", "math", "random",
+                  "collections", "itertools", "functools", "subprocess", "pathlib"]
+
+
+# ===== GERADOR DE CORPUS =====
+
+def _gerar_funcao(rng, nome, com_docstring, complexidade):
+    """Função com ramos aninhados suficientes para a complexidade pedida."""
+    linhas = [f"def {nome}(valor, limite=10):"]
+    if com_docstring:
+        linhas.append(f'    """Processa o valor recebido e devolve o resultado de {nome}."""')
+    linhas.append("    total = 0")
+    for i in range(complexidade):
+        recuo = "    " * (1 + min(i, 3))
+        operador = rng.choice(["<", ">", "==", "!="])
+        linhas.append(f"{recuo}if valor {operador} {rng.randint(0, 100)}:")
+        linhas.append(f"{recuo}    total += {rng.randint(1, 9)}")
+    linhas.append("    for item in range(limite):")
+    linhas.append("        total += item * valor")
+    linhas.append("    return total")
+    return linhas
+
+
+def _gerar_classe(rng, nome, com_docstring):
+    linhas = [f"class {nome}:"]
+    if com_docstring:
+        linhas.append(f'    """Agrupa o estado e as operações de {nome}."""')
+    linhas.append("")
+    linhas.append("    def __init__(self, valor):")
+    linhas.append("        self.valor = valor")
+    for i in range(rng.randint(1, 4)):
+        linhas.append("")
+        linhas.append(f"    def metodo_{i}(self, fator):")
+        linhas.append(f"        return self.valor * fator + {rng.randint(0, 50)}")
+    return linhas
+
+
+# Trecho repetido em vários arquivos para exercitar a detecção de duplicação
+BLOCO_DUPLICADO = [
+    "def normalizar_registros(registros):",
+    "    resultado = []",
+    "    for registro in registros:",
+    "        chave = str(registro.get('id', '')).strip().lower()",
+    "        valor = registro.get('valor', 0) or 0",
+    "        if chave and valor >= 0:",
+    "            resultado.append({'id': chave, 'valor': round(valor, 2)})",
+    "        elif chave:",
+    "            resultado.append({'id': chave, 'valor': 0})",
+    "    resultado.sort(key=lambda item: (item['valor'], item['id']))",
+    "    return resultado",
+]
+
+
+def gerar_arquivo(rng, indice):
+    """Conteúdo de um módulo sintético; o perfil varia com o sorteio."""
+    perfil = rng.random()
+    if perfil < 0.6:
+        n_funcoes, n_classes = rng.randint(1, 5), rng.randint(0, 1)
+    elif perfil < 0.95:
+        n_funcoes, n_classes = rng.randint(6, 20), rng.randint(1, 3)
+    else:
+        n_funcoes, n_classes = rng.randint(40, 120), rng.randint(3, 8)
+
+    linhas = []
+    if rng.random() < 0.7:
+        linhas.append(f'"""Módulo sintético {indice} gerado para o benchmark do analisador."""')
+    else:
+        linhas.append("# módulo sem docstring")
+
+    usados = rng.sample(MODULOS_STDLIB, rng.randint(1, 4))
+    nao_usados = rng.sample([m for m in MODULOS_STDLIB if m not in usados],
+                            rng.randint(0, 2))
+    for modulo in sorted(usados + nao_usados):
+        linhas.append(f"import {modulo}")
+    if rng.random() < 0.3:
+        linhas.append("from collections import OrderedDict, defaultdict")
+    linhas.append("")
+
+    for i in range(n_classes):
+        linhas.append("")
+        linhas.extend(_gerar_classe(rng, f"Classe{indice}_{i}", rng.random() < 0.6))
+        linhas.append("")
+
+    for i in range(n_funcoes):
+        linhas.append("")
+        complexidade = rng.choice([1, 2, 3, 5, 8, 12, 15]) if rng.random() < 0.9 else 25
+        linhas.extend(_gerar_funcao(rng, f"funcao_{indice}_{i}", rng.random() < 0.5, complexidade))
+        linhas.append("")
+
+    if rng.random() < 0.1:
+        linhas.append("")
+        linhas.extend(BLOCO_DUPLICADO)
+    if rng.random() < 0.05:
+        linhas.append("")
+        linhas.append("def executar(comando):")
+        linhas.append("    return subprocess.call(comando, shell=True)")
+    if rng.random() < 0.05:
+        linhas.append("x=1;y =2  # estilo ruim de propósito")
+
+    linhas.append("")
+    linhas.append(f"VALORES = [{', '.join(m + '.__name__' for m in usados)}]")
+    if rng.random() < 0.005:
+        linhas.append("def quebrado(:")  # erro de sintaxe
+    return "\n".join(linhas) + "\n"
+
+
+def gerar_corpus(n_arquivos, destino=None, semente=SEMENTE):
+    """Gera (ou reaproveita) um projeto sintético com ``n_arquivos`` módulos."""
+    destino = destino or os.path.join(CORPUS_DIR, f"v{VERSAO_CORPUS}_s{semente}_{n_arquivos}")
+    marcador = os.path.join(destino, ".corpus_completo")
+    if os.path.exists(marcador):
+        return destino
+
+    if os.path.exists(destino):
+        shutil.rmtree(destino)
+    rng = random.Random(f"{semente}:{n_arquivos}")
+    for indice in range(n_arquivos):
+        pacote = os.path.join(destino, f"pacote_{indice // ARQUIVOS_POR_PACOTE:04d}")
+        if indice % ARQUIVOS_POR_PACOTE == 0:
+            os.makedirs(pacote)
+            with open(os.path.join(pacote, "__init__.py"), 'w', encoding='utf-8') as f:
+                f.write('"""Pacote sintético do benchmark."""\n')
+        with open(os.path.join(pacote, f"modulo_{indice:05d}.py"), 'w', encoding='utf-8') as f:
+            f.write(gerar_arquivo(rng, indice))
+
+    with open(marcador, 'w', encoding='utf-8') as f:
+        f.write(str(n_arquivos))
+    return destino
+
+
+# ===== MEDIÇÃO (processo filho, um cenário por processo) =====
+
+def _tempo_cpu():
+    """CPU do processo e dos filhos já encerrados (flake8, bandit, workers)."""
+    if resource is None:
+        return time.process_time()
+    proprio = resource.getrusage(resource.RUSAGE_SELF)
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return proprio.ru_utime + proprio.ru_stime + filhos.ru_utime + filhos.ru_stime
+
+
+def _pico_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss: KB no Linux, bytes no macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    pico = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(pico / divisor, 1)
+
+
+class Cronometro:
+    """Acumula tempo de parede e de CPU só dos trechos dentro do ``with``."""
+
+    def __init__(self):
+        self.parede = 0.0
+        self.cpu = 0.0
+
+    def __enter__(self):
+        self._parede = time.perf_counter()
+        self._cpu = _tempo_cpu()
+        return self
+
+    def __exit__(self, *exc):
+        self.parede += time.perf_counter() - self._parede
+        self.cpu += _tempo_cpu() - self._cpu
+        return False
+
+
+def _ferramenta_ausente(A, etapas):
+    """Primeira ferramenta externa das ``etapas`` fora do PATH (None se todas existem)."""
+    for etapa in etapas:
+        if etapa == "pep8" and A.pep8_interno_ativo():
+            continue
+        ferramenta = A.FERRAMENTAS_ETAPA.get(etapa)
+        if ferramenta and shutil.which(ferramenta) is None:
+            return ferramenta
+    return None
+
+
+def _medir_etapa(A, etapa, arquivos, cronometro):
+    """Mede só a etapa; a preparação (leitura/parse) fica fora do cronômetro."""
+    A.ENABLE_CACHE = False
+
+    # Com o motor interno o PEP8 é medido arquivo a arquivo, como as demais etapas
+    if etapa == "seguranca" or (etapa == "pep8" and not A.pep8_interno_ativo()):
+        funcao = A.analisar_pep8_lote if etapa == "pep8" else A.analisar_seguranca_lote
+        for i in range(0, len(arquivos), A.LOTE_SUBPROCESSOS):
+            with cronometro:
+                funcao(arquivos[i:i + A.LOTE_SUBPROCESSOS])
+        return
+
+    if etapa == "duplicacao":
+        impressoes = {}
+        for arquivo in arquivos:
+            try:
+                impressoes[arquivo] = A.impressoes_duplicacao(A.ArquivoFonte(arquivo))
+            except (SyntaxError, ValueError):
+                continue
+        with cronometro:
+            A.detectar_duplicacoes(impressoes)
+        return
+
+    if etapa in ("codigo_morto", "grafo_imports"):
+        simbolos = {arquivo: A.indice_simbolos(A.ArquivoFonte(arquivo)) for arquivo in arquivos}
+        with cronometro:
+            if etapa == "codigo_morto":
+                A.detectar_codigo_morto(simbolos)
+            else:
+                A.secao_grafo_imports(A.grafo_imports(simbolos))
+        return
+
+    etapas = {
+        "leitura": lambda fonte: fonte.texto,
+        "tokens": lambda fonte: fonte.tokens,
+        "parse": lambda fonte: fonte.arvore,
+        "imports": A.analisar_imports_nao_usados,
+        "complexidade": A.analisar_complexidade,
+        "docstrings": A.analisar_docstrings,
+        "metricas": A.analisar_metricas_maintainability,
+        "impressoes": A.impressoes_duplicacao,
+        "simbolos": A.indice_simbolos,
+        "pep8": A.analisar_pep8,
+    }
+    for arquivo in arquivos:
+        with open(arquivo, 'rb') as f:
+            fonte = A.ArquivoFonte(arquivo, f.read())
+        try:
+            # Prepara o que as etapas anteriores do pipeline já teriam feito
+            if etapa not in ("leitura", "tokens", "parse"):
+                fonte.coleta
+                if etapa != "complexidade":
+                    fonte.blocos_complexidade
+                if etapa in ("pep8", "metricas"):
+                    fonte.tokens
+            elif etapa != "leitura":
+                fonte.texto
+            with cronometro:
+                etapas[etapa](fonte)
+        except (SyntaxError, ValueError, tokenize.TokenError):
+            continue
+
+
+def medir_cenario(cenario, corpus):
+    """Executa um cenário no processo atual e devolve as medidas."""
+    sys.path.insert(0, DIRETORIO_ANALISADOR)
+    os.chdir(corpus)
+    cronometro = Cronometro()
+    tipo, nome = cenario.split(":")
+    if tipo == "cli":
+        # Importação do analisador + uma consulta ao cache, sem análise
+        with cronometro:
+            import Analise_codigo_pro as A
+            A.main(["--cache-info"])
+        arquivos = A.arquivos_python(".")
+    else:
+        import Analise_codigo_pro as A
+        arquivos = A.arquivos_python(".")
+
+    # Sem a ferramenta a etapa não roda: o tempo não mede nada
+    ausente = None
+    if tipo == "etapa":
+        ausente = _ferramenta_ausente(A, [nome])
+    elif nome == "seguranca":
+        ausente = _ferramenta_ausente(A, ["seguranca"])
+    if ausente:
+        return {"cenario": cenario, "arquivos": len(arquivos),
+                "indisponivel": f"{ausente} não instalado"}
+
+    acertos_cache = None
+    if tipo == "etapa":
+        _medir_etapa(A, nome, arquivos, cronometro)
+    elif tipo == "pipeline":
+        if nome == "frio":
+            shutil.rmtree(A.CACHE_DIR, ignore_errors=True)
+        elif nome == "seguranca":
+            # Só o bandit e sem cache: o custo de um gate de segurança
+            A.aplicar_configuracao({"ANALISADORES_SOMENTE": ["seguranca"], "ENABLE_CACHE": False})
+        with cronometro:
+            A.main_pro(".")
+        # Confirma o que o cenário mede: o quente deve sair todo do cache
+        cache = A.obter_medidor().secao()["cache"].get("resultado")
+        if cache and cache["acertos"] + cache["faltas"]:
+            acertos_cache = round(100 * cache["acertos"] / (cache["acertos"] + cache["faltas"]), 1)
+
+    parede = cronometro.parede
+    medida = {
+        "cenario": cenario,
+        "arquivos": len(arquivos),
+        "parede_s": round(parede, 4),
+        "cpu_s": round(cronometro.cpu, 4),
+        "rss_pico_mb": _pico_rss_mb(),
+        "arquivos_por_s": round(len(arquivos) / parede, 1) if parede else None
+    }
+    if acertos_cache is not None:
+        medida["acertos_cache_percentual"] = acertos_cache
+    return medida
+
+
+# ===== ORQUESTRAÇÃO =====
+
+def executar_benchmark(escalas, cenarios, saida):
+    """Roda cada cenário em um processo novo (pico de RSS isolado) e grava o JSON."""
+    resultados = []
+    for escala in escalas:
+        print(f"🏗️  Corpus com {escala} arquivos...")
+        corpus = gerar_corpus(escala)
+        for cenario in cenarios:
+            if cenario == "pipeline:quente" and "pipeline:frio" not in cenarios:
+                # Quente pressupõe um cache completo
+                _executar_filho("pipeline:frio", corpus)
+            medida = _executar_filho(cenario, corpus)
+            if medida is None:
+                continue
+            medida["escala"] = escala
+            resultados.append(medida)
+            if "indisponivel" in medida:
+                print(f"   ⏭️  {cenario:<20} indisponível: {medida['indisponivel']}")
+                continue
+            print(f"   ⏱️  {cenario:<20} {medida['parede_s']:>9.3f}s "
+                  f"cpu {medida['cpu_s']:>9.3f}s "
+                  f"rss {medida['rss_pico_mb']}MB "
+                  f"{medida['arquivos_por_s']} arq/s")
+            acertos = medida.get("acertos_cache_percentual")
+            if cenario == "pipeline:quente" and acertos is not None and acertos < 100:
+                print(f"   ⚠️  pipeline:quente com só {acertos}% de acertos no cache: "
+                      f"o tempo inclui análise fria")
+
+    relatorio = {
+        "versao_corpus": VERSAO_CORPUS,
+        "semente": SEMENTE,
+        "data": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": _commit_atual(),
+        "resultados": resultados
+    }
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"📋 Resultados: {saida}")
+    return relatorio
+
+
+def _executar_filho(cenario, corpus):
+    cmd = [sys.executable, os.path.abspath(__file__), "_medir", cenario, corpus]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=TIMEOUT_CENARIO)
+    except subprocess.TimeoutExpired:
+        print(f"   ⏰ Timeout em {cenario}")
+        return None
+    linhas = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not linhas:
+        print(f"   ❌ {cenario} falhou: {result.stderr.strip()[-200:]}")
+        return None
+    return json.loads(linhas[-1])
+
+
+def _commit_atual():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ_REPOSITORIO,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def comparar_resultados(base, atual, tolerancia=TOLERANCIA_REGRESSAO):
+    """Lista as regressões de ``atual`` em relação a ``base``.
+
+    Compara cenário a cenário (mesma escala) o tempo de parede, o tempo de
+    CPU e o pico de RSS; acima de ``tolerancia`` é regressão. Em tempos,
+    diferenças abaixo de RUIDO_MINIMO_S nunca contam.
+    """
+    indice_base = {(r["cenario"], r["escala"]): r for r in base["resultados"]}
+    regressoes = []
+    print(f"{'cenário':<20} {'escala':>7} {'base':>10} {'atual':>10} {'Δ':>8}")
+    for medida in atual["resultados"]:
+        chave = (medida["cenario"], medida["escala"])
+        anterior = indice_base.get(chave)
+        if anterior is None:
+            continue
+        for metrica in ("parede_s", "cpu_s", "rss_pico_mb"):
+            antes, depois = anterior.get(metrica), medida.get(metrica)
+            if not antes or depois is None:
+                continue
+            variacao = (depois - antes) / antes
+            if metrica != "rss_pico_mb" and abs(depois - antes) < RUIDO_MINIMO_S:
+                variacao = 0.0
+            marca = "🔴" if variacao > tolerancia else ("🟢" if variacao < -tolerancia else "  ")
+            if metrica == "parede_s":
+                print(f"{chave[0]:<20} {chave[1]:>7} {antes:>10.3f} {depois:>10.3f} "
+                      f"{variacao:>+7.1%} {marca}")
+            if variacao > tolerancia:
+                regressoes.append({"cenario": chave[0], "escala": chave[1], "metrica": metrica,
+                                   "base": antes, "atual": depois,
+                                   "variacao": round(variacao, 4)})
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do Analisador de Código Pro")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    executar = sub.add_parser("executar", help="mede os cenários e grava um JSON")
+    executar.add_argument("--escalas", default=",".join(map(str, ESCALAS_PADRAO)))
+    executar.add_argument("--cenarios", default=",".join(CENARIOS))
+    executar.add_argument("--saida", default="benchmark_resultados.json")
+
+    gerar = sub.add_parser("gerar", help="só gera os corpora sintéticos")
+    gerar.add_argument("--escalas", default=",".join(map(str, ESCALAS_PADRAO)))
+
+    comparar = sub.add_parser("comparar", help="compara dois JSONs de resultados")
+    comparar.add_argument("base")
+    comparar.add_argument("atual")
+    comparar.add_argument("--tolerancia", type=float, default=TOLERANCIA_REGRESSAO)
+
+    medir = sub.add_parser("_medir")  # uso interno: um cenário por processo
+    medir.add_argument("cenario")
+    medir.add_argument("corpus")
+
+    args = parser.parse_args()
+
+    if args.comando == "_medir":
+        medida = medir_cenario(args.cenario, args.corpus)
+        sys.stdout.flush()
+        print(json.dumps(medida))
+        return 0
+
+    if args.comando == "gerar":
+        for escala in map(int, args.escalas.split(",")):
+            print(f"🏗️  {gerar_corpus(escala)}")
+        return 0
+
+    if args.comando == "executar":
+        cenarios = args.cenarios.split(",")
+        desconhecidos = set(cenarios) - set(CENARIOS)
+        if desconhecidos:
+            parser.error(f"cenários desconhecidos: {', '.join(sorted(desconhecidos))}")
+        executar_benchmark([int(e) for e in args.escalas.split(",")], cenarios, args.saida)
+        return 0
+
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.atual, encoding='utf-8') as f:
+        atual = json.load(f)
+    regressoes = comparar_resultados(base, atual, args.tolerancia)
+    if regressoes:
+        print(f"\n🔴 {len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}:")
+        for r in regressoes:
+            print(f"   • {r['cenario']} ({r['escala']} arquivos) {r['metrica']}: "
+                  f"{r['base']} → {r['atual']} ({r['variacao']:+.1%})")
+        return 1
+    print("\n✅ Nenhuma regressão")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,46 @@
 # Analisador de Código
 # Bibliotecas necessarias para rodar o codigo
-# Dependencias: pip install flake8 radon vulture bandit autopep8 black isort tqdm
-# npm install -g jscpd
+# Dependencias: pip install flake8 radon bandit autopep8 black isort tqdm
 
+import argparse
 import ast
+import atexit
+import contextvars
 import hashlib
+import heapq
+import importlib.util
+import io
 import json
-import multiprocessing
+import math
+import mmap
 import os
+import queue
+import random
+import re
+import signal
+import sqlite3
+import stat
 import subprocess
+import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-try:
-    from tqdm import tqdm
-    PROGRESS_AVAILABLE = True
-except ImportError:
-    PROGRESS_AVAILABLE = False
-    print("💡 Para barra de progresso: pip install tqdm")
-
-from radon.complexity import cc_visit
+import tokenize
+import zlib
+from collections import OrderedDict, deque
+from contextlib import ExitStack, contextmanager
+from functools import cached_property, lru_cache
+
+# Bibliotecas pesadas (asyncio, radon, pycodestyle/pyflakes, tqdm, http.server,
+# concurrent.futures, cProfile) são importadas só pela etapa que precisa delas:
+# --help, --version, consultas ao cache e execuções só com acertos de cache
+# não pagam por elas (ver importacao_medida e --perfil-inicio)
+PEP8_INTERNO_DISPONIVEL = all(
+    importlib.util.find_spec(modulo) is not None
+    for modulo in ("pycodestyle", "pyflakes", "flake8"))
+# Versões (major.minor) em que o PEP8 interno foi conferido contra o flake8:
+# ele usa internos do pycodestyle (o registro _checks, o Checker) e o
+# FlakesChecker do flake8. Com outra versão o estilo volta ao flake8 em lote
+PEP8_INTERNO_VERSOES = {"pycodestyle": ("2.15",), "pyflakes": ("4.0",), "flake8": ("7.4",)}
 
 # ===== CONFIGURAÇÃO PARA PROJETOS GRANDES =====
 PESOS = {
@@ -33,14 +54,104 @@ PESOS = {
 
 # Performance otimizada para projetos grandes (até 10K+ arquivos)
 MAX_FILE_SIZE_MB = 100
-MAX_WORKERS = min(16, multiprocessing.cpu_count())
+MAX_WORKERS = min(16, os.cpu_count() or 1)  # subprocessos (flake8/bandit)
+LIMITE_POR_FERRAMENTA = {  # execuções simultâneas de cada ferramenta externa
+    "flake8": max(1, MAX_WORKERS // 2),
+    "bandit": max(1, MAX_WORKERS // 2)
+}
+MAX_PROCESSOS = os.cpu_count() or 1  # etapas em processo (AST/radon)
+CUSTO_BLOCO_S = 0.05  # custo estimado de cada bloco enviado ao pool de CPU
+CUSTO_POR_BYTE_PADRAO = 4e-6  # segundos/byte quando ainda não há histórico
+MODO_EXECUCAO = "processos"  # "processos" ou "threads"
 ENABLE_CACHE = True
+DESCOBERTA_GIT = True  # usa "git ls-files" quando o projeto é um repositório
+DESCOBERTA_WORKERS = 8  # threads percorrendo subpastas fora de repositórios
 
 # ===== CONFIGURAÇÃO AVANÇADA =====
 PROJETO_DIR = "."
 RELATORIO_SAIDA = "relatorio_analise_projeto_pro.json"
+FORMATO_SAIDA = "json"  # "json" (relatório único) ou "jsonl" (streaming por arquivo)
+RELATORIO_JSONL = "relatorio_analise_projeto_pro.jsonl"
+RANKING_TOPO = 20  # arquivos no ranking do resumo JSONL
+PROGRESSO_ATRASO_S = 0.2  # a barra de progresso só aparece em análises mais longas
 CACHE_DIR = ".analise_cache"
+CACHE_DB = "cache.sqlite3"
+CACHE_LOTE_ESCRITA = 200
+CACHE_HASHES_MEMORIA = 4096  # hashes de conteúdo lembrados entre obter e salvar (LRU)
 AUTO_CORRECAO = True
+CORRIGIR = False  # aplica autopep8/isort no próprio processo e reanalisa os corrigidos
+
+# ===== PARÂMETROS DAS ANÁLISES (entram no fingerprint do cache) =====
+VERSAO = "Pro 2.0"
+PEP8_MOTOR = "interno"  # "interno" (pycodestyle + pyflakes no processo) ou "flake8"
+PEP8_MAX_LINHA = 100
+PEP8_IGNORAR = ("E501", "W503")
+FLAKE8_ARGS = [f"--max-line-length={PEP8_MAX_LINHA}", f"--ignore={','.join(PEP8_IGNORAR)}"]
+LOTE_SUBPROCESSOS = 200  # caminhos por execução do flake8/bandit
+FLAKE8_TIMEOUT = 10
+FLAKE8_TIMEOUT_POR_ARQUIVO = 1
+FLAKE8_TIMEOUT_POR_MB = 10
+BANDIT_TIMEOUT = 20
+BANDIT_TIMEOUT_POR_ARQUIVO = 2
+BANDIT_TIMEOUT_POR_MB = 20
+LIMITE_COMPLEXIDADE = 10
+DUPLICACAO_MIN_TOKENS = 50  # menor trecho duplicado reportado
+DUPLICACAO_JANELA = 16  # janela do winnowing (menor = mais impressões)
+
+# ===== SELEÇÃO DE ANÁLISES =====
+# Nomes do registro ANALISADORES (--listar-analisadores). Uma entrada de
+# cache completa serve a qualquer subconjunto; um resultado parcial nunca
+# é aproveitado por uma execução que peça mais análises.
+ANALISADORES_SOMENTE = None  # ex: ["seguranca", "complexidade"]; None = todas
+ANALISADORES_PULAR = []  # ex: ["duplicacao"]
+
+# ===== MODO INCREMENTAL =====
+# Reanalisa só arquivos novos/modificados e reaproveita o restante do
+# relatório anterior (RELATORIO_SAIDA). Com INCREMENTAL_GIT_REF as
+# alterações vêm do git; sem ele, das assinaturas gravadas no relatório.
+INCREMENTAL = False
+INCREMENTAL_GIT_REF = None  # ex: "origin/main"
+
+# ===== MODO OBSERVAÇÃO =====
+OBSERVAR = False  # processo contínuo que reanalisa arquivos alterados
+OBSERVAR_DEBOUNCE = 0.3  # segundos sem eventos antes de reanalisar
+OBSERVAR_INTERVALO = 1.0  # período da varredura quando não há watchdog
+
+# ===== EXECUÇÃO DISTRIBUÍDA =====
+# Cada máquina analisa uma fatia determinística do projeto e grava um
+# relatório parcial; RELATORIOS_MESCLAR une os parciais num relatório único.
+SHARD = None  # "i/N": analisa só a fatia i (de 1 a N)
+SHARD_HISTORICO = None  # relatório mesclado anterior: balanceia pelo custo medido
+RELATORIOS_MESCLAR = []  # ex: ["shard1.json", "shard2.json"]
+
+# ===== MODO SERVIDOR =====
+# Mantém pool de CPU, agendador e cache quentes e atende pedidos de análise
+# por HTTP (POST /analisar) em localhost ou num Unix socket.
+SERVIDOR = False
+SERVIDOR_HOST = "127.0.0.1"
+SERVIDOR_PORTA = 8765
+SERVIDOR_SOCKET = None  # ex: "/tmp/analise_codigo.sock" (no lugar de host/porta)
+
+# ===== PERFIL DE EXECUÇÃO =====
+PERFIL_TOP_ARQUIVOS = 10  # arquivos mais lentos listados no relatório
+PERFIL_AMOSTRAS_ETAPA = 10000  # tempos guardados por etapa para os percentis
+PERFIL_CPROFILE = False  # cProfile das etapas em processo (mais lento)
+PERFIL_SAIDA = "perfil_etapas.prof"
+PERFIL_TOP_FUNCOES = 25
+
+# Opções da linha de comando aplicadas sobre as constantes acima (ver main)
+_configuracao_cli = {}
+
+
+def aplicar_configuracao(valores):
+    """Sobrescreve constantes de configuração (``{"MAX_WORKERS": 4, ...}``).
+
+    Os valores também seguem para os workers do pool de CPU, que importam
+    o módulo do zero (ver criar_executor_cpu).
+    """
+    globals().update(valores)
+    _configuracao_cli.update(valores)
+    impressao_configuracao.cache_clear()
 
 
 def setup_cache():
@@ -49,173 +160,1195 @@ def setup_cache():
         os.makedirs(CACHE_DIR)
 
 
-def get_file_hash(filepath):
-    """Gera hash do arquivo para cache."""
+def get_file_hash(filepath, conteudo=None):
+    """Gera hash do arquivo (ou do conteúdo já lido) para cache."""
+    if conteudo is not None:
+        return hashlib.md5(conteudo, usedforsecurity=False).hexdigest()
     try:
         with open(filepath, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+            return hashlib.md5(f.read(), usedforsecurity=False).hexdigest()
     except OSError:
         return None
 
 
-def is_cached(filepath, analysis_type):
-    """Verifica se análise está em cache."""
-    if not ENABLE_CACHE:
-        return False
+def normalizar_caminho(filepath):
+    """Caminho absoluto normalizado usado como chave do cache."""
+    return os.path.normcase(os.path.abspath(filepath))
 
-    cache_file = os.path.join(
-        CACHE_DIR, f"{
-            os.path.basename(filepath)}_{analysis_type}.cache")
-    if not os.path.exists(cache_file):
-        return False
 
+def tamanho_arquivo(filepath):
+    """Tamanho em bytes (0 se o arquivo sumiu)."""
     try:
-        with open(cache_file, 'r') as f:
-            cache_data = json.load(f)
-            current_hash = get_file_hash(filepath)
-            return cache_data.get('hash') == current_hash
-    except (OSError, json.JSONDecodeError):
-        return False
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+
+class CacheStore:
+    """Cache único em SQLite, chaveado por caminho normalizado e hash do conteúdo.
+
+    A validação usa primeiro (mtime, tamanho, inode); o hash só é recalculado
+    quando essa assinatura muda. Escritas ficam pendentes em memória e são
+    gravadas em lote numa única transação. O modo WAL permite leitores e
+    escritores concorrentes de várias threads e processos.
+    """
+
+    def __init__(self, diretorio):
+        self.arquivo = os.path.join(diretorio, CACHE_DB)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pendentes = {}  # (caminho, tipo) -> linha a gravar
+        self._hashes = OrderedDict()  # caminho -> (assinatura, hash), LRU de CACHE_HASHES_MEMORIA
+        with self._conexao() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entradas (
+                    caminho TEXT NOT NULL,
+                    tipo TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    dados TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    PRIMARY KEY (caminho, tipo)
+                )""")
+
+    def _conexao(self):
+        """Uma conexão por thread (e por processo, caso haja fork)."""
+        conn = getattr(self._local, 'conexao', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.arquivo, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _assinatura(filepath):
+        st = os.stat(filepath)
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _hash(self, chave, filepath, assinatura, conteudo):
+        with self._lock:
+            memorizado = self._hashes.get(chave)
+            if memorizado and memorizado[0] == assinatura:
+                self._hashes.move_to_end(chave)
+                return memorizado[1]
+        file_hash = get_file_hash(filepath, conteudo)
+        with self._lock:
+            self._hashes[chave] = (assinatura, file_hash)
+            if len(self._hashes) > CACHE_HASHES_MEMORIA:
+                self._hashes.popitem(last=False)
+        return file_hash
+
+    def obter(self, filepath, tipo, conteudo=None):
+        """Retorna os dados em cache ou None se ausentes/desatualizados."""
+        chave = normalizar_caminho(filepath)
+        try:
+            assinatura = self._assinatura(filepath)
+        except OSError:
+            return None
+
+        with self._lock:
+            linha = self._pendentes.get((chave, tipo))
+        if linha is None:
+            try:
+                linha = self._conexao().execute(
+                    "SELECT caminho, tipo, hash, mtime_ns, tamanho, inode, dados, timestamp "
+                    "FROM entradas WHERE caminho = ? AND tipo = ?",
+                    (chave, tipo)).fetchone()
+            except sqlite3.Error:
+                return None
+        if linha is None:
+            return None
+
+        if tuple(linha[3:6]) != assinatura:
+            # Arquivo tocado: só o hash decide se o conteúdo mudou
+            if self._hash(chave, filepath, assinatura, conteudo) != linha[2]:
+                return None
+            self._agendar((chave, tipo, linha[2], *assinatura, linha[6], linha[7]))
+
+        try:
+            return json.loads(linha[6])
+        except json.JSONDecodeError:
+            return None
+
+    def salvar(self, filepath, tipo, data, conteudo=None):
+        """Agenda a gravação; o lote é descarregado ao atingir CACHE_LOTE_ESCRITA."""
+        chave = normalizar_caminho(filepath)
+        try:
+            assinatura = self._assinatura(filepath)
+        except OSError:
+            return
+        file_hash = self._hash(chave, filepath, assinatura, conteudo)
+        if file_hash is None:
+            return
+        self._agendar((chave, tipo, file_hash, *assinatura,
+                       json.dumps(data, ensure_ascii=False), time.time()))
+
+    def hash_salvo(self, filepath, tipo):
+        """Hash do conteúdo registrado na entrada (None se não houver)."""
+        chave = normalizar_caminho(filepath)
+        with self._lock:
+            linha = self._pendentes.get((chave, tipo))
+        if linha is not None:
+            return linha[2]
+        try:
+            linha = self._conexao().execute(
+                "SELECT hash FROM entradas WHERE caminho = ? AND tipo = ?",
+                (chave, tipo)).fetchone()
+        except sqlite3.Error:
+            return None
+        return linha[0] if linha else None
+
+    def todos(self, tipo):
+        """``{caminho: dados}`` de todas as entradas do tipo, sem validar o conteúdo."""
+        try:
+            linhas = self._conexao().execute(
+                "SELECT caminho, dados FROM entradas WHERE tipo = ?", (tipo,)).fetchall()
+        except sqlite3.Error:
+            linhas = []
+        with self._lock:
+            pendentes = [(linha[0], linha[6]) for chave, linha in self._pendentes.items()
+                         if chave[1] == tipo]
+        entradas = {}
+        for caminho, dados in [*linhas, *pendentes]:
+            try:
+                entradas[caminho] = json.loads(dados)
+            except json.JSONDecodeError:
+                continue
+        return entradas
+
+    def estatisticas(self):
+        """``{tipo: (entradas, bytes de dados)}`` do banco, sem as escritas pendentes."""
+        linhas = self._conexao().execute(
+            "SELECT tipo, COUNT(*), SUM(LENGTH(dados)) FROM entradas GROUP BY tipo").fetchall()
+        return {tipo: (entradas, tamanho or 0) for tipo, entradas, tamanho in linhas}
+
+    def _agendar(self, linha):
+        with self._lock:
+            self._pendentes[(linha[0], linha[1])] = linha
+            cheio = len(self._pendentes) >= CACHE_LOTE_ESCRITA
+        if cheio:
+            self.descarregar()
+
+    def descarregar(self):
+        """Grava as escritas pendentes numa única transação."""
+        with self._lock:
+            linhas = list(self._pendentes.values())
+            self._pendentes.clear()
+        if not linhas:
+            return
+        try:
+            with self._conexao() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    linhas)
+        except sqlite3.Error:
+            pass
+
+
+_cache_store = None
+_cache_store_lock = threading.Lock()
 
 
-def save_to_cache(filepath, analysis_type, data):
+def obter_cache_store():
+    """Instância única do cache (criada sob demanda)."""
+    global _cache_store
+    if _cache_store is None:
+        with _cache_store_lock:
+            if _cache_store is None:
+                setup_cache()
+                _cache_store = CacheStore(CACHE_DIR)
+                atexit.register(_cache_store.descarregar)
+    return _cache_store
+
+
+def save_to_cache(filepath, analysis_type, data, conteudo=None):
     """Salva resultado no cache."""
     if not ENABLE_CACHE:
         return
-
-    cache_file = os.path.join(
-        CACHE_DIR, f"{
-            os.path.basename(filepath)}_{analysis_type}.cache")
-    cache_data = {
-        'hash': get_file_hash(filepath),
-        'data': data,
-        'timestamp': time.time()
-    }
-
     try:
-        with open(cache_file, 'w') as f:
-            json.dump(cache_data, f)
-    except OSError:
+        obter_cache_store().salvar(filepath, analysis_type, data, conteudo)
+    except (OSError, sqlite3.Error):
         pass
 
 
-def load_from_cache(filepath, analysis_type):
-    """Carrega resultado do cache."""
+def load_from_cache(filepath, analysis_type, conteudo=None):
+    """Carrega resultado do cache (None se ausente ou desatualizado)."""
     if not ENABLE_CACHE:
         return None
+    try:
+        return obter_cache_store().obter(filepath, analysis_type, conteudo)
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def flush_cache():
+    """Descarrega escritas pendentes do cache."""
+    if ENABLE_CACHE and _cache_store is not None:
+        _cache_store.descarregar()
+
+
+@contextmanager
+def cronometrar(tempos, etapa):
+    """Soma em ``tempos[etapa]`` a duração do bloco, mesmo se ele falhar."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tempos[etapa] = tempos.get(etapa, 0.0) + time.perf_counter() - inicio
+
+
+def _percentil(ordenados, fracao):
+    """Percentil por posição mais próxima (nearest-rank) de uma lista já ordenada."""
+    return ordenados[max(0, math.ceil(fracao * len(ordenados)) - 1)]
+
+
+class MedidorEtapas:
+    """Tempos por etapa, acertos de cache e subprocessos de uma execução.
+
+    Seguro entre threads (flake8 e bandit registram a partir do pool). As
+    etapas em processo são medidas nos workers e os tempos voltam junto com
+    o resultado de cada arquivo (ver analisar_fonte).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.duracoes = {}  # etapa -> [total, chamadas, máximo, amostra dos segundos por chamada]
+        self._sorteio = random.Random(0)
+        self.cache = {}  # tipo -> [acertos, faltas]
+        self.subprocessos = {}  # ferramenta -> [execuções, segundos]
+        self._lentos = []  # heap com os PERFIL_TOP_ARQUIVOS mais lentos
+        self.custos = {}  # arquivo -> segundos das etapas em processo
+        self.estimativas = {}  # arquivo -> (segundos estimados, com histórico próprio)
+        self.falhas = {}  # etapa -> arquivos sem resultado (não vão para o cache)
+
+    def registrar(self, etapa, segundos):
+        with self._lock:
+            self._registrar(etapa, segundos)
+
+    def _registrar(self, etapa, segundos):
+        """Acumula um tempo (com o lock tomado).
+
+        Total, chamadas e máximo são exatos; os percentis saem de no máximo
+        PERFIL_AMOSTRAS_ETAPA tempos por etapa (amostragem de reservatório),
+        para que o perfil não cresça com o número de arquivos.
+        """
+        dados = self.duracoes.get(etapa)
+        if dados is None:
+            dados = self.duracoes[etapa] = [0.0, 0, 0.0, []]
+        dados[0] += segundos
+        dados[1] += 1
+        dados[2] = max(dados[2], segundos)
+        amostra = dados[3]
+        if len(amostra) < PERFIL_AMOSTRAS_ETAPA:
+            amostra.append(segundos)
+        else:
+            posicao = self._sorteio.randrange(dados[1])
+            if posicao < PERFIL_AMOSTRAS_ETAPA:
+                amostra[posicao] = segundos
+
+    @contextmanager
+    def medir(self, etapa):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio)
+
+    def arquivo(self, filepath, tempos):
+        """Registra as etapas em processo de um arquivo."""
+        total = sum(tempos.values())
+        with self._lock:
+            for etapa, segundos in tempos.items():
+                self._registrar(etapa, segundos)
+            self.custos[filepath] = total
+            item = (total, filepath, tempos)
+            if len(self._lentos) < PERFIL_TOP_ARQUIVOS:
+                heapq.heappush(self._lentos, item)
+            elif item[:2] > self._lentos[0][:2]:
+                heapq.heapreplace(self._lentos, item)
+
+    def estimativa(self, filepath, segundos, historico):
+        """Custo previsto pelo ModeloCusto, comparado ao real em secao()."""
+        with self._lock:
+            self.estimativas[filepath] = (segundos, historico)
+
+    def _secao_modelo(self):
+        pares = [(filepath, estimado, self.custos[filepath], historico)
+                 for filepath, (estimado, historico) in self.estimativas.items()
+                 if filepath in self.custos]
+        if not pares:
+            return None
+        erros = sorted(abs(estimado - real) / real * 100
+                       for _, estimado, real, _ in pares if real)
+        desvios = heapq.nlargest(PERFIL_TOP_ARQUIVOS, pares,
+                                 key=lambda par: (abs(par[1] - par[2]), par[0]))
+        return {
+            "arquivos": len(pares),
+            "com_historico": sum(1 for *_, historico in pares if historico),
+            "estimado_total_s": round(sum(par[1] for par in pares), 3),
+            "real_total_s": round(sum(par[2] for par in pares), 3),
+            "erro_p50_percentual": round(_percentil(erros, 0.50), 1) if erros else 0.0,
+            "erro_p90_percentual": round(_percentil(erros, 0.90), 1) if erros else 0.0,
+            "maiores_desvios": [
+                {"arquivo": filepath,
+                 "estimado_ms": round(estimado * 1000, 2),
+                 "real_ms": round(real * 1000, 2),
+                 "historico": historico}
+                for filepath, estimado, real, historico in desvios
+            ]
+        }
+
+    def falha(self, etapa, filepath):
+        """Arquivo cuja etapa falhou (timeout, erro da ferramenta): relatado, nunca cacheado."""
+        with self._lock:
+            self.falhas.setdefault(etapa, set()).add(filepath)
+
+    def acerto_cache(self, tipo, acertou):
+        with self._lock:
+            contagem = self.cache.setdefault(tipo, [0, 0])
+            contagem[0 if acertou else 1] += 1
+
+    def subprocesso(self, ferramenta, segundos):
+        with self._lock:
+            contagem = self.subprocessos.setdefault(ferramenta, [0, 0.0])
+            contagem[0] += 1
+            contagem[1] += segundos
+
+    def secao(self):
+        """Seção de perfil do relatório: totais, percentis, arquivos mais lentos
+        e a precisão do modelo de custo do escalonador."""
+        with self._lock:
+            etapas = {}
+            for etapa, (total, chamadas, maximo, amostra) in sorted(
+                    self.duracoes.items(), key=lambda item: item[1][0], reverse=True):
+                ordenados = sorted(amostra)
+                etapas[etapa] = {
+                    "total_s": round(total, 3),
+                    "chamadas": chamadas,
+                    "media_ms": round(total / chamadas * 1000, 2),
+                    "p50_ms": round(_percentil(ordenados, 0.50) * 1000, 2),
+                    "p90_ms": round(_percentil(ordenados, 0.90) * 1000, 2),
+                    "p99_ms": round(_percentil(ordenados, 0.99) * 1000, 2),
+                    "max_ms": round(maximo * 1000, 2)
+                }
+            secao = {
+                "etapas": etapas,
+                "cache": {tipo: {"acertos": acertos, "faltas": faltas}
+                          for tipo, (acertos, faltas) in self.cache.items()},
+                "subprocessos": {
+                    ferramenta: {"execucoes": execucoes, "total_s": round(segundos, 3)}
+                    for ferramenta, (execucoes, segundos) in self.subprocessos.items()},
+                "arquivos_mais_lentos": [
+                    {"arquivo": filepath,
+                     "total_ms": round(total * 1000, 2),
+                     "estimado_ms": round(self.estimativas[filepath][0] * 1000, 2)
+                     if filepath in self.estimativas else None,
+                     "etapas_ms": {etapa: round(segundos * 1000, 2)
+                                   for etapa, segundos in tempos.items()}}
+                    for total, filepath, tempos in sorted(self._lentos, reverse=True)
+                ]
+            }
+            if self.falhas:
+                secao["falhas"] = {etapa: sorted(arquivos)
+                                   for etapa, arquivos in sorted(self.falhas.items())}
+            modelo = self._secao_modelo()
+            if modelo is not None:
+                secao["modelo_custo"] = modelo
+            return secao
+
+
+# Medidor da execução corrente. Num ContextVar para que pedidos simultâneos do
+# servidor tenham cada um o seu: as tarefas do agendador e o asyncio.to_thread
+# herdam o contexto de quem as submeteu
+_medidor = contextvars.ContextVar('medidor', default=MedidorEtapas())
+_importacoes = {}  # etapa -> segundos importando bibliotecas sob demanda
+
+
+def obter_medidor():
+    """Medidor da execução (ou do pedido do servidor) corrente."""
+    return _medidor.get()
+
+
+def importar(modulo, etapa):
+    """Importa ``modulo`` na primeira etapa que precisar dele.
+
+    Só a primeira importação no processo é medida (em ``_importacoes``,
+    relatado por --perfil-inicio); as seguintes saem de sys.modules.
+    """
+    carregado = sys.modules.get(modulo)
+    if carregado is not None:
+        return carregado
+    inicio = time.perf_counter()
+    try:
+        return importlib.import_module(modulo)
+    finally:
+        _importacoes[etapa] = _importacoes.get(etapa, 0.0) + time.perf_counter() - inicio
+
+
+def executar_ferramenta(cmd, **kwargs):
+    """``subprocess.run`` contabilizado no medidor (execuções e tempo por ferramenta)."""
+    inicio = time.perf_counter()
+    try:
+        return subprocess.run(cmd, **kwargs)
+    finally:
+        obter_medidor().subprocesso(os.path.basename(cmd[0]), time.perf_counter() - inicio)
+
+
+if os.name == 'posix':
+    _ARGS_GRUPO_PROCESSOS = {'start_new_session': True}
+else:
+    _ARGS_GRUPO_PROCESSOS = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+
+
+def _matar_grupo(processo):
+    """Mata o processo e todos os filhos (ex: workers do ``flake8 --jobs``)."""
+    try:
+        if os.name == 'posix':
+            os.killpg(processo.pid, signal.SIGKILL)
+        else:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(processo.pid)],
+                           capture_output=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        pass
+
 
-    cache_file = os.path.join(
-        CACHE_DIR, f"{
-            os.path.basename(filepath)}_{analysis_type}.cache")
+def timeout_lote(base, por_arquivo, por_mb, arquivos):
+    """Timeout de um lote proporcional ao número e ao tamanho dos arquivos."""
+    total_bytes = 0
+    for arquivo in arquivos:
+        try:
+            total_bytes += os.path.getsize(arquivo)
+        except OSError:
+            continue
+    return base + por_arquivo * len(arquivos) + por_mb * total_bytes / (1024 * 1024)
+
+
+class AgendadorFerramentas:
+    """Loop asyncio numa thread própria que dispara as ferramentas externas.
+
+    Cada ferramenta tem seu semáforo (LIMITE_POR_FERRAMENTA) e todas
+    dividem um teto global (MAX_WORKERS), independente dos workers de CPU.
+    O timeout conta a partir do início do processo, não da fila, e derruba
+    o grupo de processos inteiro. As corrotinas são entregues com
+    ``submeter`` e voltam como concurrent.futures.Future, que o laço de
+    executar_analise espera junto com os blocos do pool de CPU.
+    """
+
+    def __init__(self):
+        asyncio = importar('asyncio', 'agendador')
+        self._loop = asyncio.new_event_loop()
+        self._global = asyncio.Semaphore(MAX_WORKERS)
+        self._semaforos = {}
+        self._ativos = set()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="agendador-ferramentas", daemon=True)
+        self._thread.start()
+
+    def submeter(self, corotina):
+        return importar('asyncio', 'agendador').run_coroutine_threadsafe(corotina, self._loop)
+
+    def executar(self, corotina):
+        """Versão bloqueante de ``submeter`` (nunca chamar de dentro do loop)."""
+        return self.submeter(corotina).result()
+
+    def _semaforo(self, ferramenta):
+        if ferramenta not in self._semaforos:
+            limite = LIMITE_POR_FERRAMENTA.get(ferramenta, MAX_WORKERS)
+            asyncio = importar('asyncio', 'agendador')
+            self._semaforos[ferramenta] = asyncio.Semaphore(max(1, limite))
+        return self._semaforos[ferramenta]
+
+    async def processo(self, ferramenta, cmd, timeout):
+        """Roda ``cmd`` respeitando os limites; devolve subprocess.CompletedProcess.
+
+        Estoura subprocess.TimeoutExpired depois de matar o grupo de processos.
+        """
+        asyncio = importar('asyncio', 'agendador')
+        async with self._global, self._semaforo(ferramenta):
+            inicio = time.perf_counter()
+            processo = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                **_ARGS_GRUPO_PROCESSOS)
+            self._ativos.add(processo)
+            try:
+                stdout, stderr = await asyncio.wait_for(processo.communicate(), timeout)
+            except TimeoutError:
+                _matar_grupo(processo)
+                await processo.wait()
+                raise subprocess.TimeoutExpired(cmd, timeout) from None
+            except asyncio.CancelledError:
+                _matar_grupo(processo)
+                raise
+            finally:
+                self._ativos.discard(processo)
+                segundos = time.perf_counter() - inicio
+                obter_medidor().subprocesso(ferramenta, segundos)
+                obter_medidor().registrar(ferramenta, segundos)
+
+        return subprocess.CompletedProcess(
+            cmd, processo.returncode,
+            stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace'))
+
+    def encerrar(self):
+        """Mata o que ainda estiver rodando (grupos próprios não recebem o Ctrl+C)."""
+        for processo in list(self._ativos):
+            _matar_grupo(processo)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_agendador = None
+_agendador_lock = threading.Lock()
+
+
+def obter_agendador():
+    """Instância única do agendador de ferramentas (criada sob demanda)."""
+    global _agendador
+    if _agendador is None:
+        with _agendador_lock:
+            if _agendador is None:
+                _agendador = AgendadorFerramentas()
+                atexit.register(_agendador.encerrar)
+    return _agendador
+
+
+def _nome_distribuicao(nome):
+    return re.sub(r'[-_.]+', '_', nome).lower()
+
+
+@lru_cache(maxsize=None)
+def _distribuicoes():
+    """``{nome normalizado: pasta .dist-info}``, na ordem de sys.path.
+
+    Um scandir por entrada de sys.path: o importlib.metadata sozinho custa
+    dezenas de ms na inicialização, e o fingerprint é lido a cada execução.
+    """
+    pastas = {}
+    for entrada in sys.path:
+        try:
+            with os.scandir(entrada or '.') as itens:
+                for item in itens:
+                    if item.name.endswith('.dist-info'):
+                        nome = item.name[:-len('.dist-info')].split('-', 1)[0]
+                        pastas.setdefault(_nome_distribuicao(nome), item.path)
+        except OSError:
+            continue
+    return pastas
+
+
+def versao_ferramenta(pacote):
+    """Versão instalada de uma ferramenta (None se ausente)."""
+    pasta = _distribuicoes().get(_nome_distribuicao(pacote))
+    if pasta is not None:
+        try:
+            with open(os.path.join(pasta, 'METADATA'), encoding='utf-8') as f:
+                for linha in f:
+                    if linha.startswith('Version:'):
+                        return linha.split(':', 1)[1].strip()
+                    if not linha.strip():
+                        break
+        except OSError:
+            pass
+    # .egg-info, pacotes ausentes e instalações fora do padrão
+    metadata = importar('importlib.metadata', 'versoes')
     try:
-        with open(cache_file, 'r') as f:
-            return json.load(f)['data']
-    except (OSError, json.JSONDecodeError, KeyError):
+        return metadata.version(pacote)
+    except metadata.PackageNotFoundError:
         return None
 
 
-def arquivos_python(path):
-    """Lista arquivos Python otimizada com suporte a múltiplas extensões."""
-    pastas_ignoradas = {
-        'venv', '.venv', 'env', '.env', '__pycache__', '.git',
-        '.pytest_cache', 'node_modules', '.idea', '.vscode',
-        'dist', 'build', '.tox', '.mypy_cache', CACHE_DIR
+@lru_cache(maxsize=None)
+def impressao_configuracao():
+    """Fingerprint das ferramentas e da configuração que afetam o resultado.
+
+    Entra na validação do cache de resultado completo: trocar a versão do
+    flake8/bandit/radon, os flags, o limite de complexidade, os pesos ou o
+    próprio analisador invalida todas as entradas.
+    """
+    configuracao = {
+        "versao": VERSAO,
+        "analisador": get_file_hash(__file__),
+        "ferramentas": {
+            pacote: versao_ferramenta(pacote)
+            for pacote in ("flake8", "pycodestyle", "pyflakes", "bandit", "radon")
+        },
+        # Instalada mas fora do PATH também conta como ausente (ferramenta_ausente)
+        "executaveis": {
+            ferramenta: importar('shutil', 'versoes').which(ferramenta) is not None
+            for ferramenta in sorted(FERRAMENTAS_ETAPA.values())
+        },
+        "pep8_motor": pep8_interno_ativo(),
+        "flake8_args": FLAKE8_ARGS,
+        "limite_complexidade": LIMITE_COMPLEXIDADE,
+        "duplicacao": [DUPLICACAO_MIN_TOKENS, DUPLICACAO_JANELA],
+        "pesos": PESOS
     }
+    serializado = json.dumps(configuracao, sort_keys=True).encode('utf-8')
+    return hashlib.md5(serializado, usedforsecurity=False).hexdigest()
 
-    # Extensões Python suportadas
-    extensoes_python = {'.py', '.pyi', '.pyw'}
 
-    arquivos_ignorados = {
-        'Analise_codigo.py', 'Analise_codigo_pro.py',
-        'analise_codigo.py', 'codigo_analise.py'
-    }
+PASTAS_IGNORADAS = {
+    'venv', '.venv', 'env', '.env', '__pycache__', '.git',
+    '.pytest_cache', 'node_modules', '.idea', '.vscode',
+    'dist', 'build', '.tox', '.mypy_cache'
+}
 
-    arquivos_validos = []
-    total_arquivos_encontrados = 0
-    arquivos_muito_grandes = 0
+# Extensões Python suportadas
+EXTENSOES_PYTHON = {'.py', '.pyi', '.pyw'}
 
-    for root, dirs, files in os.walk(path):
-        # Remove pastas ignoradas da busca
-        dirs[:] = [d for d in dirs if d not in pastas_ignoradas]
+ARQUIVOS_IGNORADOS = {
+    'Analise_codigo.py', 'Analise_codigo_pro.py',
+    'analise_codigo.py', 'codigo_analise.py'
+}
 
-        for file in files:
-            # Verifica extensão e se não está na lista de ignorados
-            if any(file.endswith(ext)
-                   for ext in extensoes_python) and file not in arquivos_ignorados:
-                total_arquivos_encontrados += 1
-                filepath = os.path.join(root, file)
-                try:
-                    size_mb = os.path.getsize(filepath) / (1024 * 1024)
-                    if size_mb <= MAX_FILE_SIZE_MB:
-                        arquivos_validos.append(filepath)
-                    else:
-                        arquivos_muito_grandes += 1
-                        print(
-                            f"⚠️  Arquivo muito grande: {filepath} ({
-                                size_mb:.1f}MB)")
-                except OSError:
-                    continue
 
-    if total_arquivos_encontrados > len(arquivos_validos):
+def _regex_gitignore(padrao):
+    """Traduz um padrão do .gitignore numa regex sobre caminhos relativos com '/'."""
+    ancorado = '/' in padrao
+    padrao = padrao.lstrip('/')
+    partes = []
+    i = 0
+    while i < len(padrao):
+        if padrao.startswith('**/', i):
+            partes.append('(?:.*/)?')
+            i += 3
+            continue
+        if padrao.startswith('**', i):
+            partes.append('.*')
+            i += 2
+            continue
+        c = padrao[i]
+        if c == '*':
+            partes.append('[^/]*')
+        elif c == '?':
+            partes.append('[^/]')
+        elif c == '[' and ']' in padrao[i + 2:]:
+            fim = padrao.index(']', i + 2)
+            classe = padrao[i + 1:fim]
+            if classe.startswith('!'):
+                classe = '^' + classe[1:]
+            partes.append(f"[{classe}]")
+            i = fim
+        elif c == '\\' and i + 1 < len(padrao):
+            i += 1
+            partes.append(re.escape(padrao[i]))
+        else:
+            partes.append(re.escape(c))
+        i += 1
+
+    regex = ''.join(partes)
+    if not ancorado:
+        # Sem '/' no meio, o padrão vale em qualquer profundidade
+        regex = '(?:.*/)?' + regex
+    return re.compile(regex)
+
+
+@lru_cache(maxsize=None)
+def regras_gitignore(diretorio):
+    """Regras ``(regex, negada, so_diretorio)`` do .gitignore de um diretório."""
+    try:
+        with open(os.path.join(diretorio, '.gitignore'), encoding='utf-8', errors='replace') as f:
+            linhas = f.read().splitlines()
+    except OSError:
+        return ()
+
+    regras = []
+    for linha in linhas:
+        if not linha.endswith('\\ '):
+            linha = linha.rstrip(' ')
+        if not linha or linha.startswith('#'):
+            continue
+        negada = linha.startswith('!')
+        if negada:
+            linha = linha[1:]
+        so_diretorio = linha.endswith('/')
+        linha = linha.rstrip('/')
+        if linha:
+            regras.append((_regex_gitignore(linha), negada, so_diretorio))
+    return tuple(regras)
+
+
+def ignorado_gitignore(pilha, relativo, eh_diretorio):
+    """Aplica as regras herdadas (``[(base, regras)]``, da raiz para baixo).
+
+    Como no git, a última regra que casa decide.
+    """
+    ignorado = False
+    for base, regras in pilha:
+        subcaminho = relativo[len(base) + 1:] if base else relativo
+        for regex, negada, so_diretorio in regras:
+            if so_diretorio and not eh_diretorio:
+                continue
+            if regex.fullmatch(subcaminho):
+                ignorado = not negada
+    return ignorado
+
+
+def arquivo_monitorado(filepath, path):
+    """Aplica a um caminho isolado os mesmos filtros da descoberta de arquivos."""
+    relativo = os.path.relpath(filepath, path)
+    partes = relativo.split(os.sep)
+    pastas_ignoradas = PASTAS_IGNORADAS | {CACHE_DIR}
+    if (os.path.splitext(filepath)[1] not in EXTENSOES_PYTHON
+            or partes[-1] in ARQUIVOS_IGNORADOS
+            or any(parte in pastas_ignoradas for parte in partes[:-1])):
+        return False
+
+    pilha = [('', regras_gitignore(path))]
+    for i in range(1, len(partes)):
+        pasta = '/'.join(partes[:i])
+        if ignorado_gitignore(pilha, pasta, True):
+            return False
+        pilha.append((pasta, regras_gitignore(os.path.join(path, *partes[:i]))))
+    return not ignorado_gitignore(pilha, '/'.join(partes), False)
+
+
+def _filtrar_nome(nome):
+    return os.path.splitext(nome)[1] in EXTENSOES_PYTHON and nome not in ARQUIVOS_IGNORADOS
+
+
+def _percorrer_subarvore(path, relativo, pilha, saida):
+    """Percorre uma subárvore com os.scandir, enviando ``(caminho, tamanho)`` para ``saida``.
+
+    O tipo e o tamanho vêm do DirEntry (sem stat extra no Windows e, no
+    Linux, um único stat só para os arquivos Python).
+    """
+    pastas_ignoradas = PASTAS_IGNORADAS | {CACHE_DIR}
+    pendentes = [(relativo, pilha)]
+    while pendentes:
+        relativo, pilha = pendentes.pop()
+        diretorio = os.path.join(path, *relativo.split('/')) if relativo else path
+        regras = regras_gitignore(diretorio)
+        if regras:
+            pilha = pilha + [(relativo, regras)]
+        try:
+            entradas = list(os.scandir(diretorio))
+        except OSError:
+            continue
+
+        for entrada in entradas:
+            nome = entrada.name
+            filho = f"{relativo}/{nome}" if relativo else nome
+            try:
+                if entrada.is_dir():
+                    if (nome not in pastas_ignoradas and not entrada.is_symlink()
+                            and not ignorado_gitignore(pilha, filho, True)):
+                        pendentes.append((filho, pilha))
+                elif _filtrar_nome(nome) and not ignorado_gitignore(pilha, filho, False):
+                    saida.put((os.path.join(diretorio, nome), entrada.stat().st_size))
+            except OSError:
+                continue
+
+
+def _descobrir_scandir(path):
+    """Gera ``(caminho, tamanho)`` percorrendo as subpastas da raiz em paralelo."""
+    pastas_ignoradas = PASTAS_IGNORADAS | {CACHE_DIR}
+    pilha = [('', regras_gitignore(path))]
+    fila = queue.SimpleQueue()
+    subarvores = []
+    try:
+        entradas = list(os.scandir(path))
+    except OSError:
+        return
+
+    for entrada in entradas:
+        try:
+            if entrada.is_dir():
+                if (entrada.name not in pastas_ignoradas and not entrada.is_symlink()
+                        and not ignorado_gitignore(pilha, entrada.name, True)):
+                    subarvores.append(entrada.name)
+            elif (_filtrar_nome(entrada.name)
+                  and not ignorado_gitignore(pilha, entrada.name, False)):
+                yield os.path.join(path, entrada.name), entrada.stat().st_size
+        except OSError:
+            continue
+
+    if not subarvores:
+        return
+
+    def percorrer(relativo):
+        try:
+            _percorrer_subarvore(path, relativo, pilha, fila)
+        finally:
+            fila.put(None)
+
+    executor = importar('concurrent.futures', 'descoberta').ThreadPoolExecutor(
+        max_workers=min(DESCOBERTA_WORKERS, len(subarvores)))
+    try:
+        for relativo in subarvores:
+            executor.submit(percorrer, relativo)
+        restantes = len(subarvores)
+        while restantes:
+            item = fila.get()
+            if item is None:
+                restantes -= 1
+            else:
+                yield item
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _descobrir_git(path):
+    """Gera ``(caminho, tamanho)`` a partir do ``git ls-files``, em streaming.
+
+    Lista arquivos rastreados e não rastreados que o git não ignora
+    (.gitignore, .git/info/exclude, excludes globais). Retorna None se
+    ``path`` não está num repositório ou o git não está disponível.
+    """
+    try:
+        processo = subprocess.Popen(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=path, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError:
+        return None
+
+    # O primeiro bloco (ou EOF) diz se o git aceitou o diretório
+    primeiro = processo.stdout.read1(65536)
+    if not primeiro and processo.wait() != 0:
+        return None
+
+    def gerar():
+        pastas_ignoradas = PASTAS_IGNORADAS | {CACHE_DIR}
+        vistos = set()
+        resto = b''
+        bloco = primeiro
+        try:
+            while bloco:
+                nomes = (resto + bloco).split(b'\0')
+                resto = nomes.pop()
+                for nome in nomes:
+                    relativo = os.fsdecode(nome)
+                    partes = relativo.split('/')
+                    if (relativo in vistos or not _filtrar_nome(partes[-1])
+                            or any(parte in pastas_ignoradas for parte in partes[:-1])):
+                        continue
+                    vistos.add(relativo)
+                    filepath = os.path.join(path, *partes)
+                    try:
+                        # Rastreados mas apagados do disco somem aqui
+                        tamanho = os.stat(filepath).st_size
+                    except OSError:
+                        continue
+                    yield filepath, tamanho
+                bloco = processo.stdout.read1(65536)
+        finally:
+            processo.stdout.close()
+            processo.wait()
+
+    return gerar()
+
+
+def descobrir_arquivos(path):
+    """Gera os arquivos Python do projeto à medida que são encontrados.
+
+    Dentro de um repositório usa ``git ls-files`` (respeita tudo que o git
+    ignora); fora dele, percorre as pastas com os.scandir em paralelo,
+    respeitando os .gitignore encontrados. Arquivos acima de
+    MAX_FILE_SIZE_MB são avisados e pulados.
+    """
+    # .gitignore pode ter mudado desde a última varredura (modo observação)
+    regras_gitignore.cache_clear()
+    candidatos = _descobrir_git(path) if DESCOBERTA_GIT else None
+    if candidatos is None:
+        candidatos = _descobrir_scandir(path)
+
+    arquivos_muito_grandes = 0
+    for filepath, tamanho in candidatos:
+        size_mb = tamanho / (1024 * 1024)
+        if size_mb <= MAX_FILE_SIZE_MB:
+            yield filepath
+        else:
+            arquivos_muito_grandes += 1
+            print(f"⚠️  Arquivo muito grande: {filepath} ({size_mb:.1f}MB)")
+
+    if arquivos_muito_grandes:
         print(
             f"ℹ️  {arquivos_muito_grandes} arquivo(s) ignorado(s) por serem muito grandes")
 
-    return arquivos_validos
 
+def arquivos_python(path):
+    """Lista completa dos arquivos Python do projeto (ver descobrir_arquivos)."""
+    return list(descobrir_arquivos(path))
+
+
+class ArquivoFonte:
+    """Conteúdo de um arquivo lido uma única vez e compartilhado pelas análises."""
+
+    def __init__(self, caminho, dados=None):
+        self.caminho = caminho
+        if dados is None:
+            with open(caminho, 'rb') as f:
+                dados = f.read()
+        self.dados = dados
+
+    @cached_property
+    def texto(self):
+        """Texto decodificado com quebras de linha normalizadas para '\\n'."""
+        texto = self.dados.decode('utf-8-sig')
+        if '\r' in texto:
+            texto = texto.replace('\r\n', '\n').replace('\r', '\n')
+        return texto
+
+    @cached_property
+    def linhas(self):
+        """Linhas físicas do texto, com o '\\n' final (como o readline as entrega)."""
+        return io.StringIO(self.texto).readlines()
+
+    @cached_property
+    def tokens(self):
+        """Fluxo de tokens gerado uma única vez para as análises léxicas."""
+        return list(tokenize.generate_tokens(io.StringIO(self.texto).readline))
+
+    @cached_property
+    def _parse(self):
+        try:
+            return ast.parse(self.texto, filename=self.caminho), None
+        except (SyntaxError, ValueError) as e:
+            return None, e
+
+    @property
+    def arvore(self):
+        """AST do arquivo; o erro de parse também é memorizado."""
+        arvore, erro = self._parse
+        if erro is not None:
+            raise erro
+        return arvore
+
+    @cached_property
+    def coleta(self):
+        """Resultado da travessia única da AST (imports, nomes, docstrings)."""
+        coletor = ColetorAST(self.texto)
+        coletor.visit(self.arvore)
+        return coletor
+
+    @cached_property
+    def blocos_complexidade(self):
+        """Blocos do radon calculados sobre a AST já existente."""
+        return importar('radon.complexity', 'radon').cc_visit_ast(self.arvore)
+
+
+def carregar_fonte(fonte):
+    """Aceita um caminho ou um ArquivoFonte já carregado."""
+    if isinstance(fonte, ArquivoFonte):
+        return fonte
+    return ArquivoFonte(fonte)
+
+
+class ColetorAST(ast.NodeVisitor):
+    """Visitor que reúne numa só travessia tudo que as análises de AST usam."""
+
+    METODOS_IGNORADOS = {'__str__', '__repr__', '__eq__', '__hash__'}
+
+    def __init__(self, texto):
+        self.texto = texto
+        self.imports_info = {}  # {nome: {'linha': int, 'tipo': str, 'original': str}}
+        self.used_names = set()
+        self.funcoes = []
+        self.funcoes_longas = 0
+        self.total_classes = 0
+        self.docstrings = []
+        self._funcoes_abertas = []  # [[node, tem_return], ...]
+        self._inicios_linha = None
+        # Índice de símbolos (ver indice_simbolos)
+        self.definicoes = []  # [[nome, tipo, linha], ...]
+        self.exportados = None  # [[nome, linha], ...] do __all__, se houver
+        self.importacoes = []  # [[modulo, nivel, nome, apelido], ...]
+        self.nomes_lidos = set()
+        self.cadeias = set()  # "base.attr.attr" com base num nome
+        self.atributos = set()  # atributos sobre expressões (chamadas, índices...)
+        self._escopos = []  # classes e funções abertas
+        self._cadeias_internas = set()
+
+    def _definir(self, node, tipo):
+        """Registra definições de módulo e métodos de classes sem base."""
+        decoradores = {d.id for d in node.decorator_list if isinstance(d, ast.Name)}
+        if len(decoradores) < len(node.decorator_list) or decoradores - _DECORADORES_NEUTROS:
+            # Decoradores costumam registrar a função (rotas, fixtures, plugins)
+            return
+        if not self._escopos:
+            self.definicoes.append([node.name, tipo, node.lineno])
+        elif (tipo == 'funcao' and len(self._escopos) == 1
+              and isinstance(self._escopos[0], ast.ClassDef)
+              and not self._escopos[0].bases and not self._escopos[0].keywords):
+            # Com base, o método pode sobrescrever um chamado pelo framework
+            self.definicoes.append([f"{self._escopos[0].name}.{node.name}", 'metodo', node.lineno])
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.importacoes.append([alias.name, 0, None, alias.asname])
+            name = alias.asname if alias.asname else alias.name.split('.')[0]
+            self.imports_info[name] = {
+                'linha': node.lineno,
+                'tipo': 'import',
+                'original': f"import {alias.name}" + (f" as {alias.asname}" if alias.asname else "")
+            }
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            self.importacoes.append([node.module or '', node.level, alias.name, alias.asname])
+            if alias.name == '*':
+                continue
+            name = alias.asname if alias.asname else alias.name
+            self.imports_info[name] = {
+                'linha': node.lineno,
+                'tipo': 'from_import',
+                'original': f"from {node.module or ''} import {alias.name}" + (
+                    f" as {alias.asname}" if alias.asname else "")
+            }
+
+    def visit_Name(self, node):
+        self.used_names.add(node.id)
+        if not isinstance(node.ctx, ast.Store):
+            self.nomes_lidos.add(node.id)
 
-def analisar_imports_nao_usados(filepath):
+    def visit_Attribute(self, node):
+        # Adiciona tanto o atributo quanto o objeto base
+        if isinstance(node.value, ast.Name):
+            self.used_names.add(node.value.id)
+        self.used_names.add(node.attr)
+
+        # Só a cadeia mais externa (a.b.c) entra no índice, não a.b
+        if id(node) in self._cadeias_internas:
+            self._cadeias_internas.discard(id(node))
+        else:
+            partes = [node.attr]
+            valor = node.value
+            while isinstance(valor, ast.Attribute):
+                self._cadeias_internas.add(id(valor))
+                partes.append(valor.attr)
+                valor = valor.value
+            if isinstance(valor, ast.Name):
+                partes.append(valor.id)
+                self.cadeias.add('.'.join(reversed(partes)))
+            else:
+                self.atributos.update(partes)
+        self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        self._exportar(node.targets, node.value, node)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        self._exportar([node.target], node.value, node)
+        self.generic_visit(node)
+
+    def _exportar(self, alvos, valor, node):
+        """Guarda os nomes literais de ``__all__ = [...]`` / ``__all__ += [...]``."""
+        if self._escopos or not any(isinstance(alvo, ast.Name) and alvo.id == '__all__'
+                                    for alvo in alvos):
+            return
+        if isinstance(valor, (ast.List, ast.Tuple)):
+            nomes = [elt.value for elt in valor.elts
+                     if isinstance(elt, ast.Constant) and isinstance(elt.value, str)]
+            if not isinstance(node, ast.AugAssign) or self.exportados is None:
+                self.exportados = []
+            self.exportados.extend([nome, node.lineno] for nome in nomes)
+
+    def visit_Return(self, node):
+        if node.value:
+            # Vale para todas as funções que envolvem o return (como o ast.walk antigo)
+            for aberta in self._funcoes_abertas:
+                aberta[1] = True
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node):
+        self._definir(node, 'classe')
+        self.total_classes += 1
+        doc = ast.get_docstring(node)
+        if not doc or len(doc.strip()) < 30:
+            self.docstrings.append({
+                "funcao": f"class {node.name}",
+                "lineno": node.lineno,
+                "motivo": "Docstring da classe ausente ou muito curta",
+                "tipo": "class"
+            })
+        self._escopos.append(node)
+        self.generic_visit(node)
+        self._escopos.pop()
+
+    def visit_AsyncFunctionDef(self, node):
+        self._definir(node, 'funcao')
+        self._escopos.append(node)
+        self.generic_visit(node)
+        self._escopos.pop()
+
+    def visit_FunctionDef(self, node):
+        self._definir(node, 'funcao')
+        self.funcoes.append(node)
+        if self._tamanho_segmento(node) > 150:
+            self.funcoes_longas += 1
+
+        aberta = [node, False]
+        self._funcoes_abertas.append(aberta)
+        self._escopos.append(node)
+        self.generic_visit(node)
+        self._escopos.pop()
+        self._funcoes_abertas.pop()
+
+        # Ignora métodos especiais simples (ex: __str__, __repr__)
+        if node.name in self.METODOS_IGNORADOS:
+            return
+
+        doc = ast.get_docstring(node)
+        problemas = []
+
+        if not doc:
+            problemas.append("Docstring ausente")
+        elif len(doc.strip()) < 30:
+            problemas.append("Docstring muito curta (< 30 caracteres)")
+        else:
+            # Verifica qualidade da docstring
+            doc_lower = doc.lower()
+            if len(
+                    node.args.args) > 1 and 'param' not in doc_lower and 'arg' not in doc_lower:
+                problemas.append("Não documenta parâmetros")
+            if aberta[1] and 'return' not in doc_lower:
+                problemas.append("Não documenta valor de retorno")
+
+        if problemas:
+            self.docstrings.append({
+                "funcao": node.name,
+                "lineno": node.lineno,
+                "motivo": "; ".join(problemas),
+                "tipo": "function"
+            })
+
+    def _tamanho_segmento(self, node):
+        """Equivale a len(ast.get_source_segment(...)) sem refatiar o arquivo."""
+        if self._inicios_linha is None:
+            inicios = [0]
+            pos = self.texto.find('\n')
+            while pos != -1:
+                inicios.append(pos + 1)
+                pos = self.texto.find('\n', pos + 1)
+            self._inicios_linha = inicios
+
+        inicio = self._posicao(node.lineno, node.col_offset)
+        fim = self._posicao(node.end_lineno, node.end_col_offset)
+        return fim - inicio
+
+    def _posicao(self, lineno, col_bytes):
+        """Converte (linha, coluna em bytes UTF-8) em posição no texto."""
+        inicio_linha = self._inicios_linha[lineno - 1]
+        trecho = self.texto[inicio_linha:inicio_linha + col_bytes]
+        if not trecho.isascii():
+            linha = self.texto[inicio_linha:].split('\n', 1)[0]
+            return inicio_linha + len(linha.encode('utf-8')[:col_bytes].decode('utf-8', 'ignore'))
+        return inicio_linha + col_bytes
+
+
+def analisar_imports_nao_usados(fonte):
     """Detecta imports não utilizados com análise aprimorada."""
-    if is_cached(filepath, 'imports'):
-        return load_from_cache(filepath, 'imports')
-
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        tree = ast.parse(content)
-        imports_info = {}  # {nome: {'linha': int, 'tipo': str, 'original': str}}
-        used_names = set()
-
-        # Coleta imports com informações detalhadas
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    name = alias.asname if alias.asname else alias.name.split('.')[
-                        0]
-                    imports_info[name] = {
-                        'linha': node.lineno,
-                        'tipo': 'import',
-                        'original': f"import {alias.name}" + (f" as {alias.asname}" if alias.asname else "")
-                    }
-            elif isinstance(node, ast.ImportFrom):
-                for alias in node.names:
-                    if alias.name == '*':
-                        continue
-                    name = alias.asname if alias.asname else alias.name
-                    imports_info[name] = {
-                        'linha': node.lineno,
-                        'tipo': 'from_import',
-                        'original': f"from {
-                            node.module or ''} import {
-                            alias.name}" + (
-                            f" as {
-                                alias.asname}" if alias.asname else "")}
-
-        # Coleta nomes usados de forma mais precisa
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Name):
-                used_names.add(node.id)
-            elif isinstance(node, ast.Attribute):
-                # Adiciona tanto o atributo quanto o objeto base
-                if isinstance(node.value, ast.Name):
-                    used_names.add(node.value.id)
-                used_names.add(node.attr)
-            elif isinstance(node, ast.Call):
-                # Trata chamadas de função
-                if isinstance(node.func, ast.Name):
-                    used_names.add(node.func.id)
-                elif isinstance(node.func, ast.Attribute) and isinstance(node.func.value, ast.Name):
-                    used_names.add(node.func.value.id)
+    try:
+        fonte = carregar_fonte(fonte)
+        coleta = fonte.coleta
+        used_names = set(coleta.used_names)
 
         # Nomes que devem ser sempre considerados como usados
         always_used = {
@@ -227,7 +1360,7 @@ def analisar_imports_nao_usados(filepath):
         used_names.update(always_used)
 
         unused_imports = []
-        for imp_name, imp_info in imports_info.items():
+        for imp_name, imp_info in coleta.imports_info.items():
             if imp_name not in used_names:
                 unused_imports.append({
                     "import": imp_name,
@@ -236,69 +1369,224 @@ def analisar_imports_nao_usados(filepath):
                     "declaracao_original": imp_info['original']
                 })
 
-        save_to_cache(filepath, 'imports', unused_imports)
         return unused_imports
-    except (OSError, SyntaxError):
+    except (OSError, SyntaxError, ValueError):
         return []
 
 
-def analisar_seguranca(filepath):
-    """Análise de segurança aprimorada com bandit."""
-    if is_cached(filepath, 'security'):
-        return load_from_cache(filepath, 'security')
+def _converter_issue_bandit(issue):
+    """Converte um item de ``results`` do bandit no formato do relatório."""
+    return {
+        "linha": issue.get('line_number', 0),
+        "severidade": issue.get('issue_severity', 'LOW'),
+        "descricao": issue.get('issue_text', ''),
+        "tipo": issue.get('test_id', ''),
+        "confianca": issue.get('issue_confidence', 'LOW')
+    }
 
-    try:
-        # Configuração mais robusta para análise de segurança
-        cmd = ["bandit", "-f", "json", "-ll", "--skip",
-               "B101", filepath]
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=20)  # Timeout aumentado
 
-        if result.returncode in [0, 1]:  # 1 = issues found
-            try:
-                data = json.loads(result.stdout)
-                issues = []
-                for issue in data.get('results', []):
-                    issues.append({
-                        "linha": issue.get('line_number', 0),
-                        "severidade": issue.get('issue_severity', 'LOW'),
-                        "descricao": issue.get('issue_text', ''),
-                        "tipo": issue.get('test_id', ''),
-                        "confianca": issue.get('issue_confidence', 'LOW')
-                    })
-
-                save_to_cache(filepath, 'security', issues)
-                return issues
-            except json.JSONDecodeError:
-                pass
-    except subprocess.TimeoutExpired:
-        print(f"⏰ Timeout na análise de segurança: {filepath}")
-    except FileNotFoundError:
-        if not hasattr(analisar_seguranca, '_warning_shown'):
-            print("⚠️  bandit não encontrado. Para instalar: pip install bandit")
-            analisar_seguranca._warning_shown = True
-    except Exception:
-        pass
+async def analisar_seguranca_lote_async(arquivos):
+    """Roda um único bandit sobre os arquivos sem cache e separa por arquivo.
+
+    O JSON do bandit é dividido pelo campo ``filename``; cada arquivo do
+    lote recebe sua lista (vazia quando não há problemas) e entra no cache.
+    Timeouts e ausência do bandit são propagados para quem chamou.
+    """
+    issues_por_arquivo = {}
+    pendentes = []
+    for arquivo in arquivos:
+        cache = load_from_cache(arquivo, 'security')
+        obter_medidor().acerto_cache('security', cache is not None)
+        if cache is not None:
+            issues_por_arquivo[arquivo] = cache
+        else:
+            pendentes.append(arquivo)
+
+    if not pendentes:
+        return issues_por_arquivo
+
+    # Configuração mais robusta para análise de segurança
+    # -q: sem ele o bandit escreve a barra de progresso no stdout, antes do JSON
+    cmd = ["bandit", "-q", "-f", "json", "-ll", "--skip", "B101", *pendentes]
+    result = await obter_agendador().processo('bandit', cmd, timeout_lote(
+        BANDIT_TIMEOUT, BANDIT_TIMEOUT_POR_ARQUIVO, BANDIT_TIMEOUT_POR_MB, pendentes))
+
+    if result.returncode not in [0, 1]:  # 1 = issues found
+        raise subprocess.SubprocessError(
+            f"bandit retornou {result.returncode}")
+
+    data = json.loads(result.stdout)
+    # O bandit pode prefixar './' nos caminhos relativos
+    por_caminho = {os.path.normpath(arquivo): arquivo for arquivo in pendentes}
+    novos = {arquivo: [] for arquivo in pendentes}
+    for issue in data.get('results', []):
+        arquivo = por_caminho.get(os.path.normpath(issue.get('filename', '')))
+        if arquivo is not None:
+            novos[arquivo].append(_converter_issue_bandit(issue))
 
+    for arquivo, issues in novos.items():
+        save_to_cache(arquivo, 'security', issues)
+    issues_por_arquivo.update(novos)
+    return issues_por_arquivo
+
+
+def analisar_seguranca_lote(arquivos):
+    """Versão bloqueante de analisar_seguranca_lote_async."""
+    return obter_agendador().executar(analisar_seguranca_lote_async(arquivos))
+
+
+# Ferramenta externa de cada etapa por subprocesso
+FERRAMENTAS_ETAPA = {'pep8': 'flake8', 'seguranca': 'bandit'}
+_ferramentas_ausentes = set()
+
+
+def ferramenta_ausente(ferramenta):
+    """Avisa uma vez que a ferramenta não está instalada e devolve "sem achados".
+
+    Ausência não é falha: impressao_configuracao registra quais ferramentas
+    existem, então esse resultado pode ir para o cache e é invalidado quando
+    a ferramenta for instalada.
+    """
+    if ferramenta not in _ferramentas_ausentes:
+        _ferramentas_ausentes.add(ferramenta)
+        print(f"⚠️  {ferramenta} não encontrado. Para instalar: pip install {ferramenta}")
     return []
 
 
-def analisar_metricas_maintainability(filepath):
+def _falha_seguranca(filepath, erro):
+    """Avisa sobre a falha do bandit em um arquivo e a registra no medidor.
+
+    Devolve None: timeout ou erro do bandit não é um resultado "sem achados"
+    e quem chamou não deve gravar o arquivo no cache. Bandit ausente devolve
+    ``[]`` (ver ferramenta_ausente).
+    """
+    if isinstance(erro, FileNotFoundError):
+        return ferramenta_ausente('bandit')
+    if isinstance(erro, subprocess.TimeoutExpired):
+        print(f"⏰ Timeout na análise de segurança: {filepath}")
+    else:
+        print(f"❌ Erro na análise de segurança de {filepath}: {str(erro)[:50]}...")
+    obter_medidor().falha('seguranca', filepath)
+    return None
+
+
+def analisar_seguranca(filepath, conteudo=None):
+    """Análise de segurança aprimorada com bandit; None se o bandit falhou
+    (timeout ou erro), ``[]`` se não está instalado."""
+    cache = load_from_cache(filepath, 'security', conteudo)
+    if cache is not None:
+        return cache
+
+    try:
+        return analisar_seguranca_lote([filepath])[filepath]
+    except Exception as e:
+        return _falha_seguranca(filepath, e)
+
+
+# Primeiro byte (após strip ASCII) de linhas que o str.strip pode esvaziar:
+# separadores \x1c-\x1f e espaços Unicode em UTF-8 (\x85, \xa0, \u1680, \u2000...)
+_INICIOS_ESPACO_UNICODE = frozenset(b'\x1c\x1d\x1e\x1f\xc2\xe1\xe2\xe3')
+_MARCAS_MULTILINHA = (b'"""', b"'''", b'\\\n', b'\\\r')
+
+
+def contar_linhas(buffer, tokens=None, por_caractere=False):
+    """``(total, codigo, comentario, vazias)`` numa só passada por ``buffer``.
+
+    ``buffer`` é qualquer objeto binário com ``readline`` (mmap, BytesIO).
+    Cada linha é classificada no momento em que é lida, sem lista de
+    linhas. Comentário é a linha cujo primeiro token é um COMMENT, então
+    ``#`` dentro de strings e docstrings não conta. Sem ``tokens``, o
+    tokenize consome o mesmo readline; se ele falhar (ou com
+    ``por_caractere``), vale a regra do primeiro caractere ``#``. As contagens equivalem a
+    ``texto.split('\\n')``: arquivo terminado em quebra de linha tem uma
+    linha vazia final.
+    """
+    total = vazias = comentarios = 0
+    final_aberto = True
+    segmentos = deque()
+
+    def ler():
+        nonlocal total, vazias, final_aberto
+        if segmentos:
+            linha = segmentos.popleft()
+        else:
+            linha = buffer.readline()
+            if not linha:
+                return linha
+            if b'\r' in linha:
+                # Quebras só com \r (raras): o tokenize recebe uma linha por vez
+                partes = linha.replace(b'\r\n', b'\n').replace(b'\r', b'\n').split(b'\n')
+                segmentos.extend(parte + b'\n' for parte in partes[:-1])
+                if partes[-1]:
+                    segmentos.append(partes[-1])
+                linha = segmentos.popleft()
+
+        final_aberto = linha.endswith(b'\n')
+        despida = linha[3:] if not total and linha.startswith(b'\xef\xbb\xbf') else linha
+        despida = despida.strip()
+        total += 1
+        if not despida or (despida[0] in _INICIOS_ESPACO_UNICODE
+                           and not despida.decode('utf-8', 'replace').strip()):
+            vazias += 1
+        return linha
+
+    if por_caractere:
+        tokens = ()
+    elif tokens is None:
+        tokens = tokenize.tokenize(ler)
+    # Comentário de linha: nenhum token termina antes dele na mesma linha
+    ultima_linha = 0
+    falhou = por_caractere
+    try:
+        for tok in tokens:
+            if tok.type == tokenize.COMMENT and tok.start[0] > ultima_linha:
+                comentarios += 1
+            ultima_linha = tok.end[0]
+    except (tokenize.TokenError, SyntaxError):
+        falhou = True
+    # O que o tokenize não leu (tudo, quando os tokens já vieram prontos)
+    while True:
+        linha = ler()
+        if not linha:
+            break
+        if falhou:
+            comentarios += linha.lstrip().startswith(b'#')
+
+    if final_aberto:
+        total += 1
+        vazias += 1
+    return total, total - vazias - comentarios, comentarios, vazias
+
+
+def metricas_linhas(fonte):
+    """``(total, codigo, comentario, vazias)`` de um caminho ou ArquivoFonte.
+
+    Um caminho é mapeado com mmap e tokenizado em fluxo: o pico de memória
+    fica perto do tamanho do arquivo. Um ArquivoFonte reaproveita os bytes
+    já lidos e os tokens que as outras etapas também usam.
+    """
+    if isinstance(fonte, ArquivoFonte):
+        try:
+            tokens = fonte.tokens
+        except (tokenize.TokenError, SyntaxError):
+            tokens = None
+        return contar_linhas(io.BytesIO(fonte.dados), tokens)
+
+    with open(fonte, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return contar_linhas(io.BytesIO())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            # Sem aspas triplas nem barra no fim da linha nenhuma string
+            # atravessa linhas: o primeiro caractere decide, sem tokenize
+            multilinha = any(buffer.find(marca) != -1 for marca in _MARCAS_MULTILINHA)
+            return contar_linhas(buffer, por_caractere=not multilinha)
+
+
+def analisar_metricas_maintainability(fonte):
     """Calcula métricas de maintainability."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        lines = content.split('\n')
-        total_lines = len(lines)
-        code_lines = len([line for line in lines if line.strip()
-                         and not line.strip().startswith('#')])
-        comment_lines = len(
-            [line for line in lines if line.strip().startswith('#')])
-        blank_lines = len([line for line in lines if not line.strip()])
+        fonte = carregar_fonte(fonte)
+        total_lines, code_lines, comment_lines, blank_lines = metricas_linhas(fonte)
 
         # Densidade de comentários
         comment_density = (
@@ -306,27 +1594,22 @@ def analisar_metricas_maintainability(filepath):
             total_lines *
             100) if total_lines > 0 else 0
 
-        # Análise de funções
-        tree = ast.parse(content)
-        functions = [
-            node for node in ast.walk(tree) if isinstance(
-                node, ast.FunctionDef)]
-        classes = [node for node in ast.walk(
-            tree) if isinstance(node, ast.ClassDef)]
+        # Análise de funções (travessia única compartilhada)
+        coleta = fonte.coleta
+        functions = coleta.funcoes
 
         avg_function_length = code_lines / len(functions) if functions else 0
 
         # Complexidade média
         try:
-            complexities = [bloco.complexity for bloco in cc_visit(content)]
+            complexities = [
+                bloco.complexity for bloco in fonte.blocos_complexidade]
             avg_complexity = sum(complexities) / \
                 len(complexities) if complexities else 0
         except (SyntaxError, TypeError):
             avg_complexity = 0
 
         # Métricas adicionais para empresas
-        funcoes_longas = len([f for f in functions if len(
-            ast.get_source_segment(content, f) or '') > 150])
         funcoes_sem_docstring = len(
             [f for f in functions if not ast.get_docstring(f)])
 
@@ -337,20 +1620,806 @@ def analisar_metricas_maintainability(filepath):
             "linhas_vazias": blank_lines,
             "densidade_comentarios": round(comment_density, 2),
             "total_funcoes": len(functions),
-            "total_classes": len(classes),
+            "total_classes": coleta.total_classes,
             "tamanho_medio_funcao": round(avg_function_length, 2),
             "complexidade_media": round(avg_complexity, 2),
-            "funcoes_longas": funcoes_longas,  # > 150 caracteres
+            "funcoes_longas": coleta.funcoes_longas,  # > 150 caracteres
             "funcoes_sem_docstring": funcoes_sem_docstring,
             "ratio_codigo_comentario": round((code_lines / comment_lines) if comment_lines > 0 else 0, 2)
         }
-    except (OSError, SyntaxError):
+    except (OSError, SyntaxError, ValueError):
+        return {}
+
+
+def analisar_complexidade(fonte):
+    """Lista blocos com complexidade ciclomática acima do limite."""
+    blocos = carregar_fonte(fonte).blocos_complexidade
+    return [
+        {
+            "funcao": bloco.name,
+            "lineno": bloco.lineno,
+            "complexidade": bloco.complexity,
+            "motivo": f"Complexidade {bloco.complexity} (limite: {LIMITE_COMPLEXIDADE})"
+        }
+        for bloco in blocos if bloco.complexity > LIMITE_COMPLEXIDADE
+    ]
+
+
+def analisar_docstrings(fonte):
+    """Análise aprimorada de docstrings do módulo, classes e funções."""
+    fonte = carregar_fonte(fonte)
+    docstrings = []
+
+    # Verifica docstring do módulo
+    module_doc = ast.get_docstring(fonte.arvore)
+    if not module_doc or len(module_doc.strip()) < 30:
+        docstrings.append({
+            "funcao": "__module__",
+            "lineno": 1,
+            "motivo": "Docstring do módulo ausente ou muito curta",
+            "tipo": "module"
+        })
+
+    # Ordem das linhas: estável, não depende da ordem de visita da AST
+    docstrings.extend(sorted(fonte.coleta.docstrings, key=lambda d: d["lineno"]))
+    return docstrings
+
+
+_LINHA_FLAKE8 = re.compile(r'^(.*?):(\d+):(\d+): ')
+
+
+async def analisar_pep8_lote_async(arquivos, jobs=1):
+    """Roda um único flake8 sobre um lote de arquivos e separa a saída por arquivo.
+
+    Cada linha ``caminho:linha:coluna: código mensagem`` volta para o arquivo
+    de origem exatamente como o flake8 a imprimiu.
+    """
+    violacoes = {arquivo: [] for arquivo in arquivos}
+    if not arquivos:
+        return violacoes
+
+    cmd = ["flake8", f"--jobs={jobs}", *FLAKE8_ARGS, *arquivos]
+    output = await obter_agendador().processo('flake8', cmd, timeout_lote(
+        FLAKE8_TIMEOUT, FLAKE8_TIMEOUT_POR_ARQUIVO, FLAKE8_TIMEOUT_POR_MB, arquivos))
+
+    for line in output.stdout.splitlines():
+        encontrado = _LINHA_FLAKE8.match(line)
+        if encontrado and encontrado.group(1) in violacoes:
+            violacoes[encontrado.group(1)].append(line)
+    return violacoes
+
+
+def analisar_pep8_lote(arquivos, jobs=1):
+    """Versão bloqueante de analisar_pep8_lote_async."""
+    return obter_agendador().executar(analisar_pep8_lote_async(arquivos, jobs))
+
+
+# Mesmas regras de ``# noqa`` do flake8 (flake8/defaults.py)
+_NOQA_LINHA = re.compile(
+    r"# noqa(?::[\s]?(?P<codes>([A-Z]+[0-9]+(?:[,\s]+)?)+))?", re.IGNORECASE)
+_NOQA_ARQUIVO = re.compile(r"\s*# flake8[:=]\s*noqa", re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def pep8_interno_incompativel():
+    """``{pacote: versão instalada}`` fora de PEP8_INTERNO_VERSOES (vazio se compatível)."""
+    fora = {}
+    for pacote, suportadas in PEP8_INTERNO_VERSOES.items():
+        versao = versao_ferramenta(pacote)
+        if versao is None or '.'.join(versao.split('.')[:2]) not in suportadas:
+            fora[pacote] = versao
+    return fora
+
+
+def pep8_interno_ativo():
+    """Se a checagem de estilo roda no processo (sem subprocesso do flake8)."""
+    return (PEP8_MOTOR == "interno" and PEP8_INTERNO_DISPONIVEL
+            and not pep8_interno_incompativel())
+
+
+def avisar_motor_pep8(ativos):
+    """Avisa quando PEP8_MOTOR = "interno" não pode ser usado e o flake8 assume."""
+    if 'pep8' not in ativos or PEP8_MOTOR != "interno" or pep8_interno_ativo():
+        return
+    if not PEP8_INTERNO_DISPONIVEL:
+        motivo = "pycodestyle/pyflakes/flake8 não instalados"
+    else:
+        motivo = ', '.join(f"{pacote} {versao}" for pacote, versao
+                           in pep8_interno_incompativel().items()) + " fora das versões suportadas"
+    print(f"⚠️  PEP8 interno indisponível ({motivo}): usando o flake8 em lote")
+
+
+@lru_cache(maxsize=None)
+def _motor_estilo():
+    """``(opções, FlakesChecker, _ColetorEstilo, _VerificadorEstilo)`` do PEP8 interno.
+
+    Importados na primeira checagem de estilo do processo. Importar o
+    autopep8 (modo correção) troca checagens do pycodestyle: o motor
+    interno usa sempre uma cópia do registro original, feita aqui, e
+    corrigir_resultados monta o motor antes de importar o autopep8.
+    """
+    pycodestyle = importar('pycodestyle', 'pep8')
+    FlakesChecker = importar('flake8.plugins.pyflakes', 'pep8').FlakesChecker
+    checagens = {tipo: dict(registro) for tipo, registro in pycodestyle._checks.items()}
+
+    class _ColetorEstilo(pycodestyle.BaseReport):
+        """Relatório do pycodestyle que só guarda ``(linha, coluna, texto)``."""
+
+        def init_file(self, *args, **kwargs):
+            self.achados = []
+            return super().init_file(*args, **kwargs)
+
+        def error(self, line_number, offset, text, check):
+            if super().error(line_number, offset, text, check):
+                self.achados.append((line_number, offset, text))
+
+    class _VerificadorEstilo(pycodestyle.Checker):
+        """Checker do pycodestyle alimentado pelos tokens do ArquivoFonte."""
+
+        # Como no flake8, ``# noqa`` é aplicado depois, por código
+        noqa = property(lambda self: False, lambda self, valor: None)
+
+        @property
+        def indent_char(self):
+            return self._indentacao
+
+        @indent_char.setter
+        def indent_char(self, valor):
+            # O flake8 mantém o primeiro caractere de indentação mesmo após um E101
+            if valor is None or getattr(self, '_indentacao', None) is None:
+                self._indentacao = valor
+
+        def __init__(self, fonte, relatorio):
+            super().__init__(fonte.caminho, lines=list(fonte.linhas),
+                             options=_motor_estilo()[0], report=relatorio)
+            self._tokens = fonte.tokens
+
+        def generate_tokens(self):
+            anterior = ''
+            for token in self._tokens:
+                if token.start[0] > self.total_lines:
+                    return
+                # Avança as linhas como o readline do tokenizer faria
+                while self.line_number < min(token.end[0], self.total_lines):
+                    self.readline()
+                self.maybe_check_physical(token, anterior)
+                yield token
+                anterior = token.line
+
+    # Opções equivalentes a FLAKE8_ARGS, montadas sobre o registro original
+    registro = pycodestyle._checks
+    pycodestyle._checks = checagens
+    try:
+        opcoes = pycodestyle.StyleGuide(
+            max_line_length=PEP8_MAX_LINHA, ignore=list(PEP8_IGNORAR)).options
+    finally:
+        pycodestyle._checks = registro
+    return opcoes, FlakesChecker, _ColetorEstilo, _VerificadorEstilo
+
+
+def _linhas_noqa(fonte):
+    """Texto onde o flake8 procura ``# noqa`` para cada linha.
+
+    Um comando que ocupa várias linhas (string multilinha, parênteses)
+    compartilha o texto de todas elas.
+    """
+    try:
+        tokens = fonte.tokens
+    except (SyntaxError, tokenize.TokenError):
         return {}
 
+    mapa = {}
+    inicio, fim = len(fonte.linhas) + 2, -1
+    for token in tokens:
+        if token.type in (tokenize.ENDMARKER, tokenize.DEDENT):
+            continue
+        inicio = min(inicio, token.start[0])
+        fim = max(fim, token.end[0])
+        if token.type in (tokenize.NL, tokenize.NEWLINE):
+            texto = ''.join(fonte.linhas[inicio - 1:fim])
+            mapa.update(dict.fromkeys(range(inicio, fim + 1), texto))
+            inicio, fim = len(fonte.linhas) + 2, -1
+    return mapa
+
+
+def _ignorado_noqa(codigo, texto):
+    """Se um ``# noqa`` no texto silencia o código (como o flake8)."""
+    encontrado = _NOQA_LINHA.search(texto)
+    if encontrado is None:
+        return False
+    codigos = encontrado.group('codes')
+    if codigos is None:
+        return True
+    codigos = tuple(c for c in re.split(r'[,\s]', codigos) if c)
+    return codigo.startswith(codigos)
+
+
+def analisar_pep8(fonte):
+    """PEP8 no próprio processo, sobre o texto, os tokens e a AST já carregados.
+
+    Roda o pycodestyle e o pyflakes com a semântica de FLAKE8_ARGS e devolve
+    as linhas ``caminho:linha:coluna: código mensagem`` na forma e na ordem
+    em que o flake8 as imprimiria, incluindo o E999 para erro de sintaxe e
+    os comentários ``# noqa``.
+    """
+    fonte = carregar_fonte(fonte)
+    if any(_NOQA_ARQUIVO.match(linha) for linha in fonte.linhas):
+        return []
+
+    achados = []
+    try:
+        arvore = fonte.arvore
+    except (SyntaxError, ValueError) as e:
+        # Sem AST o flake8 só reporta o erro de sintaxe
+        linha, coluna = 1, 0
+        if len(e.args) > 1 and e.args[1] and len(e.args[1]) > 2:
+            linha, coluna = e.args[1][1:3]
+        achados.append((linha, coluna or 0, f"E999 {type(e).__name__}: {e.args[0]}"))
+    else:
+        opcoes, FlakesChecker, ColetorEstilo, VerificadorEstilo = _motor_estilo()
+        achados.extend(
+            (linha, coluna, texto)
+            for linha, coluna, texto, _ in FlakesChecker(arvore, fonte.caminho).run())
+        relatorio = ColetorEstilo(opcoes)
+        VerificadorEstilo(fonte, relatorio).check_all()
+        achados.extend(relatorio.achados)
+
+    # O flake8 ordena por posição mantendo a ordem de emissão nos empates
+    achados.sort(key=lambda achado: achado[:2])
+    mapa_noqa = _linhas_noqa(fonte)
+    violacoes = []
+    for linha, coluna, texto in achados:
+        codigo = texto.split(' ', 1)[0]
+        if codigo.startswith(PEP8_IGNORAR):
+            continue
+        fisica = mapa_noqa.get(linha)
+        if fisica is None:
+            fisica = fonte.linhas[linha - 1] if 0 < linha <= len(fonte.linhas) else ''
+        if _ignorado_noqa(codigo, fisica):
+            continue
+        violacoes.append(f"{fonte.caminho}:{linha}:{coluna + 1}: {texto}")
+    return violacoes
+
+
+_TOKENS_IGNORADOS_DUPLICACAO = {
+    tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT,
+    tokenize.DEDENT, tokenize.ENCODING, tokenize.ENDMARKER
+}
+_PASTAS_IGNORADAS_DUPLICACAO = {'tests'}
+_MOD_HASH = (1 << 61) - 1
+_BASE_HASH = 1_000_003
+
+
+def ignorar_em_duplicacao(filepath):
+    """Mesmas exclusões usadas antes com o jscpd (tests, test_*)."""
+    partes = os.path.normpath(filepath).split(os.sep)
+    return (os.path.basename(filepath).startswith('test_')
+            or any(parte in _PASTAS_IGNORADAS_DUPLICACAO for parte in partes[:-1]))
+
+
+def impressoes_duplicacao(fonte):
+    """Impressões digitais (winnowing) do fluxo de tokens do arquivo.
+
+    Comentários e tokens de layout são descartados. Cada k-grama de tokens
+    recebe um hash polinomial rolante e, de cada janela de
+    DUPLICACAO_JANELA k-gramas, fica só o menor hash. Com
+    k = DUPLICACAO_MIN_TOKENS - DUPLICACAO_JANELA + 1, todo trecho repetido
+    com pelo menos DUPLICACAO_MIN_TOKENS tokens compartilha uma impressão.
+
+    Retorna ``[[hash, posição, linha_inicio, linha_fim], ...]``.
+    """
+    fonte = carregar_fonte(fonte)
+    if ignorar_em_duplicacao(fonte.caminho):
+        return []
+
+    try:
+        tokens = [
+            (zlib.crc32(tok.string.encode('utf-8')), tok.start[0], tok.end[0])
+            for tok in fonte.tokens if tok.type not in _TOKENS_IGNORADOS_DUPLICACAO]
+    except (tokenize.TokenError, SyntaxError):
+        return []
+
+    k = DUPLICACAO_MIN_TOKENS - DUPLICACAO_JANELA + 1
+    if len(tokens) < k:
+        return []
+
+    # Hash rolante de cada k-grama
+    potencia = pow(_BASE_HASH, k - 1, _MOD_HASH)
+    hashes = []
+    h = 0
+    for i, (token_hash, _, _) in enumerate(tokens):
+        if i >= k:
+            h = (h - tokens[i - k][0] * potencia) % _MOD_HASH
+        h = (h * _BASE_HASH + token_hash) % _MOD_HASH
+        if i >= k - 1:
+            hashes.append(h)
+
+    # Winnowing: mínimo mais à direita de cada janela (deque monotônica)
+    impressoes = []
+    janela = min(DUPLICACAO_JANELA, len(hashes))
+    candidatos = deque()
+    ultimo = -1
+    for j, valor in enumerate(hashes):
+        while candidatos and hashes[candidatos[-1]] >= valor:
+            candidatos.pop()
+        candidatos.append(j)
+        if candidatos[0] <= j - janela:
+            candidatos.popleft()
+        if j >= janela - 1 and candidatos[0] != ultimo:
+            ultimo = candidatos[0]
+            impressoes.append([
+                hashes[ultimo], ultimo,
+                tokens[ultimo][1], tokens[ultimo + k - 1][2]])
+    return impressoes
+
+
+def detectar_duplicacoes(impressoes):
+    """Junta as impressões de todos os arquivos num índice global de hashes.
+
+    Uma impressão é duplicada quando aparece em outro arquivo ou no mesmo
+    arquivo sem sobreposição. As impressões duplicadas de cada arquivo são
+    fundidas em trechos contíguos, e só os trechos com pelo menos
+    DUPLICACAO_MIN_TOKENS tokens entram no resultado.
+    """
+    k = DUPLICACAO_MIN_TOKENS - DUPLICACAO_JANELA + 1
+
+    # Primeira passada só conta; ocorrências são guardadas apenas para
+    # hashes repetidos, o que mantém o índice pequeno
+    contagem = {}
+    for lista in impressoes.values():
+        for impressao in lista:
+            contagem[impressao[0]] = contagem.get(impressao[0], 0) + 1
+
+    ocorrencias = {}
+    for arquivo, lista in impressoes.items():
+        for h, pos, inicio, fim in lista:
+            if contagem[h] > 1:
+                ocorrencias.setdefault(h, []).append((arquivo, pos, inicio, fim))
+
+    marcadas = {}
+    for lista in ocorrencias.values():
+        for arquivo, pos, inicio, fim in lista:
+            if any(outro != arquivo or abs(outra_pos - pos) >= k
+                   for outro, outra_pos, _, _ in lista):
+                marcadas.setdefault(arquivo, []).append((pos, inicio, fim))
 
-def analisar_arquivo_completo(filepath):
-    """Análise completa otimizada de um arquivo."""
-    resultado = {
+    duplicacoes = {}
+    for arquivo, lista in marcadas.items():
+        lista.sort()
+        trechos = []
+        pos_inicio, linha_inicio, linha_fim = lista[0]
+        pos_fim = pos_inicio + k
+        for pos, inicio, fim in lista[1:]:
+            if pos <= pos_fim:
+                pos_fim = max(pos_fim, pos + k)
+                linha_fim = max(linha_fim, fim)
+                continue
+            trechos.append((pos_inicio, pos_fim, linha_inicio, linha_fim))
+            pos_inicio, pos_fim, linha_inicio, linha_fim = pos, pos + k, inicio, fim
+        trechos.append((pos_inicio, pos_fim, linha_inicio, linha_fim))
+
+        encontrados = [
+            {"start": linha_inicio, "end": linha_fim, "motivo": "Código duplicado"}
+            for pos_inicio, pos_fim, linha_inicio, linha_fim in trechos
+            if pos_fim - pos_inicio >= DUPLICACAO_MIN_TOKENS]
+        if encontrados:
+            duplicacoes[arquivo] = encontrados
+
+    return duplicacoes
+
+
+_DECORADORES_NEUTROS = {'staticmethod', 'classmethod', 'property', 'cached_property'}
+
+
+def eh_arquivo_de_teste(filepath):
+    """Arquivos coletados pelo pytest: suas funções não são chamadas pelo projeto."""
+    nome = os.path.basename(filepath)
+    partes = os.path.normpath(filepath).split(os.sep)
+    return (nome.startswith('test_') or nome.endswith('_test.py') or nome == 'conftest.py'
+            or any(parte in ('tests', 'test') for parte in partes[:-1]))
+
+
+def nome_modulo(filepath):
+    """Nome pontuado do módulo a partir do caminho (``pkg/mod.py`` -> ``pkg.mod``)."""
+    partes = [parte for parte in os.path.normpath(os.path.splitext(filepath)[0]).split(os.sep)
+              if parte not in ('', '.', '..')]
+    if partes and partes[-1] == '__init__':
+        partes.pop()
+    return '.'.join(partes)
+
+
+class IndiceModulos:
+    """Nomes pontuados dos arquivos do projeto e a resolução de imports entre eles.
+
+    Imports relativos são resolvidos de forma exata; absolutos casam pelo
+    sufixo do caminho, o que cobre layouts como ``src/``.
+    """
+
+    def __init__(self, arquivos):
+        self.modulos = {arquivo: nome_modulo(arquivo) for arquivo in arquivos}
+        self.arquivos = {}  # módulo -> arquivos (.py e .pyi do mesmo módulo)
+        self._sufixos = {}
+        for arquivo, modulo in self.modulos.items():
+            self.arquivos.setdefault(modulo, []).append(arquivo)
+        for modulo in self.arquivos:
+            partes = modulo.split('.')
+            for i in range(len(partes)):
+                self._sufixos.setdefault('.'.join(partes[i:]), set()).add(modulo)
+
+    def resolver(self, nome, exato):
+        """Módulos do projeto com esse nome (conjunto vazio se externo)."""
+        if exato:
+            return {nome} if nome in self.arquivos else set()
+        return self._sufixos.get(nome, set())
+
+    def origem(self, arquivo, origem, nivel):
+        """Nome absoluto da origem de ``from <nivel pontos><origem> import ...``."""
+        if not nivel:
+            return origem
+        pacote = self.modulos[arquivo].split('.') if self.modulos[arquivo] else []
+        if not os.path.basename(arquivo).startswith('__init__.'):
+            pacote = pacote[:-1]
+        pacote = pacote[:max(0, len(pacote) - nivel + 1)]
+        return '.'.join(pacote + ([origem] if origem else []))
+
+    def dependencias(self, arquivo, importacoes):
+        """Módulos do projeto importados por ``arquivo``.
+
+        ``from pkg import mod`` conta como dependência de ``pkg.mod`` quando
+        ele é um módulo, e não do ``__init__`` do pacote.
+        """
+        modulos = set()
+        for origem, nivel, nome, _ in importacoes:
+            origem = self.origem(arquivo, origem, nivel)
+            if nome not in (None, '*'):
+                submodulos = self.resolver(f"{origem}.{nome}" if origem else nome, bool(nivel))
+                if submodulos:
+                    modulos |= submodulos
+                    continue
+            modulos |= self.resolver(origem, bool(nivel))
+        modulos.discard(self.modulos[arquivo])
+        return modulos
+
+
+def indice_simbolos(fonte):
+    """Peça do índice de símbolos do projeto, tirada da travessia única da AST.
+
+    Traz as definições de módulo (e métodos de classes sem base), o
+    ``__all__``, os imports, os nomes lidos e as cadeias de atributos. Os
+    caminhos dos módulos só são resolvidos na junção (detectar_codigo_morto),
+    então a peça depende apenas do conteúdo e vai para o cache. Retorna {}
+    se o arquivo não compila.
+    """
+    try:
+        coleta = carregar_fonte(fonte).coleta
+    except (OSError, SyntaxError, ValueError):
+        return {}
+    return {
+        'definicoes': coleta.definicoes,
+        'exportados': coleta.exportados,
+        'importacoes': coleta.importacoes,
+        'nomes': sorted(coleta.nomes_lidos),
+        'cadeias': sorted(coleta.cadeias),
+        'atributos': sorted(coleta.atributos)
+    }
+
+
+def detectar_codigo_morto(simbolos, indice=None):
+    """Junta as peças de todos os arquivos e aponta o que ninguém referencia.
+
+    Imports (inclusive relativos e ``*``) e cadeias como ``modulo.funcao``
+    viram referências qualificadas ``(módulo, nome)``; módulos importados
+    de forma absoluta casam pelo sufixo do caminho, o que cobre layouts
+    como ``src/``. Atributos sobre objetos desconhecidos (``obj.nome``) não
+    têm dono e valem para qualquer definição com aquele nome, como no
+    vulture. Funções, classes e métodos sem referência e nomes do
+    ``__all__`` não usados por outro módulo são reportados; arquivos de
+    teste entram só como usuários.
+    """
+    indice = indice or IndiceModulos(simbolos)
+    resolver = indice.resolver
+    referencias = set()
+    atributos = set()
+    for arquivo, pecas in simbolos.items():
+        if not pecas:
+            continue
+        ligacoes = {}  # nome local -> (módulo ou símbolo pontuado, relativo)
+        estrelas = set()
+        for origem, nivel, nome, apelido in pecas['importacoes']:
+            origem = indice.origem(arquivo, origem, nivel)
+            if nome is None:
+                raiz = origem if apelido else origem.split('.')[0]
+                ligacoes[apelido or raiz] = (raiz, bool(nivel))
+                continue
+            alvos = resolver(origem, bool(nivel))
+            if nome == '*':
+                estrelas.update(alvos)
+                continue
+            referencias.update((alvo, nome) for alvo in alvos)
+            ligacoes[apelido or nome] = (f"{origem}.{nome}" if origem else nome, bool(nivel))
+
+        referencias.update((alvo, nome) for alvo in estrelas for nome in pecas['nomes'])
+        for cadeia in pecas['cadeias']:
+            base, *partes = cadeia.split('.')
+            if base in ligacoes:
+                origem, exato = ligacoes[base]
+                # Prefixo mais longo que é um módulo do projeto
+                for i in range(len(partes) - 1, -1, -1):
+                    alvos = resolver('.'.join([origem, *partes[:i]]), exato)
+                    if alvos:
+                        referencias.update((alvo, partes[i]) for alvo in alvos)
+                        atributos.update(partes[i + 1:])
+                        break
+                else:
+                    atributos.update(partes)
+            else:
+                atributos.update(partes)
+        atributos.update(pecas['atributos'])
+
+    motivos = {'funcao': "Função não referenciada no projeto",
+               'classe': "Classe não referenciada no projeto",
+               'metodo': "Método não referenciado no projeto"}
+    codigo_morto = {}
+    for arquivo, pecas in simbolos.items():
+        if not pecas or eh_arquivo_de_teste(arquivo):
+            continue
+        modulo = indice.modulos[arquivo]
+        lidos = set(pecas['nomes'])
+        exportados = pecas['exportados'] or []
+        nomes_exportados = {nome for nome, _ in exportados}
+        encontrados = []
+        for nome, tipo, linha in pecas['definicoes']:
+            simples = nome.rpartition('.')[2]
+            if simples.startswith('__') and simples.endswith('__') or simples in atributos:
+                continue
+            if tipo != 'metodo' and (nome in lidos or nome in nomes_exportados
+                                     or (modulo, nome) in referencias):
+                continue
+            encontrados.append({"nome": nome, "tipo": tipo, "linha": linha,
+                                "motivo": motivos[tipo]})
+        for nome, linha in exportados:
+            if (modulo, nome) not in referencias and nome not in atributos:
+                encontrados.append({"nome": nome, "tipo": "exportacao", "linha": linha,
+                                    "motivo": "Exportado em __all__ e não usado no projeto"})
+        if encontrados:
+            codigo_morto[arquivo] = sorted(encontrados, key=lambda item: item["linha"])
+    return codigo_morto
+
+
+def grafo_imports(simbolos, indice=None):
+    """``{arquivo: [arquivos importados]}`` a partir das peças do índice de símbolos."""
+    indice = indice or IndiceModulos(simbolos)
+    grafo = {}
+    for arquivo, pecas in simbolos.items():
+        modulos = indice.dependencias(arquivo, pecas.get('importacoes', ()))
+        grafo[arquivo] = sorted(destino for modulo in modulos
+                                for destino in indice.arquivos[modulo])
+    return grafo
+
+
+def ciclos_imports(grafo):
+    """Ciclos de import: componentes fortemente conexas com mais de um arquivo.
+
+    Tarjan iterativo (projetos grandes estouram o limite de recursão).
+    """
+    indices, baixos = {}, {}
+    pilha, na_pilha = [], set()
+    ciclos = []
+
+    def abrir(no):
+        indices[no] = baixos[no] = len(indices)
+        pilha.append(no)
+        na_pilha.add(no)
+        return no, iter(grafo.get(no, ()))
+
+    for raiz in grafo:
+        if raiz in indices:
+            continue
+        trabalho = [abrir(raiz)]
+        while trabalho:
+            no, vizinhos = trabalho[-1]
+            for vizinho in vizinhos:
+                if vizinho not in indices:
+                    trabalho.append(abrir(vizinho))
+                    break
+                if vizinho in na_pilha:
+                    baixos[no] = min(baixos[no], indices[vizinho])
+            else:
+                trabalho.pop()
+                if trabalho:
+                    pai = trabalho[-1][0]
+                    baixos[pai] = min(baixos[pai], baixos[no])
+                if baixos[no] == indices[no]:
+                    componente = []
+                    while True:
+                        membro = pilha.pop()
+                        na_pilha.discard(membro)
+                        componente.append(membro)
+                        if membro == no:
+                            break
+                    if len(componente) > 1:
+                        ciclos.append(sorted(componente))
+    return sorted(ciclos, key=lambda ciclo: (-len(ciclo), ciclo))
+
+
+def secao_grafo_imports(grafo):
+    """Seção 🕸️_GRAFO_IMPORTS: ciclos e acoplamento (fan-in/fan-out) por arquivo."""
+    fan_in = {}
+    for destinos in grafo.values():
+        for destino in destinos:
+            fan_in[destino] = fan_in.get(destino, 0) + 1
+    acoplamento = {arquivo: {"fan_in": fan_in.get(arquivo, 0), "fan_out": len(destinos)}
+                   for arquivo, destinos in grafo.items() if destinos or arquivo in fan_in}
+
+    def topo(chave):
+        ordenados = sorted(acoplamento.items(), key=lambda item: (-item[1][chave], item[0]))
+        return {arquivo: dados[chave] for arquivo, dados in ordenados[:RANKING_TOPO]
+                if dados[chave]}
+
+    ciclos = ciclos_imports(grafo)
+    return {
+        "modulos": len(grafo),
+        "dependencias": sum(len(destinos) for destinos in grafo.values()),
+        "ciclos": {"total": len(ciclos), "arquivos": ciclos},
+        "maior_fan_in": topo("fan_in"),
+        "maior_fan_out": topo("fan_out"),
+        "acoplamento": acoplamento
+    }
+
+
+def dependentes_diretos(arquivos, alvos):
+    """Arquivos de ``arquivos`` que importam algum de ``alvos``.
+
+    Usa as importações gravadas no cache (tipo 'dependencias') a cada
+    análise, sem reabrir nem reparsear os arquivos intocados.
+    """
+    if not ENABLE_CACHE or not alvos:
+        return set()
+    try:
+        gravadas = obter_cache_store().todos('dependencias')
+    except (OSError, sqlite3.Error):
+        return set()
+
+    caminhos = {normalizar_caminho(arquivo): arquivo for arquivo in arquivos}
+    indice = IndiceModulos(set(arquivos) | set(alvos))
+    modulos_alvo = {indice.modulos[alvo] for alvo in alvos}
+    dependentes = set()
+    for chave, importacoes in gravadas.items():
+        arquivo = caminhos.get(chave)
+        if arquivo is not None and arquivo not in alvos and \
+                indice.dependencias(arquivo, importacoes) & modulos_alvo:
+            dependentes.add(arquivo)
+    return dependentes
+
+
+def juntar_pecas(impressoes, simbolos):
+    """Junções globais das peças por arquivo: ``(duplicacoes, codigo_morto, grafo)``.
+
+    ``grafo`` é a seção 🕸️_GRAFO_IMPORTS; nada é reparseado. Junções de
+    análises fora da seleção (analisadores_ativos) saem vazias.
+    """
+    ativos = analisadores_ativos()
+    duplicacoes, codigo_morto, grafo = {}, {}, {}
+    if 'duplicacao' in ativos:
+        with obter_medidor().medir('duplicacao'):
+            duplicacoes = detectar_duplicacoes(impressoes)
+    indice = IndiceModulos(simbolos)
+    if 'codigo_morto' in ativos:
+        with obter_medidor().medir('codigo_morto'):
+            codigo_morto = detectar_codigo_morto(simbolos, indice)
+    if 'grafo_imports' in ativos:
+        with obter_medidor().medir('grafo_imports'):
+            grafo = secao_grafo_imports(grafo_imports(simbolos, indice))
+    return duplicacoes, codigo_morto, grafo
+
+
+class Analisador:
+    """Uma análise do registro ANALISADORES (ver registrar_analisador)."""
+
+    def __init__(self, nome, executar, destino, entradas, custo, pool, peso, rotulo, etapa,
+                 exige_ast):
+        self.nome = nome
+        self.executar = executar
+        self.destino = destino
+        self.entradas = entradas
+        self.custo = custo
+        self.pool = pool
+        self.peso = peso
+        self.rotulo = rotulo
+        self.etapa = etapa or nome
+        self.exige_ast = exige_ast
+
+    @property
+    def rota(self):
+        """'cpu' (pool de CPU, sobre o ArquivoFonte) ou 'subprocesso' (lotes do agendador)."""
+        return self.pool() if callable(self.pool) else self.pool
+
+
+ANALISADORES = {}  # nome -> Analisador, na ordem em que rodam em analisar_fonte
+
+
+def registrar_analisador(nome, executar, destino, entradas=(), custo=1, pool='cpu',
+                         peso=None, rotulo=None, etapa=None, exige_ast=False):
+    """Registra uma análise por arquivo.
+
+    ``executar(fonte)`` roda no pool de CPU e o valor vai para
+    ``resultado[destino]`` ou, com destino 'impressoes'/'simbolos', para as
+    peças globais. ``entradas`` são as estruturas do ArquivoFonte que ela
+    lê ('bytes', 'tokens', 'ast', 'coleta', 'radon'): cada uma é montada
+    uma vez e dividida entre as análises ativas. ``custo`` é o peso
+    relativo usado pelo escalonador, ``peso`` a chave em PESOS com que cada
+    achado de ``resultado[destino]`` pesa no ranking (``rotulo`` descreve os
+    achados em "problemas"), ``etapa`` o nome no perfil e ``exige_ast`` pula
+    a análise em erro de sintaxe.
+    Análises de ``pool='subprocesso'`` rodam em lote em executar_analise.
+    """
+    ANALISADORES[nome] = Analisador(nome, executar, destino, tuple(entradas), custo, pool,
+                                    peso, rotulo, etapa, exige_ast)
+
+
+registrar_analisador('imports', analisar_imports_nao_usados, 'imports_nao_usados',
+                     entradas=('ast', 'coleta'), peso='imports_nao_usados',
+                     rotulo='imports não usados')
+registrar_analisador('metricas', analisar_metricas_maintainability, 'metricas',
+                     entradas=('bytes', 'tokens', 'ast', 'coleta', 'radon'), custo=4)
+registrar_analisador('duplicacao', impressoes_duplicacao, 'impressoes', entradas=('tokens',),
+                     custo=2, etapa='impressoes_duplicacao')
+# Código morto e grafo de imports dividem o mesmo índice de símbolos por arquivo
+registrar_analisador('codigo_morto', indice_simbolos, 'simbolos', entradas=('ast', 'coleta'),
+                     etapa='indice_simbolos')
+registrar_analisador('grafo_imports', indice_simbolos, 'simbolos', entradas=('ast', 'coleta'),
+                     etapa='indice_simbolos')
+registrar_analisador('pep8', analisar_pep8, 'pep8', entradas=('bytes', 'tokens', 'ast'),
+                     custo=8, pool=lambda: 'cpu' if pep8_interno_ativo() else 'subprocesso',
+                     peso='pep8', rotulo='violações PEP8')
+registrar_analisador('complexidade', analisar_complexidade, 'complexidade',
+                     entradas=('ast', 'coleta', 'radon'), peso='complexidade',
+                     rotulo='funções complexas', exige_ast=True)
+registrar_analisador('docstrings', analisar_docstrings, 'docstrings',
+                     entradas=('ast', 'coleta'), peso='docstring', rotulo='docstrings fracas',
+                     exige_ast=True)
+# bandit em lote (analisar_seguranca_lote_async)
+registrar_analisador('seguranca', None, 'seguranca', entradas=('bytes',), custo=10,
+                     pool='subprocesso', peso='seguranca', rotulo='problemas de segurança')
+
+
+def analisadores_ativos():
+    """Nomes das análises desta execução: ANALISADORES_SOMENTE menos ANALISADORES_PULAR."""
+    pedidos = set(ANALISADORES_SOMENTE or ANALISADORES) | set(ANALISADORES_PULAR)
+    desconhecidos = pedidos - set(ANALISADORES)
+    if desconhecidos:
+        raise ValueError(f"analisador desconhecido: {', '.join(sorted(desconhecidos))} "
+                         f"(disponíveis: {', '.join(ANALISADORES)})")
+    ativos = frozenset(nome for nome in ANALISADORES_SOMENTE or ANALISADORES
+                       if nome not in ANALISADORES_PULAR)
+    if not ativos:
+        raise ValueError("nenhum analisador selecionado")
+    return ativos
+
+
+def analise_completa(ativos=None):
+    """Se todas as análises registradas estão ativas."""
+    return len(analisadores_ativos() if ativos is None else ativos) == len(ANALISADORES)
+
+
+def filtrar_pecas(resultado, impressoes, simbolos):
+    """Restringe um resultado (do cache ou de um relatório) às análises ativas."""
+    ativos = analisadores_ativos()
+    if analise_completa(ativos):
+        return resultado, impressoes, simbolos
+    destinos = {ANALISADORES[nome].destino for nome in ativos}
+    filtrado = novo_resultado()
+    for chave in filtrado:
+        if chave in destinos:
+            filtrado[chave] = resultado.get(chave, filtrado[chave])
+    return (filtrado,
+            impressoes if 'impressoes' in destinos else [],
+            simbolos if 'simbolos' in destinos else {})
+
+
+def novo_resultado():
+    """Estrutura vazia do resultado de um arquivo."""
+    return {
         'pep8': [],
         'complexidade': [],
         'docstrings': [],
@@ -359,151 +2428,387 @@ def analisar_arquivo_completo(filepath):
         'metricas': {}
     }
 
+
+# ===== REPRESENTAÇÃO COMPACTA DOS ACHADOS =====
+# Resultados retidos até o relatório (executar_analise, relatório base do
+# modo incremental) guardam cada achado num registro com __slots__ em vez
+# de um dict, com caminhos, códigos e mensagens internados. O formato do
+# JSON só é montado por para_json, durante a serialização.
+
+class Registro:
+    """Base dos achados compactos.
+
+    ``chaves`` são as chaves do dict no relatório, na mesma ordem dos
+    ``__slots__`` (os nomes diferem onde a chave não é um identificador,
+    como ``import``).
+    """
+
+    __slots__ = ()
+    chaves = ()
+
+    def __init__(self, *valores):
+        for campo, valor in zip(self.__slots__, valores):
+            setattr(self, campo, valor)
+
+    @classmethod
+    def compactar(cls, achado):
+        """Registro equivalente a ``achado``; formatos inesperados voltam como vieram."""
+        if not isinstance(achado, dict) or tuple(achado) != cls.chaves:
+            return achado
+        return cls(*(sys.intern(valor) if isinstance(valor, str) else valor
+                     for valor in achado.values()))
+
+    def para_json(self):
+        return dict(zip(self.chaves, (getattr(self, campo) for campo in self.__slots__)))
+
+    def __eq__(self, outro):
+        return type(outro) is type(self) and self.para_json() == outro.para_json()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.para_json()!r})"
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, campo) for campo in self.__slots__)
+
+
+class ViolacaoPep8(Registro):
+    """``caminho:linha:coluna: código mensagem``, sem repetir o caminho por violação."""
+
+    __slots__ = ('arquivo', 'linha', 'coluna', 'codigo', 'mensagem')
+
+    @classmethod
+    def compactar(cls, achado):
+        encontrado = isinstance(achado, str) and _VIOLACAO_PEP8.match(achado)
+        if not encontrado:
+            return achado
+        arquivo, linha, coluna, codigo, mensagem = encontrado.groups()
+        violacao = cls(sys.intern(arquivo), int(linha), int(coluna), sys.intern(codigo),
+                       sys.intern(mensagem))
+        # Só se a linha volta idêntica (ex: zeros à esquerda não voltariam)
+        return violacao if violacao.para_json() == achado else achado
+
+    def para_json(self):
+        return f"{self.arquivo}:{self.linha}:{self.coluna}: {self.codigo} {self.mensagem}"
+
+
+_VIOLACAO_PEP8 = re.compile(r'^(.*?):(\d+):(\d+): (\S+) (.*)$', re.DOTALL)
+
+
+class FuncaoComplexa(Registro):
+    """Bloco acima de LIMITE_COMPLEXIDADE (analisar_complexidade)."""
+
+    __slots__ = ('funcao', 'lineno', 'complexidade', 'motivo')
+    chaves = __slots__
+
+
+class DocstringFraca(Registro):
+    """Docstring ausente ou fraca (analisar_docstrings)."""
+
+    __slots__ = ('funcao', 'lineno', 'motivo', 'tipo')
+    chaves = __slots__
+
+
+class ImportNaoUsado(Registro):
+    """Import não utilizado (analisar_imports_nao_usados)."""
+
+    __slots__ = ('nome', 'motivo', 'linha', 'declaracao')
+    chaves = ('import', 'motivo', 'linha', 'declaracao_original')
+
+
+class ProblemaSeguranca(Registro):
+    """Achado do bandit (_converter_issue_bandit)."""
+
+    __slots__ = ('linha', 'severidade', 'descricao', 'tipo', 'confianca')
+    chaves = __slots__
+
+
+class Metricas(Registro):
+    """Métricas de um arquivo (analisar_metricas_maintainability)."""
+
+    __slots__ = ('total_linhas', 'linhas_codigo', 'linhas_comentario', 'linhas_vazias',
+                 'densidade_comentarios', 'total_funcoes', 'total_classes',
+                 'tamanho_medio_funcao', 'complexidade_media', 'funcoes_longas',
+                 'funcoes_sem_docstring', 'ratio_codigo_comentario')
+    chaves = __slots__
+
+    def get(self, chave, padrao=None):
+        return getattr(self, chave, padrao) if chave in self.chaves else padrao
+
+
+REGISTROS_ACHADOS = {
+    'pep8': ViolacaoPep8,
+    'complexidade': FuncaoComplexa,
+    'docstrings': DocstringFraca,
+    'imports_nao_usados': ImportNaoUsado,
+    'seguranca': ProblemaSeguranca
+}
+
+
+def compactar_resultado(resultado):
+    """Cópia de um resultado com os achados em registros compactos.
+
+    Listas viram tuplas (sem sobra de alocação; vazias são todas a mesma)
+    e as métricas, um registro Metricas quando têm o formato completo.
+    """
+    compacto = dict(resultado)
+    for chave, registro in REGISTROS_ACHADOS.items():
+        if chave in compacto:
+            compacto[chave] = tuple(registro.compactar(achado) for achado in compacto[chave])
+    if compacto.get('metricas'):
+        compacto['metricas'] = Metricas.compactar(compacto['metricas'])
+    return compacto
+
+
+def para_json(objeto):
+    """``default`` do json.dump: registros compactos voltam ao formato do relatório."""
+    if isinstance(objeto, Registro):
+        return objeto.para_json()
+    raise TypeError(f"{type(objeto).__name__} não é serializável em JSON")
+
+
+def entrada_em_cache(filepath):
+    """Entrada completa do cache (resultado + impressões), se válida.
+
+    Só vale se a entrada cobre todas as análises ativas (uma entrada de
+    uma execução com --somente não serve a uma completa).
+    """
+    cache = load_from_cache(filepath, 'resultado')
+    if cache is not None and cache.get('fingerprint') == impressao_configuracao() and \
+            analisadores_ativos() <= set(cache.get('analisadores', ANALISADORES)):
+        obter_medidor().acerto_cache('resultado', True)
+        return cache
+    obter_medidor().acerto_cache('resultado', False)
+    return None
+
+
+def resultado_em_cache(filepath):
+    """Resultado completo em cache, se válido para a configuração atual."""
+    cache = entrada_em_cache(filepath)
+    return filtrar_pecas(cache['resultado'], [], {})[0] if cache is not None else None
+
+
+def salvar_resultado(filepath, resultado, impressoes, simbolos, conteudo=None, tempos=None):
+    """Guarda o resultado completo e as peças globais do arquivo (duplicação e símbolos).
+
+    Com ``tempos`` grava também o custo medido por etapa, histórico do
+    ModeloCusto na próxima execução.
+    """
+    ativos = analisadores_ativos()
+    save_to_cache(filepath, 'resultado', {
+        'fingerprint': impressao_configuracao(),
+        'analisadores': sorted(ativos),
+        'resultado': resultado,
+        'impressoes': impressoes,
+        'simbolos': simbolos
+    }, conteudo)
+    # Entrada pequena à parte: o plano incremental lê o grafo sem abrir os resultados
+    if ativos & {'codigo_morto', 'grafo_imports'}:
+        save_to_cache(filepath, 'dependencias', simbolos.get('importacoes', []), conteudo)
+    # O histórico do ModeloCusto é sempre o de uma análise completa
+    if tempos is not None and analise_completa(ativos):
+        save_to_cache(filepath, 'custo', {
+            'tempos': tempos,
+            'bytes': tamanho_arquivo(filepath),
+            'linhas': resultado['metricas'].get('total_linhas', 0)
+        }, conteudo)
+
+
+def tem_pecas_globais(cache):
+    """Entradas antigas, sem o índice de símbolos, precisam ser refeitas."""
+    return cache is not None and 'impressoes' in cache and 'simbolos' in cache
+
+
+def obter_pecas_globais(filepath):
+    """``(impressoes, simbolos)`` do cache ou, na falta dele, recalculadas."""
+    cache = entrada_em_cache(filepath)
+    if tem_pecas_globais(cache):
+        return cache['impressoes'], cache['simbolos']
+    try:
+        fonte = ArquivoFonte(filepath)
+        return impressoes_duplicacao(fonte), indice_simbolos(fonte)
+    except (OSError, ValueError):
+        return [], {}
+
+
+def analisar_fonte(filepath):
+    """Etapas em processo (CPU): imports, métricas, complexidade, docstrings,
+    impressões de duplicação, índice de símbolos e, com o motor interno, PEP8;
+    só as análises ativas (analisadores_ativos), na ordem do registro.
+
+    Retorna ``(resultado, cacheavel, impressoes, simbolos, tempos)``; ``cacheavel`` é
+    falso quando a falha não depende só do conteúdo (ex: erro de leitura) e
+    ``tempos`` traz os segundos gastos em cada etapa.
+    """
+    ativos = analisadores_ativos()
+    resultado = novo_resultado()
+    impressoes = []
+    simbolos = {}
+    tempos = {}
+    try:
+        # Leitura, tokenização e parse únicos; as análises de AST
+        # compartilham a mesma árvore e a mesma travessia
+        with cronometrar(tempos, 'leitura'):
+            fonte = ArquivoFonte(filepath)
+
+        # Só as análises ativas que rodam no pool de CPU; código morto e grafo
+        # de imports dividem o índice de símbolos, que roda uma vez
+        analisadores = []
+        for nome in ANALISADORES:
+            analisador = ANALISADORES[nome]
+            if nome in ativos and analisador.rota == 'cpu' and not any(
+                    (a.executar, a.destino) == (analisador.executar, analisador.destino)
+                    for a in analisadores):
+                analisadores.append(analisador)
+        entradas = {entrada for analisador in analisadores for entrada in analisador.entradas}
+
+        # Estruturas compartilhadas são montadas antes, para que cada
+        # análise seja medida só pelo próprio trabalho
+        for entrada, etapa, atributo in (('ast', 'parse', 'arvore'),
+                                         ('coleta', 'travessia_ast', 'coleta'),
+                                         ('radon', 'radon', 'blocos_complexidade')):
+            if entrada in entradas:
+                with cronometrar(tempos, etapa):
+                    try:
+                        getattr(fonte, atributo)
+                    except Exception:
+                        pass
+
+        sintaxe_ok = True
+        for analisador in analisadores:
+            if analisador.exige_ast:
+                try:
+                    fonte.arvore
+                except (SyntaxError, ValueError) as e:
+                    # Erro de sintaxe é determinístico: o resultado parcial vai para o cache
+                    if sintaxe_ok:
+                        print(f"❌ Erro analisando {filepath}: {str(e)[:50]}...")
+                    sintaxe_ok = False
+                    continue
+            with cronometrar(tempos, analisador.etapa):
+                valor = analisador.executar(fonte)
+            if analisador.destino == 'impressoes':
+                impressoes = valor
+            elif analisador.destino == 'simbolos':
+                simbolos = valor
+            else:
+                resultado[analisador.destino] = valor
+
+    except Exception as e:
+        print(f"❌ Erro analisando {filepath}: {str(e)[:50]}...")
+        return resultado, False, impressoes, simbolos, tempos
+
+    return resultado, True, impressoes, simbolos, tempos
+
+
+def analisar_fontes(arquivos, dir_perfil=None):
+    """Tarefa de um worker: analisa um bloco de arquivos em sequência.
+
+    Com ``dir_perfil`` o bloco roda sob o cProfile e as estatísticas são
+    gravadas ali, para serem unidas ao fim (ver juntar_perfis).
+    """
+    if dir_perfil is None:
+        return {arquivo: analisar_fonte(arquivo) for arquivo in arquivos}
+
+    perfil = importar('cProfile', 'perfil').Profile()
+    perfil.enable()
     try:
-        # PEP8 análise
-        cmd = [
-            "flake8",
-            "--max-line-length=100",
-            "--ignore=E501,W503",
-            filepath]
-        output = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=10)
-        if output.stdout.strip():
-            resultado['pep8'] = [
-                line for line in output.stdout.strip().split('\n') if line]
-
-        # Outras análises
-        resultado['imports_nao_usados'] = analisar_imports_nao_usados(filepath)
-        resultado['seguranca'] = analisar_seguranca(filepath)
-        resultado['metricas'] = analisar_metricas_maintainability(filepath)
-
-        # Complexidade
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        blocos = cc_visit(content)
-        resultado['complexidade'] = [
-            {
-                "funcao": bloco.name,
-                "lineno": bloco.lineno,
-                "complexidade": bloco.complexity,
-                "motivo": f"Complexidade {bloco.complexity} (limite: 10)"
-            }
-            for bloco in blocos if bloco.complexity > 10
-        ]
-
-        # Análise aprimorada de docstrings
-        tree = ast.parse(content)
-
-        # Verifica docstring do módulo
-        module_doc = ast.get_docstring(tree)
-        if not module_doc or len(module_doc.strip()) < 30:
-            resultado['docstrings'].append({
-                "funcao": "__module__",
-                "lineno": 1,
-                "motivo": "Docstring do módulo ausente ou muito curta",
-                "tipo": "module"
-            })
+        return {arquivo: analisar_fonte(arquivo) for arquivo in arquivos}
+    finally:
+        perfil.disable()
+        perfil.dump_stats(os.path.join(
+            dir_perfil, f"{os.getpid()}_{threading.get_ident()}_{time.perf_counter_ns()}.prof"))
 
-        # Verifica classes e suas funções
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                doc = ast.get_docstring(node)
-                if not doc or len(doc.strip()) < 30:
-                    resultado['docstrings'].append({
-                        "funcao": f"class {node.name}",
-                        "lineno": node.lineno,
-                        "motivo": "Docstring da classe ausente ou muito curta",
-                        "tipo": "class"
-                    })
-
-            elif isinstance(node, ast.FunctionDef):
-                # Ignora métodos especiais simples (ex: __init__ básicos)
-                if node.name.startswith('__') and node.name.endswith('__'):
-                    if node.name in [
-                        '__str__',
-                        '__repr__',
-                        '__eq__',
-                            '__hash__']:
-                        continue
 
-                doc = ast.get_docstring(node)
-                problemas = []
+def juntar_perfis(dir_perfil, destino):
+    """Une os perfis dos workers em ``destino`` e devolve o pstats.Stats (ou None)."""
+    arquivos = [os.path.join(dir_perfil, nome) for nome in os.listdir(dir_perfil)]
+    if not arquivos:
+        return None
+    pstats = importar('pstats', 'perfil')
+    pstats.Stats(*arquivos).dump_stats(destino)
+    return pstats.Stats(destino)
 
-                if not doc:
-                    problemas.append("Docstring ausente")
-                elif len(doc.strip()) < 30:
-                    problemas.append("Docstring muito curta (< 30 caracteres)")
-                else:
-                    # Verifica qualidade da docstring
-                    doc_lower = doc.lower()
-                    if len(
-                            node.args.args) > 1 and 'param' not in doc_lower and 'arg' not in doc_lower:
-                        problemas.append("Não documenta parâmetros")
-                    # Verifica se função tem return statements
-                    has_returns = any(
-                        isinstance(
-                            n, ast.Return) and n.value for n in ast.walk(node))
-                    if has_returns and 'return' not in doc_lower:
-                        problemas.append("Não documenta valor de retorno")
-
-                if problemas:
-                    resultado['docstrings'].append({
-                        "funcao": node.name,
-                        "lineno": node.lineno,
-                        "motivo": "; ".join(problemas),
-                        "tipo": "function"
-                    })
 
+def analisar_arquivo_completo(filepath, pep8=None, seguranca=None):
+    """Análise completa otimizada de um arquivo.
+
+    ``pep8`` e ``seguranca`` recebem os achados já obtidos pelo flake8 e
+    pelo bandit em lote; quando omitidos, a ferramenta roda só para este
+    arquivo (o PEP8 do motor interno sai de analisar_fonte).
+    """
+    # Resultado completo em cache: nenhum subprocesso e nenhum parse
+    resultado = resultado_em_cache(filepath)
+    if resultado is not None:
+        return filepath, resultado
+
+    ativos = analisadores_ativos()
+    try:
+        # PEP8 análise
+        if pep8 is None and 'pep8' in ativos and not pep8_interno_ativo():
+            try:
+                pep8 = analisar_pep8_lote([filepath])[filepath]
+            except FileNotFoundError:
+                pep8 = ferramenta_ausente('flake8')
+        falhou = False
+        if seguranca is None and 'seguranca' in ativos:
+            seguranca = analisar_seguranca(filepath)
+            # Bandit falhou: o arquivo sai sem achados, mas fora do cache
+            falhou = seguranca is None
     except Exception as e:
         print(f"❌ Erro analisando {filepath}: {str(e)[:50]}...")
+        return filepath, novo_resultado()
+
+    resultado, cacheavel, impressoes, simbolos, tempos = analisar_fonte(filepath)
+    obter_medidor().arquivo(filepath, tempos)
+    if pep8 is not None:
+        resultado['pep8'] = pep8
+    if seguranca is not None:
+        resultado['seguranca'] = seguranca
+    if cacheavel and not falhou:
+        salvar_resultado(filepath, resultado, impressoes, simbolos, tempos=tempos)
 
     return filepath, resultado
 
 
-def gerar_comandos_correcao(problemas, arquivos_problematicos):
-    """Gera comandos de auto-correção."""
+def comando_correcao(path):
+    """Argumentos que reexecutam este analisador em modo correção sobre ``path``.
+
+    Valem a partir do diretório atual (os scripts entram nele antes), para
+    que relatório e cache usem os mesmos caminhos desta execução.
+    ``--sem-auto-correcao`` impede que a própria execução reescreva o
+    script que a chamou.
+    """
+    return [os.path.abspath(__file__), "--corrigir", "--sem-auto-correcao",
+            "-o", RELATORIO_SAIDA, path]
+
+
+def gerar_comandos_correcao(path, problemas):
+    """Script bash de auto-correção.
+
+    A correção fica a cargo do modo --corrigir (autopep8 só com os códigos
+    apontados, isort, escrita atômica e reanálise), então o script não
+    lista arquivos nem depende do tamanho do projeto.
+    """
+    comando = ' '.join(f'"{parte}"' for parte in comando_correcao(path))
     comandos = [
         "#!/bin/bash",
         "# 🔧 Script de Auto-correção Gerado Automaticamente",
         "# Execute: bash auto_correcao.sh",
         "",
         "echo '🚀 Iniciando auto-correção...'",
-        ""
-    ]
-
-    # Verificação de dependências
-    comandos.extend([
+        f"cd \"{os.getcwd()}\" || exit 1",
+        "",
         "# Verificação de dependências",
         "echo '📦 Verificando dependências...'",
-        "command -v autopep8 >/dev/null 2>&1 || { echo 'autopep8 não encontrado. Instale com: pip install autopep8'; exit 1; }",
-        "command -v isort >/dev/null 2>&1 || { echo 'isort não encontrado. Instale com: pip install isort'; exit 1; }",
+        "PYTHON=$(command -v python3 || command -v python)",
+        "\"$PYTHON\" -c 'import autopep8' >/dev/null 2>&1 || { echo 'autopep8 não encontrado. "
+        "Instale com: pip install autopep8 isort'; exit 1; }",
+        "",
+        "# 🎨 PEP8 e imports: modo correção do analisador",
+        "echo '🎨 Corrigindo estilo PEP8 e organizando imports...'",
+        f"\"$PYTHON\" {comando} || exit 1",
         ""
-    ])
-
-    if problemas.get('pep8'):
-        # Corrigir caminhos para Linux/Mac (usar / ao invés de \)
-        arquivos_pep8 = []
-        for arquivo in problemas['pep8'].keys():
-            arquivo_unix = arquivo.replace('\\', '/').replace('./', '')
-            arquivos_pep8.append(f'"{arquivo_unix}"')
-
-        comandos.extend([
-            "# 🎨 Correção de estilo PEP8",
-            "echo '🎨 Corrigindo estilo PEP8...'",
-            f"autopep8 --in-place --aggressive --aggressive {
-                ' '.join(arquivos_pep8)}",
-            "echo 'PEP8 corrigido!'",
-            "",
-            "# 📦 Organização de imports",
-            "echo '📦 Organizando imports...'",
-            f"isort {' '.join(arquivos_pep8)}",
-            "echo 'Imports organizados!'",
-            ""
-        ])
+    ]
 
     if problemas.get('imports_nao_usados'):
         comandos.extend([
@@ -511,8 +2816,8 @@ def gerar_comandos_correcao(problemas, arquivos_problematicos):
             "echo '🧹 Removendo imports não utilizados...'",
             "# Instale unimport se necessário: pip install unimport",
             "if command -v unimport >/dev/null 2>&1; then",
-            "  unimport --remove-unused-imports --check --diff *.py",
-            "  echo 'Para aplicar: unimport --remove-unused-imports *.py'",
+            f"  unimport --check --diff \"{path}\"",
+            f"  echo 'Para aplicar: unimport --remove-unused-imports \"{path}\"'",
             "else",
             "  echo 'unimport não encontrado. Para instalar: pip install unimport'",
             "fi",
@@ -521,28 +2826,24 @@ def gerar_comandos_correcao(problemas, arquivos_problematicos):
 
     comandos.extend([
         "echo '✅ Auto-correção concluída!'",
-        "echo '📊 Execute o analisador novamente para verificar melhorias.'"
+        f"echo '📊 Relatório atualizado: {RELATORIO_SAIDA}'"
     ])
 
     return comandos
 
 
-def gerar_script_windows(pep8_arquivos, imports_arquivos):
-    """Gera script Windows otimizado com paralelismo controlado e 100% funcional."""
-
-    # Detectar número de núcleos disponíveis para paralelismo otimizado
-    import multiprocessing
-    num_cores = multiprocessing.cpu_count()
-    # Usar metade dos núcleos para evitar travamentos, mínimo 2, máximo 8
-    jobs_paralelos = max(2, min(8, num_cores // 2))
-
+def gerar_script_windows(path, imports_arquivos):
+    """Script Windows de auto-correção: ativa o venv, instala o que faltar e
+    roda o modo --corrigir (ver gerar_comandos_correcao)."""
+    comando = ' '.join(f'"{parte}"' for parte in comando_correcao(path))
     linhas = [
         "@echo off",
         "setlocal enabledelayedexpansion",
         "",
         "echo ==============================================",
-        f"echo CORRECAO AUTOMATICA PYTHON - PARALELISMO {jobs_paralelos} CORES",
+        "echo CORRECAO AUTOMATICA PYTHON",
         "echo ==============================================",
+        f"cd /d \"{os.getcwd()}\"",
         "",
         ":: Detectar e ativar ambiente virtual",
         "if exist \"venv\\Scripts\\activate.bat\" (",
@@ -581,89 +2882,35 @@ def gerar_script_windows(pep8_arquivos, imports_arquivos):
         "    )",
         ")",
         "",
-        "echo Iniciando correcoes com paralelismo controlado...",
-        "echo.",
-        ""]
-
-    # Gerar comandos de correção por arquivo específico (método que sabemos
-    # que funciona)
-    linhas.extend([
-        ":: Corrigir arquivos especificos (metodo 100%% testado)",
-        "echo [1/2] Aplicando correcoes PEP8 com paralelismo controlado...",
+        ":: PEP8 e imports: modo correcao do analisador (so os arquivos com achados)",
+        "echo Corrigindo PEP8 e organizando imports...",
+        f"python {comando}",
+        "if %errorlevel% neq 0 (",
+        "    echo ERRO: a correcao falhou",
+        "    pause",
+        "    exit /b 1",
+        ")",
         ""
-    ])
-
-    # Adicionar correções individuais para arquivos principais
-    arquivos_principais = [
-        "Analise_codigo_pro.py",
-        "arquivo_muito_problematico.py",
-        "__init__.py"
     ]
 
-    for arquivo in arquivos_principais:
-        linhas.extend([
-            f"if exist \"{arquivo}\" (",
-            f"    python -m autopep8 --in-place --aggressive --aggressive \"{arquivo}\"",
-            f"    echo [OK] {arquivo}",
-            ")"
-        ])
-
-    # Adicionar correções para diretórios usando processamento em lote
-    # controlado
-    linhas.extend([
-        "",
-        ":: Processar diretorios com paralelismo controlado",
-        f"echo Usando {jobs_paralelos} nucleos para processamento otimizado...",
-        "",
-        ":: Corrigir arquivos em src com paralelismo",
-        f"python -m autopep8 --in-place --aggressive --aggressive --recursive --jobs {jobs_paralelos} src",
-        "echo [OK] Diretorio src/ processado",
-        "",
-        ":: Organizar imports com paralelismo controlado",
-        "echo [2/2] Organizando imports...",
-        f"python -m isort . --profile black --jobs {jobs_paralelos} --skip=venv --skip=__pycache__ --skip=.git",
-        "echo [OK] Imports organizados",
-        ""
-    ])
-
     # Adicionar verificação opcional de imports não utilizados
     if imports_arquivos:
         linhas.extend([
             ":: Verificar imports nao utilizados (opcional)",
             "echo [EXTRA] Verificando imports nao utilizados...",
             "pip show unimport >nul 2>&1 && (",
-            "    unimport --check --diff .",
+            f"    unimport --check --diff \"{path}\"",
             ") || (",
             "    echo Para instalar: pip install unimport",
             ")",
             ""
         ])
 
-    # Finalizar script com resumo
     linhas.extend([
         "echo ==============================================",
-        "echo CORRECAO AUTOMATICA CONCLUIDA COM SUCESSO!",
+        "echo CORRECAO AUTOMATICA CONCLUIDA",
         "echo ==============================================",
-        "echo RESUMO:",
-        f"echo   Performance: {jobs_paralelos} nucleos utilizados",
-        "echo   PEP8: Correcoes aplicadas automaticamente",
-        "echo   Imports: Organizados automaticamente",
-        "echo   Metodo: Processamento controlado anti-travamento",
-        "",
-        "if %USING_VENV%==1 (",
-        "    echo   Ambiente: Virtual Environment (venv)",
-        ") else (",
-        "    echo   Ambiente: Python Global",
-        ")",
-        "",
-        "echo.",
-        "echo PROXIMO PASSO:",
-        "echo   Execute: python Analise_codigo_pro.py",
-        "echo.",
-        "echo DICAS DE PERFORMANCE:",
-        f"echo   • Seu sistema tem {num_cores} nucleos disponíveis",
-        f"echo   • Script otimizado para {jobs_paralelos} nucleos simultaneos",
-        "echo   • Paralelismo controlado evita travamentos",
+        f"echo Relatorio atualizado: {RELATORIO_SAIDA}",
         "echo.",
         "pause"
     ])
@@ -671,6 +2918,154 @@ def gerar_script_windows(pep8_arquivos, imports_arquivos):
     return linhas
 
 
+_CODIGO_PEP8 = re.compile(r':\d+:\d+: ([A-Z]+\d+) ')
+
+
+def hash_analisado(filepath):
+    """Hash do conteúdo que a análise viu: o registrado no cache ou, sem cache, o atual."""
+    if ENABLE_CACHE:
+        registrado = obter_cache_store().hash_salvo(filepath, 'resultado')
+        if registrado:
+            return registrado
+    return get_file_hash(filepath)
+
+
+def gravar_atomico(filepath, dados):
+    """Substitui o arquivo de uma vez (temporário no mesmo diretório + os.replace)."""
+    diretorio = os.path.dirname(os.path.abspath(filepath))
+    descritor, temporario = importar('tempfile', 'correcao').mkstemp(
+        dir=diretorio, prefix=".correcao_", suffix=".tmp")
+    try:
+        with os.fdopen(descritor, 'wb') as f:
+            f.write(dados)
+            f.flush()
+            os.fsync(f.fileno())
+        importar('shutil', 'correcao').copymode(filepath, temporario)
+        os.replace(temporario, filepath)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+def corrigir_arquivo(filepath, hash_esperado, codigos):
+    """Tarefa de um worker: autopep8 (só ``codigos``) e isort num arquivo.
+
+    Nada é gravado se o conteúdo não tem mais o hash visto pela análise.
+    Retorna ``(situacao, detalhe)`` com situacao ``corrigido``,
+    ``sem_mudanca``, ``alterado`` ou ``erro``.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            dados = f.read()
+        if get_file_hash(filepath, dados) != hash_esperado:
+            return 'alterado', "conteúdo mudou desde a análise"
+
+        bom = dados.startswith(b'\xef\xbb\xbf')
+        original = dados.decode('utf-8-sig')
+        texto = original
+        if codigos:
+            try:
+                autopep8 = importar('autopep8', 'correcao')
+            except ImportError:
+                return 'erro', "autopep8 não instalado (pip install autopep8)"
+            texto = autopep8.fix_code(texto, options={
+                'select': sorted(codigos),
+                'aggressive': 2,
+                'max_line_length': PEP8_MAX_LINHA})
+        try:
+            isort = importar('isort', 'correcao')
+        except ImportError:
+            pass
+        else:
+            texto = isort.code(texto, line_length=PEP8_MAX_LINHA)
+        if texto == original:
+            return 'sem_mudanca', ""
+
+        novos = (b'\xef\xbb\xbf' if bom else b'') + texto.encode('utf-8')
+        # Segunda checagem logo antes de gravar: reduz a janela de corrida
+        if get_file_hash(filepath) != hash_esperado:
+            return 'alterado', "conteúdo mudou durante a correção"
+        gravar_atomico(filepath, novos)
+        return 'corrigido', ""
+    except Exception as e:
+        return 'erro', str(e)[:100]
+
+
+def corrigir_resultados(resultados, impressoes, simbolos):
+    """Modo correção: corrige os arquivos com achados de PEP8 e reanalisa só eles.
+
+    autopep8 recebe apenas os códigos E/W apontados em cada arquivo e o
+    isort organiza os imports dos mesmos arquivos, num pool de processos.
+    ``resultados``, ``impressoes`` e ``simbolos`` são atualizados com a reanálise e a
+    seção 🔧_CORRECAO do relatório (antes/depois) é devolvida.
+    """
+    if pep8_interno_ativo():
+        # A reanálise pode rodar neste processo (ver _motor_estilo)
+        _motor_estilo()
+    try:
+        importar('autopep8', 'correcao')
+    except ImportError:
+        print("❌ autopep8 não instalado: o modo correção precisa dele (pip install autopep8 isort)")
+        return None
+
+    alvos = {}
+    for arquivo, resultado in resultados.items():
+        if resultado['pep8']:
+            alvos[arquivo] = {
+                codigo for violacao in resultado['pep8']
+                for codigo in ([violacao.codigo] if isinstance(violacao, ViolacaoPep8)
+                               else _CODIGO_PEP8.findall(violacao)) if codigo[0] in 'EW'}
+    if not alvos:
+        return None
+
+    def contar(arquivos):
+        return {chave: sum(len(resultados[arquivo][chave]) for arquivo in arquivos)
+                for chave in ('pep8', 'imports_nao_usados')}
+
+    antes = {arquivo: len(resultados[arquivo]['pep8']) for arquivo in alvos}
+    totais_antes = contar(alvos)
+    situacoes = {}
+    print(f"\n🔧 Corrigindo {len(alvos)} arquivo(s) com autopep8/isort...")
+
+    with criar_executor_cpu() as executor:
+        futures = {
+            executor.submit(corrigir_arquivo, arquivo, hash_analisado(arquivo), codigos): arquivo
+            for arquivo, codigos in alvos.items()}
+        for future, arquivo in futures.items():
+            situacoes[arquivo] = future.result()
+
+        corrigidos = [arquivo for arquivo, (situacao, _) in situacoes.items()
+                      if situacao == 'corrigido']
+        # Reanálise incremental: só o que mudou volta a ser analisado
+        novos, novas_impressoes, novos_simbolos = executar_analise(
+            corrigidos, executor_cpu=executor)
+    resultados.update(novos)
+    impressoes.update(novas_impressoes)
+    simbolos.update(novos_simbolos)
+    flush_cache()
+
+    totais_depois = contar(alvos)
+    alterados = sorted(a for a, (situacao, _) in situacoes.items() if situacao == 'alterado')
+    erros = {a: detalhe for a, (situacao, detalhe) in situacoes.items() if situacao == 'erro'}
+    print(f"   ✅ {len(corrigidos)} corrigido(s), "
+          f"{sum(1 for s, _ in situacoes.values() if s == 'sem_mudanca')} sem mudança, "
+          f"{len(alterados)} alterado(s) desde a análise, {len(erros)} erro(s)")
+    print(f"   📉 PEP8: {totais_antes['pep8']} → {totais_depois['pep8']} violações")
+    for arquivo, detalhe in erros.items():
+        print(f"   ❌ {arquivo}: {detalhe}")
+
+    return {
+        "corrigidos": sorted(corrigidos),
+        "alterados_desde_analise": alterados,
+        "erros": erros,
+        "antes": totais_antes,
+        "depois": totais_depois,
+        "pep8_por_arquivo": {arquivo: {"antes": antes[arquivo],
+                                       "depois": len(resultados[arquivo]['pep8'])}
+                             for arquivo in sorted(corrigidos)}
+    }
+
+
 def calcular_pontuacao_avancada(
         pep8,
         complexidade,
@@ -678,8 +3073,15 @@ def calcular_pontuacao_avancada(
         docstrings,
         imports,
         seguranca):
-    """Calcula pontuação com métricas avançadas."""
+    """Calcula pontuação com métricas avançadas.
+
+    Cada análise do registro com ``peso`` soma, por achado no seu
+    ``destino``, o valor em PESOS. A duplicação só entra na lista de
+    arquivos: ela não tem peso no ranking.
+    """
     pontuacoes = {}
+    achados = {'pep8': pep8, 'complexidade': complexidade, 'docstrings': docstrings,
+               'imports_nao_usados': imports, 'seguranca': seguranca}
     arquivos = set(pep8) | set(complexidade) | set(
         duplicacoes) | set(docstrings) | set(imports) | set(seguranca)
 
@@ -690,33 +3092,12 @@ def calcular_pontuacao_avancada(
             "categoria": "🟢 Baixa"
         }
 
-        # Pontuação por tipo de problema
-        if arq in pep8:
-            qtd = len(pep8[arq])
-            pontuacoes[arq]["pontuacao"] += qtd * PESOS["pep8"]
-            pontuacoes[arq]["problemas"].append(f"{qtd} violações PEP8")
-
-        if arq in complexidade:
-            qtd = len(complexidade[arq])
-            pontuacoes[arq]["pontuacao"] += qtd * PESOS["complexidade"]
-            pontuacoes[arq]["problemas"].append(f"{qtd} funções complexas")
-
-        if arq in imports:
-            qtd = len(imports[arq])
-            pontuacoes[arq]["pontuacao"] += qtd * PESOS["imports_nao_usados"]
-            pontuacoes[arq]["problemas"].append(f"{qtd} imports não usados")
-
-        if arq in seguranca:
-            qtd = len(seguranca[arq])
-            pontuacao_seg = qtd * PESOS["seguranca"]
-            pontuacoes[arq]["pontuacao"] += pontuacao_seg
-            pontuacoes[arq]["problemas"].append(
-                f"{qtd} problemas de segurança")
-
-        if arq in docstrings:
-            qtd = len(docstrings[arq])
-            pontuacoes[arq]["pontuacao"] += qtd * PESOS["docstring"]
-            pontuacoes[arq]["problemas"].append(f"{qtd} docstrings fracas")
+        # Pontuação por tipo de problema, com o peso de cada análise do registro
+        for analisador in ANALISADORES.values():
+            if analisador.peso and arq in achados[analisador.destino]:
+                qtd = len(achados[analisador.destino][arq])
+                pontuacoes[arq]["pontuacao"] += qtd * PESOS[analisador.peso]
+                pontuacoes[arq]["problemas"].append(f"{qtd} {analisador.rotulo}")
 
         # Categoria por pontuação
         score = pontuacoes[arq]["pontuacao"]
@@ -727,135 +3108,681 @@ def calcular_pontuacao_avancada(
         else:
             pontuacoes[arq]["categoria"] = "🟢 Baixa"
 
-    return dict(
-        sorted(
-            pontuacoes.items(),
-            key=lambda x: x[1]["pontuacao"],
-            reverse=True))
+    return dict(sorted(pontuacoes.items(), key=chave_ranking))
+
+
+def chave_ranking(item):
+    """Maior pontuação primeiro; empates pelo caminho, para que o ranking
+    não dependa da ordem de chegada (ex: mescla de shards)."""
+    arquivo, dados = item
+    return -dados["pontuacao"], arquivo
+
+
+def _inicializar_worker(configuracao=None):
+    """Estado local de cada processo do pool, criado uma vez e reaproveitado.
+
+    O cache nunca é compartilhado com o processo pai, e o Ctrl+C fica a
+    cargo do processo principal. ``configuracao`` repete as opções da
+    linha de comando (ver aplicar_configuracao).
+    """
+    global _cache_store
+    if configuracao:
+        aplicar_configuracao(configuracao)
+    _cache_store = None
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _aquecer_worker():
+    """Tarefa vazia: sobe o worker e monta o estado preguiçoso antes do primeiro pedido."""
+    impressao_configuracao()
+    if pep8_interno_ativo():
+        _motor_estilo()
+    return os.getpid()
+
+
+def criar_executor_cpu():
+    """Pool das etapas em processo: processos por padrão, threads como fallback."""
+    futures = importar('concurrent.futures', 'pool_cpu')
+    if MODO_EXECUCAO == "processos" and MAX_PROCESSOS > 1:
+        # spawn: fork com as threads do pool de subprocessos já ativas pode
+        # herdar locks travados. O worker recebe a configuração da linha de
+        # comando, que não está no módulo que ele importa
+        return futures.ProcessPoolExecutor(
+            max_workers=MAX_PROCESSOS,
+            mp_context=importar('multiprocessing', 'pool_cpu').get_context("spawn"),
+            initializer=_inicializar_worker, initargs=(dict(_configuracao_cli),))
+    return futures.ThreadPoolExecutor(max_workers=MAX_PROCESSOS)
+
+
+class ModeloCusto:
+    """Estimativa do custo de um arquivo (segundos das etapas em processo).
+
+    Arquivos já analisados partem dos tempos por etapa gravados no cache
+    (tipo 'custo'), escalados pela variação do tamanho desde então. Os
+    novos combinam tamanho e número de linhas pelas taxas medianas
+    (segundos/byte e segundos/linha) do histórico do projeto ou, sem
+    histórico nenhum, por CUSTO_POR_BYTE_PADRAO. Com só parte das análises
+    ativa, a estimativa é reduzida na proporção do ``custo`` registrado
+    das análises de CPU selecionadas.
+    """
+
+    def __init__(self):
+        cpu = [analisador for analisador in ANALISADORES.values() if analisador.rota == 'cpu']
+        ativos = analisadores_ativos()
+        self.fracao = (sum(a.custo for a in cpu if a.nome in ativos) /
+                       (sum(a.custo for a in cpu) or 1))
+        self.historico = {}
+        if ENABLE_CACHE:
+            try:
+                self.historico = obter_cache_store().todos('custo')
+            except (OSError, sqlite3.Error):
+                pass
+        por_byte = []
+        por_linha = []
+        for custo in self.historico.values():
+            total = sum(custo['tempos'].values())
+            if custo['bytes']:
+                por_byte.append(total / custo['bytes'])
+            if custo['linhas']:
+                por_linha.append(total / custo['linhas'])
+        self.por_byte = _percentil(sorted(por_byte), 0.5) if por_byte else CUSTO_POR_BYTE_PADRAO
+        self.por_linha = _percentil(sorted(por_linha), 0.5) if por_linha else None
+
+    @staticmethod
+    def _linhas(filepath):
+        try:
+            with open(filepath, 'rb') as f:
+                return sum(pedaco.count(b'\n') for pedaco in iter(lambda: f.read(1 << 20), b'')) + 1
+        except OSError:
+            return 0
+
+    def estimar(self, filepath):
+        """``(segundos estimados, se veio do histórico do próprio arquivo)``."""
+        tamanho = tamanho_arquivo(filepath)
+        anterior = self.historico.get(normalizar_caminho(filepath))
+        if anterior and anterior['bytes']:
+            return (sum(anterior['tempos'].values()) * tamanho / anterior['bytes'] * self.fracao,
+                    True)
+        estimado = tamanho * self.por_byte
+        if self.por_linha is not None:
+            estimado = (estimado + self._linhas(filepath) * self.por_linha) / 2
+        return estimado * self.fracao, False
+
+
+def executar_analise(arquivos, ao_concluir=None, executor_cpu=None, ao_resultado=None,
+                     dir_perfil=None):
+    """Analisa os arquivos e devolve ``({arquivo: resultado}, {arquivo: impressoes},
+    {arquivo: simbolos})``.
+
+    Acertos de cache são resolvidos antes de qualquer subprocesso. Os demais
+    seguem em paralelo: as etapas em processo (AST, radon, métricas e, com
+    o motor interno, PEP8) vão em blocos para o pool de CPU, enquanto bandit
+    e, se for o caso, flake8 rodam em lotes de LOTE_SUBPROCESSOS caminhos
+    pelo AgendadorFerramentas. O resultado de um arquivo é montado e gravado
+    no cache assim que todas as suas partes chegam. ``arquivos`` pode ser um
+    gerador: o envio começa antes de a descoberta terminar.
+
+    Os blocos de CPU saem do mais caro para o mais barato segundo o
+    ModeloCusto (LPT): só ficam 2 × MAX_PROCESSOS blocos em voo e o próximo
+    é escolhido quando um worker libera, já entre todos os arquivos
+    conhecidos até ali. Arquivos caros vão sozinhos; os baratos são
+    agrupados até somar CUSTO_BLOCO_S. Estimado e real vão para o perfil.
+
+    Só as análises ativas (analisadores_ativos) rodam: sem nenhuma de CPU
+    o pool de processos nem é criado, e sem bandit/flake8 nenhum lote vai
+    ao agendador.
+
+    ``executor_cpu`` recebe um pool de CPU já aquecido para ser
+    reaproveitado entre chamadas; sem ele, o pool vive só durante esta
+    chamada.
+
+    Com ``ao_resultado(arquivo, resultado)`` cada resultado é entregue assim
+    que fica pronto e não é retido no dicionário devolvido. ``dir_perfil``
+    liga o cProfile nas etapas em processo (ver analisar_fontes).
+    """
+    resultados = {}
+    impressoes = {}
+    simbolos = {}
+
+    def concluir(filepath, resultado, impressoes_arquivo, simbolos_arquivo):
+        filepath = sys.intern(filepath)
+        if ao_resultado:
+            ao_resultado(filepath, resultado)
+        else:
+            # Retido até o relatório: achados compactos (ver compactar_resultado)
+            resultados[filepath] = compactar_resultado(resultado)
+        impressoes[filepath] = impressoes_arquivo
+        simbolos[filepath] = simbolos_arquivo
+        if ao_concluir:
+            ao_concluir()
+
+    partes = {}
+    nao_cacheaveis = set()
+    em_andamento = {}
+    lotes_pep8 = []
+    lote = []
+    fila = []  # heap (-custo estimado, ordem, arquivo): o mais caro sai primeiro
+    blocos_cpu = set()
+    modelo = []
+
+    # Cada análise ativa segue a rota declarada no registro; com o motor
+    # interno o PEP8 chega junto com a parte 'fonte'
+    ativos = analisadores_ativos()
+    estagios = {'fonte' if ANALISADORES[nome].rota == 'cpu' else nome for nome in ativos}
+
+    with ExitStack() as pilha:
+        pools = []
+
+        def obter_pool_cpu():
+            # O pool só nasce no primeiro arquivo fora do cache
+            if not pools:
+                pools.append(executor_cpu or pilha.enter_context(criar_executor_cpu()))
+            return pools[0]
+
+        def enviar_lote():
+            if 'pep8' in estagios:
+                # Divide os núcleos entre os lotes que rodam ao mesmo tempo
+                simultaneos = sum(1 for future in lotes_pep8 if not future.done())
+                jobs = max(1, MAX_WORKERS // min(simultaneos + 1, MAX_WORKERS))
+                future = obter_agendador().submeter(analisar_pep8_lote_async(list(lote), jobs))
+                lotes_pep8.append(future)
+                em_andamento[future] = ('pep8', list(lote))
+            if 'seguranca' in estagios:
+                em_andamento[obter_agendador().submeter(
+                    analisar_seguranca_lote_async(list(lote)))] = ('seguranca', list(lote))
+            lote.clear()
+
+        def enfileirar(arquivo):
+            # O histórico só é lido no primeiro arquivo fora do cache
+            if not modelo:
+                modelo.append(ModeloCusto())
+            custo, historico = modelo[0].estimar(arquivo)
+            obter_medidor().estimativa(arquivo, custo, historico)
+            heapq.heappush(fila, (-custo, len(partes), arquivo))
+
+        def despachar():
+            # Só o suficiente para manter os workers ocupados: a escolha do
+            # próximo bloco espera um deles liberar
+            blocos_cpu.difference_update([future for future in blocos_cpu if future.done()])
+            while fila and len(blocos_cpu) < 2 * MAX_PROCESSOS:
+                bloco = []
+                custo_bloco = 0.0
+                while fila and len(bloco) < 32 and custo_bloco < CUSTO_BLOCO_S:
+                    custo, _, arquivo = heapq.heappop(fila)
+                    bloco.append(arquivo)
+                    custo_bloco -= custo
+                future = obter_pool_cpu().submit(analisar_fontes, bloco, dir_perfil)
+                em_andamento[future] = ('fonte', bloco)
+                blocos_cpu.add(future)
+
+        # ``arquivos`` pode ser um gerador (descoberta ainda em andamento):
+        # o trabalho é enviado aos pools à medida que os caminhos chegam
+        for arquivo in arquivos:
+            with obter_medidor().medir('cache'):
+                cache = entrada_em_cache(arquivo)
+            if tem_pecas_globais(cache):
+                concluir(arquivo, *filtrar_pecas(
+                    cache['resultado'], cache['impressoes'], cache['simbolos']))
+                continue
+
+            partes[arquivo] = {}
+            if 'fonte' in estagios:
+                enfileirar(arquivo)
+                despachar()
+            if estagios - {'fonte'}:
+                lote.append(arquivo)
+                if len(lote) >= LOTE_SUBPROCESSOS:
+                    enviar_lote()
+
+        if lote:
+            enviar_lote()
+
+        while em_andamento or fila:
+            despachar()
+            futures = importar('concurrent.futures', 'pool_cpu')
+            concluidos, _ = futures.wait(em_andamento, return_when=futures.FIRST_COMPLETED)
+            for future in concluidos:
+                estagio, arquivos_tarefa = em_andamento.pop(future)
+                try:
+                    achados = future.result()
+                except Exception as e:
+                    if isinstance(e, FileNotFoundError) and estagio in FERRAMENTAS_ETAPA:
+                        # Ferramenta ausente: não adianta repetir por arquivo,
+                        # e o resultado sem os achados dela é cacheável
+                        ferramenta_ausente(FERRAMENTAS_ETAPA[estagio])
+                        achados = {arquivo: [] for arquivo in arquivos_tarefa}
+                    elif len(arquivos_tarefa) > 1:
+                        # Lote falhou (timeout, erro da ferramenta, worker
+                        # perdido): cada arquivo roda sozinho, isolando o
+                        # arquivo problemático
+                        for arquivo in arquivos_tarefa:
+                            if estagio == 'pep8':
+                                novo = obter_agendador().submeter(
+                                    analisar_pep8_lote_async([arquivo]))
+                            elif estagio == 'seguranca':
+                                novo = obter_agendador().submeter(
+                                    analisar_seguranca_lote_async([arquivo]))
+                            else:
+                                # Numa thread: o pool de processos pode ter quebrado
+                                novo = obter_agendador().submeter(
+                                    importar('asyncio', 'agendador').to_thread(
+                                        analisar_fontes, [arquivo]))
+                            em_andamento[novo] = (estagio, [arquivo])
+                        continue
+                    else:
+                        # Falhou sozinho: o arquivo sai sem os achados da etapa,
+                        # registrado como falha e fora do cache
+                        arquivo = arquivos_tarefa[0]
+                        if estagio == 'seguranca':
+                            _falha_seguranca(arquivo, e)
+                        else:
+                            print(f"❌ Erro analisando {arquivo}: {str(e)[:50]}...")
+                            obter_medidor().falha(estagio, arquivo)
+                        nao_cacheaveis.add(arquivo)
+                        if estagio == 'fonte':
+                            achados = {arquivo: (novo_resultado(), False, [], {}, {})}
+                        else:
+                            achados = {arquivo: []}
+
+                for arquivo, valor in achados.items():
+                    partes[arquivo][estagio] = valor
+                    if len(partes[arquivo]) < len(estagios):
+                        continue
 
+                    parte = partes.pop(arquivo)
+                    resultado, cacheavel, impressoes_arquivo, simbolos_arquivo, tempos = \
+                        parte.get('fonte', (novo_resultado(), True, [], {}, {}))
+                    if tempos:
+                        obter_medidor().arquivo(arquivo, tempos)
+                    if 'pep8' in parte:
+                        resultado['pep8'] = parte['pep8']
+                    if 'seguranca' in parte:
+                        resultado['seguranca'] = parte['seguranca']
+                    if cacheavel and arquivo not in nao_cacheaveis:
+                        salvar_resultado(arquivo, resultado, impressoes_arquivo,
+                                         simbolos_arquivo, tempos=tempos)
+                    concluir(arquivo, resultado, impressoes_arquivo, simbolos_arquivo)
+
+    return resultados, impressoes, simbolos
+
+
+# Seções do relatório que guardam os achados por arquivo
+SECOES_DETALHADAS = {
+    'pep8': "violacoes_pep8",
+    'complexidade': "complexidade_alta",
+    'imports_nao_usados': "imports_nao_usados",
+    'seguranca': "problemas_seguranca",
+    'docstrings': "documentacao_fraca"
+}
 
-def main_pro(path):
-    """Função principal da versão Pro com robustez empresarial."""
-    print("🚀 ANALISADOR DE CÓDIGO PRO - Versão Avançada")
-    print("=" * 50)
 
-    # Validação inicial
-    if not os.path.exists(path):
-        print(f"❌ Caminho não encontrado: {path}")
-        return False
+def assinatura_arquivo(filepath):
+    """(mtime_ns, tamanho) usado para detectar alterações entre execuções."""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
 
-    if not os.path.isdir(path):
-        print(f"❌ Caminho não é um diretório: {path}")
-        return False
 
-    setup_cache()
-    inicio = time.time()
+def resultados_do_relatorio(relatorio):
+    """Reconstrói {arquivo: resultado} a partir de um relatório anterior."""
+    detalhada = relatorio.get("🔍_ANALISE_DETALHADA", {})
+    metricas = relatorio.get("📊_METRICAS_MAINTAINABILITY", {})
+    resultados = {}
+    for arquivo in relatorio.get("🧾_ARQUIVOS_ANALISADOS", {}):
+        resultado = novo_resultado()
+        for chave, secao in SECOES_DETALHADAS.items():
+            resultado[chave] = detalhada.get(secao, {}).get(arquivo, [])
+        resultado['metricas'] = metricas.get(arquivo, {})
+        resultados[sys.intern(arquivo)] = compactar_resultado(resultado)
+    return resultados
 
-    # Lista arquivos
-    arquivos = arquivos_python(path)
-    if not arquivos:
-        print("❌ Nenhum arquivo Python encontrado!")
-        return
 
-    print(f"📁 Encontrados {len(arquivos)} arquivos Python")
-    print(f"⚡ Processamento paralelo com {MAX_WORKERS} workers")
-    print(f"💾 Cache {'ativado' if ENABLE_CACHE else 'desativado'}")
+def arquivos_alterados_git(path, ref):
+    """Caminhos normalizados adicionados/modificados desde ``ref`` (None se o git falhar).
 
-    # Aviso para projetos muito grandes
-    if len(arquivos) > 1000:
-        print(f"🔥 Projeto grande detectado! ({len(arquivos)} arquivos)")
-        print("   • Cache recomendado para melhor performance")
-        print("   • Análise pode levar alguns minutos")
+    Inclui alterações ainda não commitadas e arquivos não rastreados.
+    """
+    comandos = [
+        ["git", "diff", "--name-only", "--relative", "--diff-filter=ACMRT", "-z", ref, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"]
+    ]
+    alterados = set()
+    for cmd in comandos:
+        try:
+            result = executar_ferramenta(
+                cmd, cwd=path, capture_output=True, text=True, timeout=60)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if result.returncode != 0:
+            return None
+        alterados.update(
+            normalizar_caminho(os.path.join(path, nome))
+            for nome in result.stdout.split('\0') if nome)
+    return alterados
+
+
+def resultados_do_jsonl(linhas):
+    """``(assinaturas, resultados)`` a partir dos registros de um relatório JSONL.
+
+    Uma última linha truncada (execução interrompida) é ignorada.
+    """
+    assinaturas = {}
+    resultados = {}
+    for linha in linhas:
+        try:
+            registro = json.loads(linha)
+        except json.JSONDecodeError:
+            continue
+        if registro.get("tipo") != "arquivo":
+            continue
+        arquivo = registro["arquivo"]
+        resultado = novo_resultado()
+        for chave, secao in SECOES_DETALHADAS.items():
+            resultado[chave] = registro.get(secao, [])
+        resultado['metricas'] = registro.get("metricas", {})
+        assinaturas[arquivo] = registro.get("assinatura")
+        resultados[sys.intern(arquivo)] = compactar_resultado(resultado)
+    return assinaturas, resultados
+
+
+def carregar_relatorio_base():
+    """``(assinaturas, resultados, analisadores)`` do relatório anterior no FORMATO_SAIDA atual.
+
+    Relatórios anteriores ao registro de analisadores contam como completos.
+    """
+    if FORMATO_SAIDA == "jsonl":
+        try:
+            with open(RELATORIO_JSONL, encoding='utf-8') as f:
+                try:
+                    cabecalho = json.loads(next(f, '{}'))
+                except json.JSONDecodeError:
+                    cabecalho = {}
+                return (*resultados_do_jsonl(f),
+                        cabecalho.get("analisadores", list(ANALISADORES)))
+        except OSError:
+            print(f"ℹ️  Relatório base {RELATORIO_JSONL} indisponível: análise completa")
+            return None
 
-    print()
+    try:
+        with open(RELATORIO_SAIDA, encoding='utf-8') as f:
+            relatorio = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        print(f"ℹ️  Relatório base {RELATORIO_SAIDA} indisponível: análise completa")
+        return None
+    analisadores = relatorio.get("🎯_RESUMO_EXECUTIVO_PRO", {}).get(
+        "📊_estatisticas_gerais", {}).get("analisadores", list(ANALISADORES))
+    return (relatorio.get("🧾_ARQUIVOS_ANALISADOS"), resultados_do_relatorio(relatorio),
+            analisadores)
+
+
+def planejar_incremental(path, arquivos):
+    """Separa o que precisa ser reanalisado do que vem do relatório anterior.
+
+    Retorna ``(resultados_reaproveitados, arquivos_para_analisar)`` ou None
+    quando não há relatório base utilizável (a análise volta a ser completa).
+    Arquivos removidos desde a última execução simplesmente não entram.
+    Os que importam um arquivo alterado ou removido (grafo de imports do
+    cache) também são reanalisados; com o conteúdo intacto, saem do cache.
+    Um relatório base que não cobre todas as análises ativas não serve.
+    """
+    base = carregar_relatorio_base()
+    if base is None:
+        return None
 
-    # Análise paralela com progresso
-    resultados_completos = {}
+    assinaturas_base, resultados_base, analisadores_base = base
+    if not assinaturas_base:
+        print("ℹ️  Relatório base sem assinaturas de arquivos: análise completa")
+        return None
+    faltando = analisadores_ativos() - set(analisadores_base)
+    if faltando:
+        print(f"ℹ️  Relatório base sem {', '.join(sorted(faltando))}: análise completa")
+        return None
 
-    if PROGRESS_AVAILABLE:
-        with tqdm(total=len(arquivos), desc="🔍 Analisando", unit="arquivo") as pbar:
-            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                futures = {
-                    executor.submit(
-                        analisar_arquivo_completo,
-                        arquivo): arquivo for arquivo in arquivos}
+    alterados_git = None
+    if INCREMENTAL_GIT_REF:
+        alterados_git = arquivos_alterados_git(path, INCREMENTAL_GIT_REF)
+        if alterados_git is None:
+            print(f"⚠️  git diff {INCREMENTAL_GIT_REF} falhou: comparando assinaturas")
+
+    reaproveitados = {}
+    para_analisar = []
+    for arquivo in arquivos:
+        if arquivo not in resultados_base:
+            alterado = True
+        elif alterados_git is not None:
+            alterado = normalizar_caminho(arquivo) in alterados_git
+        else:
+            alterado = assinatura_arquivo(arquivo) != assinaturas_base.get(arquivo)
 
-                for future in as_completed(futures):
-                    try:
-                        # Timeout dinâmico baseado no tamanho do projeto
-                        timeout = 30 if len(arquivos) > 1000 else 20
-                        filepath, resultado = future.result(timeout=timeout)
-                        resultados_completos[filepath] = resultado
-                        pbar.update(1)
-                    except Exception:
-                        pbar.update(1)
-    else:
-        # Fallback sem barra de progresso
-        print("🔍 Analisando arquivos...")
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {
-                executor.submit(
-                    analisar_arquivo_completo,
-                    arquivo): arquivo for arquivo in arquivos}
-
-            completed = 0
-            for future in as_completed(futures):
-                try:
-                    # Timeout dinâmico baseado no tamanho do projeto
-                    timeout = 30 if len(arquivos) > 1000 else 20
-                    filepath, resultado = future.result(timeout=timeout)
-                    resultados_completos[filepath] = resultado
-                    completed += 1
-                    # Progresso mais frequente para projetos grandes
-                    interval = 50 if len(arquivos) > 1000 else 5
-                    if completed % interval == 0:
-                        print(f"   📊 Processados: {completed}/{len(arquivos)}")
-                except Exception:
-                    completed += 1
-
-    # Processa resultados
-    pep8 = {k: v['pep8'] for k, v in resultados_completos.items() if v['pep8']}
-    complexidade = {k: v['complexidade']
-                    for k, v in resultados_completos.items() if v['complexidade']}
-    docstrings = {k: v['docstrings']
-                  for k, v in resultados_completos.items() if v['docstrings']}
-    imports = {k: v['imports_nao_usados']
-               for k, v in resultados_completos.items() if v['imports_nao_usados']}
-    seguranca = {k: v['seguranca']
-                 for k, v in resultados_completos.items() if v['seguranca']}
-    metricas = {k: v['metricas']
-                for k, v in resultados_completos.items() if v['metricas']}
-
-    # Análise de duplicações avançada (se jscpd disponível)
-    duplicacoes = {}
+        if alterado:
+            para_analisar.append(arquivo)
+        else:
+            reaproveitados[arquivo] = filtrar_pecas(resultados_base[arquivo], [], {})[0]
+
+    removidos = set(resultados_base) - set(arquivos)
+    dependentes = dependentes_diretos(list(reaproveitados), set(para_analisar) | removidos)
+    alterados = len(para_analisar)
+    for arquivo in arquivos:
+        if arquivo in dependentes:
+            para_analisar.append(arquivo)
+            del reaproveitados[arquivo]
+    print(f"♻️  Incremental: {alterados} alterado(s), {len(dependentes)} dependente(s), "
+          f"{len(reaproveitados)} reaproveitado(s), {len(removidos)} removido(s)")
+    return reaproveitados, para_analisar
+
+
+def interpretar_shard(texto):
+    """``"i/N"`` -> ``(i, N)``; levanta ValueError se inválido."""
     try:
-        output_file = "jscpd-report.json"
-        cmd = ["jscpd", "--min-tokens", "50", "--languages", "python",
-               "--output", ".", "--format", "json", "--ignore",
-               "venv,__pycache__,.git,node_modules,tests,test_*", path,
-               "--threshold", "1"]  # Configurações mais rigorosas para empresas
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120)  # Timeout aumentado
-
-        if os.path.exists(output_file):
-            with open(output_file, encoding="utf-8") as f:
-                data = json.load(f)
-                for match in data.get("duplicates", []):
-                    for file in match["files"]:
-                        nome = file["name"]
-                        duplicacoes.setdefault(nome, []).append({
-                            "start": file["start"]["line"],
-                            "end": file["end"]["line"],
-                            "motivo": "Código duplicado"
-                        })
-            os.remove(output_file)
-    except (OSError, json.JSONDecodeError):
-        pass
+        indice, total = (int(parte) for parte in str(texto).split('/'))
+    except ValueError:
+        raise ValueError(f"SHARD deve ter a forma i/N: {texto!r}") from None
+    if not 1 <= indice <= total:
+        raise ValueError(f"SHARD fora do intervalo 1..N: {texto!r}")
+    return indice, total
+
+
+def custos_historicos():
+    """Custo (segundos) por arquivo gravado em SHARD_HISTORICO, ou {}."""
+    if not SHARD_HISTORICO:
+        return {}
+    parcial = carregar_relatorio_parcial(SHARD_HISTORICO)
+    if parcial is None or not parcial[2]:
+        print(f"⚠️  {SHARD_HISTORICO} sem custos por arquivo: balanceando por tamanho")
+        return {}
+    return parcial[2].get("custo_arquivos_s", {})
+
+
+def fatia_shard(arquivos, indice, total, custos=None):
+    """Arquivos da fatia ``indice`` (1..total), idêntica em todas as máquinas.
+
+    O custo de cada arquivo vem de ``custos`` (histórico) ou, na falta
+    dele, do tamanho em bytes convertido pela mediana segundos/byte do
+    histórico. Os arquivos são distribuídos do mais caro para o mais
+    barato, sempre para a fatia mais leve (LPT); o caminho desempata, então
+    a partição só depende da lista de arquivos e dos custos.
+    """
+    custos = custos or {}
+    tamanhos = {arquivo: tamanho_arquivo(arquivo) for arquivo in arquivos}
+
+    razoes = sorted(custos[a] / tamanhos[a] for a in arquivos
+                    if a in custos and tamanhos[a])
+    por_byte = razoes[len(razoes) // 2] if razoes else 1.0
+    estimado = {a: custos[a] if a in custos else tamanhos[a] * por_byte for a in arquivos}
+
+    cargas = [(0.0, i) for i in range(1, total + 1)]
+    escolhidos = set()
+    for arquivo in sorted(arquivos, key=lambda a: (-estimado[a], a)):
+        carga, fatia = heapq.heappop(cargas)
+        if fatia == indice:
+            escolhidos.add(arquivo)
+        heapq.heappush(cargas, (carga + estimado[arquivo], fatia))
+    # Mantém a ordem de descoberta dentro da fatia
+    return [arquivo for arquivo in arquivos if arquivo in escolhidos]
+
+
+def secao_shard(impressoes, simbolos, custos_anteriores=None):
+    """Seção 🧩_SHARD de um relatório parcial.
+
+    Leva as impressões de duplicação e o índice de símbolos (duplicação e
+    código morto entre fatias são refeitos na mescla) e o custo medido de
+    cada arquivo, que serve de histórico para balancear as próximas
+    execuções.
+    """
+    custos = dict(custos_anteriores or {})
+    custos.update(obter_medidor().custos)
+    return {
+        "fatia": SHARD,
+        "impressoes_duplicacao": impressoes,
+        "indice_simbolos": simbolos,
+        "custo_arquivos_s": {arquivo: round(custos[arquivo], 6)
+                             for arquivo in impressoes if arquivo in custos}
+    }
+
+
+def carregar_relatorio_parcial(caminho):
+    """``(assinaturas, resultados, secao_shard, tempo)`` de um relatório JSON ou JSONL."""
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            if caminho.endswith('.jsonl'):
+                linhas = f.readlines()
+                assinaturas, resultados = resultados_do_jsonl(linhas)
+                secao, tempo = {}, 0
+                for linha in linhas:
+                    try:
+                        registro = json.loads(linha)
+                    except json.JSONDecodeError:
+                        continue
+                    if registro.get("tipo") == "shard":
+                        secao = registro
+                    elif registro.get("tipo") == "resumo":
+                        tempo = registro["📊_estatisticas_gerais"]["tempo_execucao_segundos"]
+                return assinaturas, resultados, secao, tempo
+            relatorio = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Relatório {caminho} ilegível: {str(e)[:50]}")
+        return None
+    tempo = relatorio.get("🎯_RESUMO_EXECUTIVO_PRO", {}).get(
+        "📊_estatisticas_gerais", {}).get("tempo_execucao_segundos", 0)
+    return (relatorio.get("🧾_ARQUIVOS_ANALISADOS", {}), resultados_do_relatorio(relatorio),
+            relatorio.get("🧩_SHARD", {}), tempo)
+
+
+def mesclar_relatorios(caminhos):
+    """Une relatórios parciais (SHARD) em RELATORIO_SAIDA como se fossem uma execução.
+
+    Resultados e assinaturas são unidos; duplicação, código morto e grafo
+    de imports são refeitos sobre as peças de todas as fatias, e ranking e resumo executivo são
+    recalculados por montar_relatorio. O tempo é o da fatia mais lenta.
+    """
+    print("🧩 ANALISADOR DE CÓDIGO PRO - Mescla de relatórios parciais")
+    print("=" * 50)
+    assinaturas, resultados, impressoes, simbolos, custos = {}, {}, {}, {}, {}
+    fatias = []
+    tempo = 0
+    for caminho in caminhos:
+        parcial = carregar_relatorio_parcial(caminho)
+        if parcial is None:
+            return False
+        assinaturas_parcial, resultados_parcial, secao, tempo_parcial = parcial
+        if "impressoes_duplicacao" not in secao:
+            print(f"❌ {caminho} não é um relatório parcial (sem seção 🧩_SHARD)")
+            return False
+        fatias.append(secao.get("fatia"))
+        assinaturas.update(assinaturas_parcial)
+        resultados.update(resultados_parcial)
+        impressoes.update(secao["impressoes_duplicacao"])
+        simbolos.update(secao.get("indice_simbolos", {}))
+        custos.update(secao.get("custo_arquivos_s", {}))
+        tempo = max(tempo, tempo_parcial)
+        print(f"   • {caminho}: fatia {secao.get('fatia')}, {len(resultados_parcial)} arquivos")
+
+    totais = {interpretar_shard(fatia)[1] for fatia in fatias if fatia}
+    if len(totais) == 1:
+        total = totais.pop()
+        faltando = sorted(set(range(1, total + 1)) - {interpretar_shard(f)[0] for f in fatias})
+        if faltando:
+            print(f"⚠️  Fatias ausentes: {', '.join(f'{i}/{total}' for i in faltando)}")
+    elif totais:
+        print(f"⚠️  Relatórios de partições diferentes: N = {sorted(totais)}")
+
+    duplicacoes, codigo_morto, grafo = juntar_pecas(impressoes, simbolos)
+    relatorio, ranking, _ = montar_relatorio(
+        list(assinaturas),
+        resultados,
+        duplicacoes,
+        tempo,
+        modo="mesclado",
+        assinaturas=assinaturas,
+        codigo_morto=codigo_morto,
+        grafo=grafo)
+    # Histórico de custos para balancear as próximas partições (SHARD_HISTORICO)
+    relatorio["🧩_SHARD"] = {"fatias": fatias, "custo_arquivos_s": custos}
+    salvar_relatorio(relatorio)
+
+    print(f"📁 Arquivos: {len(assinaturas)} | ⚠️  Com problemas: {len(ranking)} | "
+          f"🎯 Qualidade: {qualidade_percentual(len(assinaturas), len(ranking))}%")
+    print(f"📋 Relatório mesclado: {RELATORIO_SAIDA}")
+    return True
+
+
+def agrupar_resultados(resultados_completos):
+    """Separa os resultados por categoria, só com os arquivos que têm achados."""
+    return {
+        'pep8': {k: v['pep8'] for k, v in resultados_completos.items() if v['pep8']},
+        'complexidade': {k: v['complexidade']
+                         for k, v in resultados_completos.items() if v['complexidade']},
+        'docstrings': {k: v['docstrings']
+                       for k, v in resultados_completos.items() if v['docstrings']},
+        'imports_nao_usados': {k: v['imports_nao_usados']
+                               for k, v in resultados_completos.items() if v['imports_nao_usados']},
+        'seguranca': {k: v['seguranca']
+                      for k, v in resultados_completos.items() if v['seguranca']},
+        'metricas': {k: v['metricas']
+                     for k, v in resultados_completos.items() if v['metricas']}
+    }
+
+
+def secao_ranking(ranking):
+    """Seção 📈_RANKING_ARQUIVOS_PRO (mesmo formato no JSON e no JSONL)."""
+    return {
+        f"📍_arquivo_{i}": {
+            "nome": arquivo.replace(".\\", ""),
+            "pontuacao_total": dados["pontuacao"],
+            "categoria_risco": dados["categoria"],
+            "problemas_resumo": dados["problemas"]
+        }
+        for i, (arquivo, dados) in enumerate(ranking.items(), 1)
+    }
 
-    fim = time.time()
+
+def montar_relatorio(
+        arquivos,
+        resultados_completos,
+        duplicacoes,
+        tempo_execucao,
+        modo="completo",
+        arquivos_reanalisados=None,
+        assinaturas=None,
+        codigo_morto=None,
+        grafo=None,
+        gerar_scripts=False):
+    """Calcula o ranking e monta o relatório completo.
+
+    ``gerar_scripts`` indica que o chamador vai gravar os scripts de
+    auto-correção (só main_pro grava, e só se houver PEP8 ou imports).
+    Retorna ``(relatorio, ranking, grupos)``, onde ``grupos`` são os
+    achados separados por categoria (ver agrupar_resultados).
+    """
+    grupos = agrupar_resultados(resultados_completos)
+    pep8 = grupos['pep8']
+    complexidade = grupos['complexidade']
+    docstrings = grupos['docstrings']
+    imports = grupos['imports_nao_usados']
+    seguranca = grupos['seguranca']
+    metricas = grupos['metricas']
 
     # Calcula ranking avançado
     ranking = calcular_pontuacao_avancada(
@@ -873,17 +3800,25 @@ def main_pro(path):
     total_seguranca = sum(len(v) for v in seguranca.values())
     total_docstrings = sum(len(v) for v in docstrings.values())
 
+    if assinaturas is None:
+        assinaturas = {arquivo: assinatura_arquivo(arquivo) for arquivo in arquivos}
+    codigo_morto = codigo_morto or {}
+
     # Gera relatório
     relatorio = {
         "🎯_RESUMO_EXECUTIVO_PRO": {
             "📊_estatisticas_gerais": {
-                "versao": "Pro 2.0",
-                "tempo_execucao_segundos": round(fim - inicio, 2),
+                "versao": VERSAO,
+                "tempo_execucao_segundos": round(tempo_execucao, 2),
                 "total_arquivos_analisados": len(arquivos),
                 "arquivos_com_problemas": len(ranking),
                 "arquivos_limpos": len(arquivos) - len(ranking),
-                "percentual_qualidade": round((len(arquivos) - len(ranking)) / len(arquivos) * 100, 1),
-                "cache_hits": "Ativo" if ENABLE_CACHE else "Desativo"
+                "percentual_qualidade": qualidade_percentual(len(arquivos), len(ranking)),
+                "cache_hits": "Ativo" if ENABLE_CACHE else "Desativo",
+                "modo": modo,
+                "analisadores": sorted(analisadores_ativos()),
+                "arquivos_reanalisados": (len(arquivos) if arquivos_reanalisados is None
+                                          else arquivos_reanalisados)
             },
             "🔧_problemas_por_categoria_avancado": {
                 "pep8_style": {"total": total_pep8, "arquivos": len(pep8)},
@@ -891,19 +3826,14 @@ def main_pro(path):
                 "imports_nao_usados": {"total": total_imports, "arquivos": len(imports)},
                 "seguranca": {"total": total_seguranca, "arquivos": len(seguranca)},
                 "documentacao": {"total": total_docstrings, "arquivos": len(docstrings)},
-                "duplicacao": {"total": sum(len(v) for v in duplicacoes.values()), "arquivos": len(duplicacoes)}
+                "duplicacao": {"total": sum(len(v) for v in duplicacoes.values()),
+                               "arquivos": len(duplicacoes)},
+                "codigo_morto": {"total": sum(len(v) for v in codigo_morto.values()),
+                                 "arquivos": len(codigo_morto)}
             }
         },
 
-        "📈_RANKING_ARQUIVOS_PRO": {
-            f"📍_arquivo_{i}": {
-                "nome": arquivo.replace(".\\", ""),
-                "pontuacao_total": dados["pontuacao"],
-                "categoria_risco": dados["categoria"],
-                "problemas_resumo": dados["problemas"]
-            }
-            for i, (arquivo, dados) in enumerate(ranking.items(), 1)
-        },
+        "📈_RANKING_ARQUIVOS_PRO": secao_ranking(ranking),
 
         "🔍_ANALISE_DETALHADA": {
             "violacoes_pep8": pep8,
@@ -911,13 +3841,20 @@ def main_pro(path):
             "imports_nao_usados": imports,
             "problemas_seguranca": seguranca,
             "documentacao_fraca": docstrings,
-            "codigo_duplicado": duplicacoes
+            "codigo_duplicado": duplicacoes,
+            "codigo_morto": codigo_morto
         },
 
         "📊_METRICAS_MAINTAINABILITY": metricas,
 
+        # Ciclos e acoplamento entre módulos (ver secao_grafo_imports)
+        "🕸️_GRAFO_IMPORTS": grafo or {},
+
+        # Base do modo incremental: arquivos analisados e suas assinaturas
+        "🧾_ARQUIVOS_ANALISADOS": assinaturas,
+
         "🛠️_AUTO_CORRECAO": {
-            "script_gerado": AUTO_CORRECAO,
+            "script_gerado": bool(gerar_scripts and (pep8 or imports)),
             "comandos_disponiveis": [
                 "autopep8 --in-place --aggressive *.py",
                 "black *.py",
@@ -927,26 +3864,394 @@ def main_pro(path):
         }
     }
 
-    # Salva relatório
-    with open(RELATORIO_SAIDA, 'w', encoding='utf-8') as f:
-        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    return relatorio, ranking, grupos
+
+
+def qualidade_percentual(total_arquivos, arquivos_com_problemas):
+    """Percentual de arquivos sem problemas."""
+    if not total_arquivos:
+        return 100.0
+    return round((total_arquivos - arquivos_com_problemas) / total_arquivos * 100, 1)
+
+
+def salvar_relatorio(relatorio):
+    """Grava o relatório JSON de forma atômica (leitores nunca veem meio arquivo)."""
+    temporario = f"{RELATORIO_SAIDA}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False, default=para_json)
+    os.replace(temporario, RELATORIO_SAIDA)
+
+
+class _PosicaoRanking:
+    """Ordem do heap do topo: o menor é o último colocado (ver chave_ranking)."""
+
+    __slots__ = ('chave',)
+
+    def __init__(self, filepath, pontuacao):
+        self.chave = chave_ranking((filepath, pontuacao))
+
+    def __lt__(self, outro):
+        return self.chave > outro.chave
+
+
+class RelatorioStreaming:
+    """Relatório JSONL gravado à medida que os arquivos terminam.
+
+    Cada linha é um registro independente: um ``cabecalho``, um ``arquivo``
+    por arquivo analisado (achados, métricas, pontuação e assinatura), um
+    ``duplicacao`` por arquivo com trechos duplicados, um ``codigo_morto``
+    por arquivo com símbolos não referenciados, o ``grafo_imports`` e, por fim, o
+    ``resumo`` com os agregados (ranking no mesmo formato do JSON, ver
+    secao_ranking). Só contadores, os nomes dos arquivos com
+    problemas e o topo do ranking ficam em memória; um arquivo sem
+    ``resumo`` indica uma execução interrompida, mas os registros já
+    gravados continuam válidos.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'w', encoding='utf-8', buffering=1)
+        self.total_arquivos = 0
+        self.totais = {chave: {"total": 0, "arquivos": 0}
+                       for chave in (*SECOES_DETALHADAS, 'duplicacao', 'codigo_morto')}
+        self.com_problemas = set()
+        self.arquivos_pep8 = set()
+        self.arquivos_imports = set()
+        self._topo = []  # heap com os RANKING_TOPO maiores
+        self._gravar({"tipo": "cabecalho", "versao": VERSAO,
+                      "inicio": time.strftime('%Y-%m-%dT%H:%M:%S'),
+                      "analisadores": sorted(analisadores_ativos())})
+
+    def _gravar(self, registro):
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False, default=para_json) + '\n')
+
+    def arquivo(self, filepath, resultado):
+        """Grava o registro de um arquivo e atualiza os agregados."""
+        self.total_arquivos += 1
+        achados = {chave: {filepath: resultado[chave]} if resultado[chave] else {}
+                   for chave in SECOES_DETALHADAS}
+        pontuacao = calcular_pontuacao_avancada(
+            achados['pep8'],
+            achados['complexidade'],
+            {},
+            achados['docstrings'],
+            achados['imports_nao_usados'],
+            achados['seguranca']).get(filepath)
+
+        registro = {"tipo": "arquivo", "arquivo": filepath,
+                    "assinatura": assinatura_arquivo(filepath)}
+        for chave, secao in SECOES_DETALHADAS.items():
+            registro[secao] = resultado[chave]
+            if resultado[chave]:
+                self.totais[chave]["total"] += len(resultado[chave])
+                self.totais[chave]["arquivos"] += 1
+        registro["metricas"] = resultado['metricas']
+        if pontuacao:
+            registro.update(pontuacao)
+            self.com_problemas.add(filepath)
+            self._no_topo(filepath, pontuacao)
+        if resultado['pep8']:
+            self.arquivos_pep8.add(filepath)
+        if resultado['imports_nao_usados']:
+            self.arquivos_imports.add(filepath)
+        self._gravar(registro)
+
+    def _no_topo(self, filepath, pontuacao):
+        item = (_PosicaoRanking(filepath, pontuacao), filepath, pontuacao)
+        if len(self._topo) < RANKING_TOPO:
+            heapq.heappush(self._topo, item)
+        elif self._topo[0][0] < item[0]:
+            heapq.heapreplace(self._topo, item)
+
+    def shard(self, secao):
+        """Grava a seção de relatório parcial (ver secao_shard)."""
+        self._gravar({"tipo": "shard", **secao})
+
+    def duplicacoes(self, duplicacoes):
+        """Grava os trechos duplicados (conhecidos só ao fim da análise).
+
+        Como no relatório JSON, o arquivo só com duplicação entra no ranking
+        com a pontuação de calcular_pontuacao_avancada; os já pontuados não
+        mudam, porque ela não dá peso à duplicação.
+        """
+        for filepath, trechos in duplicacoes.items():
+            self.totais['duplicacao']["total"] += len(trechos)
+            self.totais['duplicacao']["arquivos"] += 1
+            if filepath not in self.com_problemas:
+                self.com_problemas.add(filepath)
+                self._no_topo(filepath, calcular_pontuacao_avancada(
+                    {}, {}, {filepath: trechos}, {}, {}, {})[filepath])
+            self._gravar({"tipo": "duplicacao", "arquivo": filepath,
+                          "codigo_duplicado": trechos})
+
+    def grafo(self, secao):
+        """Grava a seção do grafo de imports (ver secao_grafo_imports)."""
+        self._gravar({"tipo": "grafo_imports", **secao})
+
+    def codigo_morto(self, codigo_morto):
+        """Grava os símbolos não referenciados (a junção só acontece ao fim)."""
+        for filepath, simbolos in codigo_morto.items():
+            self.totais['codigo_morto']["total"] += len(simbolos)
+            self.totais['codigo_morto']["arquivos"] += 1
+            self._gravar({"tipo": "codigo_morto", "arquivo": filepath,
+                          "codigo_morto": simbolos})
+
+    @property
+    def ranking(self):
+        """Topo do ranking, no mesmo formato de calcular_pontuacao_avancada."""
+        return {filepath: pontuacao for _, filepath, pontuacao
+                in sorted(self._topo, key=lambda item: item[0], reverse=True)}
+
+    def fechar(self, tempo_execucao, modo="completo", arquivos_reanalisados=None,
+               perfil=None):
+        """Grava o registro ``resumo`` e fecha o arquivo."""
+        total = self.total_arquivos
+        com_problemas = len(self.com_problemas)
+        self._gravar({
+            "tipo": "resumo",
+            "📊_estatisticas_gerais": {
+                "versao": VERSAO,
+                "tempo_execucao_segundos": round(tempo_execucao, 2),
+                "total_arquivos_analisados": total,
+                "arquivos_com_problemas": com_problemas,
+                "arquivos_limpos": total - com_problemas,
+                "percentual_qualidade": qualidade_percentual(total, com_problemas),
+                "cache_hits": "Ativo" if ENABLE_CACHE else "Desativo",
+                "modo": modo,
+                "analisadores": sorted(analisadores_ativos()),
+                "arquivos_reanalisados": (total if arquivos_reanalisados is None
+                                          else arquivos_reanalisados)
+            },
+            "🔧_problemas_por_categoria_avancado": {
+                "pep8_style": self.totais['pep8'],
+                "complexidade_codigo": self.totais['complexidade'],
+                "imports_nao_usados": self.totais['imports_nao_usados'],
+                "seguranca": self.totais['seguranca'],
+                "documentacao": self.totais['docstrings'],
+                "duplicacao": self.totais['duplicacao'],
+                "codigo_morto": self.totais['codigo_morto']
+            },
+            "📈_RANKING_ARQUIVOS_PRO": secao_ranking(self.ranking),
+            "⏱️_PERFIL_EXECUCAO": perfil or {}
+        })
+        self._arquivo.close()
+
+
+def main_pro(path):
+    """Função principal da versão Pro com robustez empresarial."""
+    print("🚀 ANALISADOR DE CÓDIGO PRO - Versão Avançada")
+    print("=" * 50)
+
+    # Validação inicial
+    if not os.path.exists(path):
+        print(f"❌ Caminho não encontrado: {path}")
+        return False
+
+    if not os.path.isdir(path):
+        print(f"❌ Caminho não é um diretório: {path}")
+        return False
+
+    shard = None
+    if SHARD:
+        try:
+            shard = interpretar_shard(SHARD)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+
+    try:
+        ativos = analisadores_ativos()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+
+    setup_cache()
+    inicio = time.time()
+    _medidor.set(MedidorEtapas())
+    dir_perfil = importar('tempfile', 'perfil').mkdtemp(
+        prefix="analise_perfil_") if PERFIL_CPROFILE else None
+
+    print(f"⚡ Processamento paralelo com {MAX_WORKERS} workers")
+    print(f"🧠 Etapas em processo: {MAX_PROCESSOS} {MODO_EXECUCAO}")
+    print(f"💾 Cache {'ativado' if ENABLE_CACHE else 'desativado'}")
+    avisar_motor_pep8(ativos)
+    if not analise_completa(ativos):
+        print(f"🧩 Análises: {', '.join(nome for nome in ANALISADORES if nome in ativos)}")
+
+    resultados_base = {}
+    custos = {}
+    if INCREMENTAL or shard:
+        # O plano incremental e a partição precisam da lista completa
+        with obter_medidor().medir('descoberta'):
+            arquivos = arquivos_python(path)
+        if shard:
+            custos = custos_historicos()
+            total_projeto = len(arquivos)
+            arquivos = fatia_shard(arquivos, *shard, custos)
+            print(f"🧩 Shard {SHARD}: {len(arquivos)} de {total_projeto} arquivos "
+                  f"(balanceado por {'histórico' if custos else 'tamanho'})")
+        arquivos_analisar = arquivos
+        print(f"📁 Encontrados {len(arquivos)} arquivos Python")
+        plano = planejar_incremental(path, arquivos) if INCREMENTAL and arquivos else None
+        if plano:
+            resultados_base, arquivos_analisar = plano
+        total = len(arquivos_analisar)
+    else:
+        # A análise começa enquanto a descoberta ainda percorre o projeto
+        arquivos = []
+        total = None
+
+        def descobertos():
+            # Só o tempo gasto dentro da descoberta, não o da análise intercalada
+            tempos = {}
+            gerador = descobrir_arquivos(path)
+            while True:
+                with cronometrar(tempos, 'descoberta'):
+                    arquivo = next(gerador, None)
+                if arquivo is None:
+                    break
+                arquivos.append(arquivo)
+                # Aviso para projetos muito grandes
+                if len(arquivos) == 1001:
+                    print("\n🔥 Projeto grande detectado! (mais de 1000 arquivos)")
+                    print("   • Cache recomendado para melhor performance")
+                    print("   • Análise pode levar alguns minutos")
+                yield arquivo
+            obter_medidor().registrar('descoberta', tempos['descoberta'])
+
+        arquivos_analisar = descobertos()
+
+    print()
+
+    # Em JSONL cada arquivo vai para o disco assim que termina
+    saida = RelatorioStreaming(RELATORIO_JSONL) if FORMATO_SAIDA == "jsonl" else None
+    ao_resultado = saida.arquivo if saida else None
+
+    # Análise paralela com progresso. A barra só nasce depois de
+    # PROGRESSO_ATRASO_S: execuções só com acertos de cache terminam antes e
+    # não pagam a importação do tqdm
+    inicio_analise = time.perf_counter()
+    barra = []
+    completed = 0
+
+    def progresso():
+        nonlocal completed
+        completed += 1
+        if not barra:
+            if time.perf_counter() - inicio_analise < PROGRESSO_ATRASO_S:
+                return
+            try:
+                tqdm = importar('tqdm', 'progresso').tqdm
+            except ImportError:
+                # Fallback sem barra de progresso
+                print("💡 Para barra de progresso: pip install tqdm")
+                print("🔍 Analisando arquivos...")
+                barra.append(None)
+            else:
+                barra.append(tqdm(total=total, initial=completed,
+                                  desc="🔍 Analisando", unit="arquivo"))
+                return
+        if barra[0] is not None:
+            barra[0].update(1)
+            return
+        # Progresso mais frequente para projetos grandes
+        interval = 50 if len(arquivos) > 1000 else 5
+        if completed % interval == 0:
+            print(f"   📊 Processados: {completed}/{total or len(arquivos)}")
+
+    try:
+        resultados_completos, impressoes, simbolos = executar_analise(
+            arquivos_analisar, progresso, ao_resultado=ao_resultado, dir_perfil=dir_perfil)
+    finally:
+        if barra and barra[0] is not None:
+            barra[0].close()
+
+    if not arquivos:
+        if saida:
+            saida.fechar(time.time() - inicio)
+        print("❌ Nenhum arquivo Python encontrado!")
+        return
+
+    if total is None:
+        print(f"📁 Encontrados {len(arquivos)} arquivos Python")
+
+    # Achados dos arquivos intocados entram como se tivessem sido analisados
+    for arquivo, resultado in resultados_base.items():
+        if saida:
+            saida.arquivo(arquivo, resultado)
+        else:
+            resultados_completos[arquivo] = resultado
+        impressoes[arquivo], simbolos[arquivo] = obter_pecas_globais(arquivo)
+
+    # Grava o lote final de entradas do cache
+    flush_cache()
+
+    correcao = None
+    if CORRIGIR:
+        if saida:
+            print("ℹ️  CORRIGIR precisa dos resultados em memória: use FORMATO_SAIDA = 'json'")
+        else:
+            correcao = corrigir_resultados(resultados_completos, impressoes, simbolos)
+
+    # Duplicações, código morto e grafo de imports: peças calculadas pelos
+    # workers (ou vindas do cache) unidas em índices globais
+    duplicacoes, codigo_morto, grafo = juntar_pecas(impressoes, simbolos)
+
+    fim = time.time()
+    modo = "incremental" if resultados_base else "completo"
+
+    if saida:
+        if shard:
+            saida.shard(secao_shard(impressoes, simbolos, custos))
+        saida.duplicacoes(duplicacoes)
+        saida.codigo_morto(codigo_morto)
+        saida.grafo(grafo)
+        saida.fechar(fim - inicio, modo=modo,
+                     arquivos_reanalisados=len(arquivos) - len(resultados_base),
+                     perfil=obter_medidor().secao())
+        ranking = saida.ranking
+        com_problemas = len(saida.com_problemas)
+        pep8 = dict.fromkeys(sorted(saida.arquivos_pep8), True)
+        imports = dict.fromkeys(sorted(saida.arquivos_imports), True)
+        relatorio_saida = RELATORIO_JSONL
+    else:
+        with obter_medidor().medir('relatorio'):
+            relatorio, ranking, grupos = montar_relatorio(
+                arquivos,
+                resultados_completos,
+                duplicacoes,
+                fim - inicio,
+                modo=modo,
+                arquivos_reanalisados=len(arquivos) - len(resultados_base),
+                codigo_morto=codigo_morto,
+                grafo=grafo,
+                gerar_scripts=AUTO_CORRECAO)
+        relatorio["⏱️_PERFIL_EXECUCAO"] = obter_medidor().secao()
+        if correcao:
+            relatorio["🔧_CORRECAO"] = correcao
+        if shard:
+            relatorio["🧩_SHARD"] = secao_shard(impressoes, simbolos, custos)
+        com_problemas = len(ranking)
+        pep8 = grupos['pep8']
+        imports = grupos['imports_nao_usados']
+        relatorio_saida = RELATORIO_SAIDA
+
+        # Salva relatório
+        salvar_relatorio(relatorio)
 
     # Gera script de auto-correção
     if AUTO_CORRECAO and (pep8 or imports):
-        comandos = gerar_comandos_correcao({
+        comandos = gerar_comandos_correcao(path, {
             'pep8': pep8,
             'imports_nao_usados': imports
-        }, list(ranking.keys()))
+        })
 
         with open("auto_correcao.sh", 'w', encoding='utf-8') as f:
             f.write('\n'.join(comandos))
 
         # Windows batch
         with open("auto_correcao.bat", 'w', encoding='utf-8') as f:
-            script_linhas = gerar_script_windows(
-                list(
-                    pep8.keys()) if pep8 else [], list(
-                    imports.keys()) if imports else [])
+            script_linhas = gerar_script_windows(path, list(imports.keys()) if imports else [])
             f.write('\n'.join(script_linhas))
 
     # Exibe resumo
@@ -955,12 +4260,23 @@ def main_pro(path):
     print("=" * 50)
     print(f"⏱️  Tempo de execução: {fim - inicio:.2f}s")
     print(f"📁 Arquivos analisados: {len(arquivos)}")
-    print(f"⚠️  Arquivos com problemas: {len(ranking)}")
+    print(f"⚠️  Arquivos com problemas: {com_problemas}")
     print(
-        f"🎯 Qualidade geral: {
-            round(
-                (len(arquivos) - len(ranking)) / len(arquivos) * 100,
-                1)}%")
+        f"🎯 Qualidade geral: {qualidade_percentual(len(arquivos), com_problemas)}%")
+    perfil = obter_medidor().secao()
+    etapas = perfil["etapas"]
+    if etapas:
+        print("⏳ Etapas mais demoradas: " + ", ".join(
+            f"{etapa} {dados['total_s']}s" for etapa, dados in list(etapas.items())[:3]))
+    modelo = perfil.get("modelo_custo")
+    if modelo:
+        print(f"📐 Modelo de custo: estimado {modelo['estimado_total_s']}s, "
+              f"real {modelo['real_total_s']}s, erro mediano "
+              f"{modelo['erro_p50_percentual']}% ({modelo['com_historico']}/"
+              f"{modelo['arquivos']} com histórico)")
+    for etapa, arquivos_falha in perfil.get("falhas", {}).items():
+        print(f"⚠️  {etapa}: {len(arquivos_falha)} arquivo(s) sem resultado "
+              f"(fora do cache; ver ⏱️_PERFIL_EXECUCAO.falhas)")
     print()
 
     if ranking:
@@ -973,7 +4289,14 @@ def main_pro(path):
                 print(f"      • {problema}")
             print()
 
-    print(f"📋 Relatório detalhado: {RELATORIO_SAIDA}")
+    print(f"📋 Relatório detalhado: {relatorio_saida}")
+    if dir_perfil:
+        estatisticas = juntar_perfis(dir_perfil, PERFIL_SAIDA)
+        importar('shutil', 'perfil').rmtree(dir_perfil, ignore_errors=True)
+        if estatisticas:
+            print(f"🔬 Perfil das etapas em processo: {PERFIL_SAIDA} "
+                  f"(python -m pstats {PERFIL_SAIDA})")
+            estatisticas.sort_stats('cumulative').print_stats(PERFIL_TOP_FUNCOES)
     if AUTO_CORRECAO and (pep8 or imports):
         print("🔧 Scripts de correção gerados:")
         print("   • auto_correcao.sh (Linux/Mac)")
@@ -988,24 +4311,588 @@ def main_pro(path):
             fim - inicio,
             2),
         "arquivos_analisados": len(arquivos),
-        "arquivos_com_problemas": len(ranking),
-        "qualidade_percentual": round(
-            (len(arquivos) - len(ranking)) / len(arquivos) * 100,
-            1)}
+        "arquivos_com_problemas": com_problemas,
+        "qualidade_percentual": qualidade_percentual(
+            len(arquivos), com_problemas)}
 
 
-if __name__ == "__main__":
+def _iniciar_watchdog(path, sinal, pendentes, lock):
+    """Liga o watchdog (inotify/FSEvents/ReadDirectoryChangesW), se instalado.
+
+    Caminhos de arquivos alterados vão para ``pendentes``; eventos de
+    diretório viram ``None`` (pede uma varredura completa).
+    """
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        print("💡 Para observar via inotify: pip install watchdog (usando varredura)")
+        return None
+
+    class Coletor(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.event_type in ('opened', 'closed_no_write'):
+                return
+            with lock:
+                if event.is_directory:
+                    pendentes.add(None)
+                else:
+                    pendentes.add(event.src_path)
+                    destino = getattr(event, 'dest_path', '')
+                    if destino:
+                        pendentes.add(destino)
+            sinal.set()
+
+    observador = Observer()
+    observador.schedule(Coletor(), path, recursive=True)
+    observador.daemon = True
+    observador.start()
+    return observador
+
+
+def observar_projeto(path):
+    """Modo observação: mantém estado quente e reanalisa só o que mudou.
+
+    Faz uma análise completa, mantém pools, resultados, impressões e ranking
+    em memória e, a cada rajada de alterações (agrupada por
+    OBSERVAR_DEBOUNCE segundos), reanalisa apenas os arquivos tocados e
+    quem os importa, e regrava o relatório no FORMATO_SAIDA. Sem watchdog,
+    varre as assinaturas a cada OBSERVAR_INTERVALO segundos.
+    """
+    if not os.path.isdir(path):
+        print(f"❌ Caminho não é um diretório: {path}")
+        return False
+
+    setup_cache()
+    print("👀 ANALISADOR DE CÓDIGO PRO - Modo Observação")
+    print("=" * 50)
+    avisar_motor_pep8(analisadores_ativos())
+
+    sinal = threading.Event()
+    pendentes = set()
+    lock = threading.Lock()
+
+    with criar_executor_cpu() as executor_cpu:
+        assinaturas = {}
+        resultados = {}
+        impressoes = {}
+        simbolos = {}
+
+        def atualizar(alterados, removidos):
+            inicio = time.time()
+            # Um medidor por atualização: o perfil não cresce com a vida do processo
+            _medidor.set(MedidorEtapas())
+            for arquivo in removidos:
+                assinaturas.pop(arquivo, None)
+                resultados.pop(arquivo, None)
+                impressoes.pop(arquivo, None)
+                simbolos.pop(arquivo, None)
+
+            # Como no modo incremental, quem importa um arquivo alterado ou
+            # removido também é refeito
+            alvos = set(alterados) | set(removidos)
+            dependentes = dependentes_diretos(
+                [arquivo for arquivo in assinaturas if arquivo not in alvos], alvos)
+            reanalisar = list(alterados) + sorted(dependentes)
+
+            novos, novas_impressoes, novos_simbolos = executar_analise(
+                reanalisar, executor_cpu=executor_cpu)
+            resultados.update(novos)
+            impressoes.update(novas_impressoes)
+            simbolos.update(novos_simbolos)
+            for arquivo in alterados:
+                assinaturas[arquivo] = assinatura_arquivo(arquivo)
+            flush_cache()
+
+            duplicacoes, codigo_morto, grafo = juntar_pecas(impressoes, simbolos)
+            if FORMATO_SAIDA == "jsonl":
+                saida = RelatorioStreaming(RELATORIO_JSONL)
+                for arquivo in assinaturas:
+                    saida.arquivo(arquivo, resultados[arquivo])
+                saida.duplicacoes(duplicacoes)
+                saida.codigo_morto(codigo_morto)
+                saida.grafo(grafo)
+                saida.fechar(time.time() - inicio, modo="observacao",
+                             arquivos_reanalisados=len(reanalisar), perfil=obter_medidor().secao())
+                ranking = saida.ranking
+                com_problemas = len(saida.com_problemas)
+            else:
+                relatorio, ranking, _ = montar_relatorio(
+                    list(assinaturas),
+                    resultados,
+                    duplicacoes,
+                    time.time() - inicio,
+                    modo="observacao",
+                    arquivos_reanalisados=len(reanalisar),
+                    assinaturas=assinaturas,
+                    codigo_morto=codigo_morto,
+                    grafo=grafo)
+                relatorio["⏱️_PERFIL_EXECUCAO"] = obter_medidor().secao()
+                salvar_relatorio(relatorio)
+                com_problemas = len(ranking)
+
+            print(f"🔄 {time.strftime('%H:%M:%S')} "
+                  f"{len(alterados)} reanalisado(s), {len(dependentes)} dependente(s), "
+                  f"{len(removidos)} removido(s) "
+                  f"em {time.time() - inicio:.2f}s | "
+                  f"{com_problemas} arquivo(s) com problemas | "
+                  f"qualidade {qualidade_percentual(len(assinaturas), com_problemas)}%")
+            for arquivo in alterados if len(alterados) <= 10 else []:
+                if arquivo in ranking:
+                    dados = ranking[arquivo]
+                    print(f"   {dados['categoria']} {arquivo}: {dados['pontuacao']} "
+                          f"({', '.join(dados['problemas'])})")
+
+        def varrer(candidatos=None):
+            """Compara assinaturas conhecidas com as atuais (todas ou só candidatos)."""
+            if candidatos is None:
+                candidatos = set(arquivos_python(path)) | set(assinaturas)
+            alterados, removidos = [], []
+            for arquivo in candidatos:
+                atual = assinatura_arquivo(arquivo) if os.path.isfile(arquivo) else None
+                if atual is None:
+                    if arquivo in assinaturas:
+                        removidos.append(arquivo)
+                elif atual != assinaturas.get(arquivo):
+                    alterados.append(arquivo)
+            return alterados, removidos
+
+        atualizar(*varrer())
+        observador = _iniciar_watchdog(path, sinal, pendentes, lock)
+        relatorio_saida = RELATORIO_JSONL if FORMATO_SAIDA == "jsonl" else RELATORIO_SAIDA
+        print(f"📋 Relatório mantido em: {relatorio_saida} (Ctrl+C para sair)")
+
+        try:
+            while True:
+                if observador is None:
+                    time.sleep(OBSERVAR_INTERVALO)
+                    alterados, removidos = varrer()
+                    if alterados or removidos:
+                        # Espera a rajada de gravações terminar
+                        time.sleep(OBSERVAR_DEBOUNCE)
+                        alterados, removidos = varrer()
+                else:
+                    sinal.wait()
+                    while True:
+                        sinal.clear()
+                        time.sleep(OBSERVAR_DEBOUNCE)
+                        if not sinal.is_set():
+                            break
+                    with lock:
+                        eventos = set(pendentes)
+                        pendentes.clear()
+
+                    if None in eventos:
+                        alterados, removidos = varrer()
+                    else:
+                        candidatos = set()
+                        for evento in eventos:
+                            arquivo = os.path.join(path, os.path.relpath(evento, path))
+                            if arquivo in assinaturas or arquivo_monitorado(arquivo, path):
+                                candidatos.add(arquivo)
+                        alterados, removidos = varrer(candidatos)
+
+                if alterados or removidos:
+                    atualizar(alterados, removidos)
+        finally:
+            if observador is not None:
+                observador.stop()
+
+    return True
+
+
+class ServidorAnalise:
+    """Estado quente do modo servidor, compartilhado por pedidos concorrentes.
+
+    O pool de CPU, o agendador de ferramentas e o cache SQLite vivem entre
+    pedidos; cada pedido roda executar_analise na thread da sua conexão.
+    """
+
+    def __init__(self, executor_cpu):
+        self.executor_cpu = executor_cpu
+        self.inicio = time.time()
+        self.pedidos = 0
+        self.arquivos = 0
+        self.ultimo_perfil = {}
+        self._lock = threading.Lock()
+
+    def estado(self):
+        """Resumo para GET /saude."""
+        with self._lock:
+            return {
+                "status": "ok",
+                "versao": VERSAO,
+                "ativo_s": round(time.time() - self.inicio, 1),
+                "pedidos": self.pedidos,
+                "arquivos_analisados": self.arquivos
+            }
+
+    def analisar(self, pedido):
+        """Atende ``{"diretorio": ...}`` e/ou ``{"arquivos": [...]}``.
+
+        Devolve os ``resultado`` por arquivo e o relatório completo (com o
+        ranking e o perfil só deste pedido), como main_pro gravaria.
+        Pedidos inválidos levantam ValueError.
+        """
+        if not isinstance(pedido, dict):
+            raise ValueError("o corpo deve ser um objeto JSON")
+        diretorio = pedido.get('diretorio')
+        caminhos = pedido.get('arquivos') or []
+        if not diretorio and not caminhos:
+            raise ValueError("informe 'diretorio' ou 'arquivos'")
+        if diretorio and not os.path.isdir(diretorio):
+            raise ValueError(f"diretório não encontrado: {diretorio}")
+        if not isinstance(caminhos, list):
+            raise ValueError("'arquivos' deve ser uma lista de caminhos")
+
+        medidor = MedidorEtapas()
+        token = _medidor.set(medidor)
+        try:
+            return self._analisar(diretorio, caminhos, medidor)
+        finally:
+            _medidor.reset(token)
+
+    def _analisar(self, diretorio, caminhos, medidor):
+        inicio = time.time()
+        arquivos = []
+        ignorados = []
+
+        def fontes():
+            vistos = set()
+            if diretorio:
+                for arquivo in descobrir_arquivos(diretorio):
+                    vistos.add(arquivo)
+                    arquivos.append(arquivo)
+                    yield arquivo
+            for caminho in caminhos:
+                if caminho in vistos:
+                    continue
+                vistos.add(caminho)
+                if isinstance(caminho, str) and os.path.isfile(caminho):
+                    arquivos.append(caminho)
+                    yield caminho
+                else:
+                    ignorados.append(caminho)
+
+        resultados, impressoes, simbolos = executar_analise(
+            fontes(), executor_cpu=self.executor_cpu)
+        flush_cache()
+        duplicacoes, codigo_morto, grafo = juntar_pecas(impressoes, simbolos)
+        relatorio, _, _ = montar_relatorio(
+            arquivos,
+            resultados,
+            duplicacoes,
+            time.time() - inicio,
+            modo="servidor",
+            codigo_morto=codigo_morto,
+            grafo=grafo)
+        relatorio["⏱️_PERFIL_EXECUCAO"] = medidor.secao()
+
+        with self._lock:
+            self.pedidos += 1
+            self.arquivos += len(arquivos)
+            self.ultimo_perfil = relatorio["⏱️_PERFIL_EXECUCAO"]
+        return {"resultados": resultados, "relatorio": relatorio, "ignorados": ignorados}
+
+
+@lru_cache(maxsize=None)
+def _manipulador_servidor():
+    """Classe das rotas HTTP, montada só quando o servidor sobe (http.server é pesado)."""
+
+    class _ManipuladorServidor(importar('http.server', 'servidor').BaseHTTPRequestHandler):
+        """Rotas HTTP do modo servidor: GET /saude, GET /perfil e POST /analisar."""
+
+        server_version = "AnaliseCodigoPro"
+
+        def _responder(self, status, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False, default=para_json).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            if self.path == '/saude':
+                self._responder(200, self.server.analise.estado())
+            elif self.path == '/perfil':
+                self._responder(200, self.server.analise.ultimo_perfil)
+            else:
+                self._responder(404, {"erro": f"rota desconhecida: {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/analisar':
+                self._responder(404, {"erro": f"rota desconhecida: {self.path}"})
+                return
+            try:
+                tamanho = int(self.headers.get('Content-Length') or 0)
+                pedido = json.loads(self.rfile.read(tamanho) or b'{}')
+                corpo = self.server.analise.analisar(pedido)
+            except ValueError as e:
+                # JSONDecodeError também é ValueError
+                self._responder(400, {"erro": str(e)})
+            except Exception as e:
+                print(f"💥 Erro atendendo pedido: {str(e)[:100]}")
+                self._responder(500, {"erro": str(e)})
+            else:
+                self._responder(200, corpo)
+
+        def log_message(self, formato, *args):
+            # Unix sockets não têm endereço de cliente
+            print(f"🌐 {time.strftime('%H:%M:%S')} {formato % args}")
+
+    return _ManipuladorServidor
+
+
+def servir_analises():
+    """Modo servidor: atende pedidos de análise com pools e cache quentes.
+
+    Escuta em SERVIDOR_SOCKET (Unix socket) ou em SERVIDOR_HOST:SERVIDOR_PORTA.
+    Os workers de CPU sobem antes do primeiro pedido e o cache é único para
+    todos os pedidos, inclusive os simultâneos.
+    """
+    setup_cache()
+    print("🛰️  ANALISADOR DE CÓDIGO PRO - Modo Servidor")
+    print("=" * 50)
+    avisar_motor_pep8(analisadores_ativos())
+
+    socketserver = importar('socketserver', 'servidor')
+    if SERVIDOR_SOCKET and not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+        print("❌ Unix sockets não são suportados neste sistema; use SERVIDOR_PORTA")
+        return False
+
+    with criar_executor_cpu() as executor_cpu:
+        # Aquece os workers e o loop do agendador antes do primeiro pedido
+        importar('concurrent.futures', 'pool_cpu').wait(
+            [executor_cpu.submit(_aquecer_worker) for _ in range(MAX_PROCESSOS)])
+        obter_agendador()
+
+        if SERVIDOR_SOCKET:
+            # Só remove um socket esquecido por uma execução anterior
+            if os.path.exists(SERVIDOR_SOCKET):
+                if not stat.S_ISSOCK(os.stat(SERVIDOR_SOCKET).st_mode):
+                    print(f"❌ {SERVIDOR_SOCKET} existe e não é um socket")
+                    return False
+                os.unlink(SERVIDOR_SOCKET)
+
+            class ServidorUnix(socketserver.ThreadingUnixStreamServer):
+                daemon_threads = True
+
+        try:
+            if SERVIDOR_SOCKET:
+                servidor = ServidorUnix(SERVIDOR_SOCKET, _manipulador_servidor())
+                endereco = f"unix:{SERVIDOR_SOCKET}"
+            else:
+                servidor = importar('http.server', 'servidor').ThreadingHTTPServer(
+                    (SERVIDOR_HOST, SERVIDOR_PORTA), _manipulador_servidor())
+                endereco = f"http://{SERVIDOR_HOST}:{servidor.server_port}"
+        except OSError as e:
+            # Porta ocupada, sem permissão, diretório do socket inexistente
+            print(f"❌ Não foi possível abrir o servidor: {e}")
+            return False
+        servidor.analise = ServidorAnalise(executor_cpu)
+
+        print(f"⚡ {MAX_PROCESSOS} workers de CPU prontos, cache em {CACHE_DIR}")
+        print(f"📡 Ouvindo em {endereco} (Ctrl+C para sair)")
+
+        def encerrar(*_):
+            raise KeyboardInterrupt
+
+        # SIGTERM (CI, systemd, docker stop) encerra como o Ctrl+C
+        signal.signal(signal.SIGTERM, encerrar)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Servidor encerrado")
+        finally:
+            servidor.server_close()
+            if SERVIDOR_SOCKET and os.path.exists(SERVIDOR_SOCKET):
+                os.unlink(SERVIDOR_SOCKET)
+            flush_cache()
+
+    return True
+
+
+def lista_analisadores(texto):
+    """Tipo de --somente/--pular: nomes do registro separados por vírgula."""
+    nomes = [nome.strip() for nome in texto.split(',') if nome.strip()]
+    desconhecidos = [nome for nome in nomes if nome not in ANALISADORES]
+    if desconhecidos or not nomes:
+        raise argparse.ArgumentTypeError(
+            f"analisador desconhecido: {', '.join(desconhecidos) or texto!r} "
+            f"(disponíveis: {', '.join(ANALISADORES)})")
+    return nomes
+
+
+def criar_parser():
+    """Linha de comando: cada opção sobrescreve a constante de mesmo nome em ``dest``.
+
+    Opções omitidas não aparecem no resultado (SUPPRESS), então as
+    constantes editadas no próprio arquivo continuam valendo.
+    """
+    parser = argparse.ArgumentParser(
+        prog="Analise_codigo_pro",
+        description="Analisador de código Python: PEP8, complexidade, segurança, "
+                    "duplicação, código morto e grafo de imports.",
+        argument_default=argparse.SUPPRESS)
+    parser.add_argument("--version", action="version", version=f"%(prog)s {VERSAO}")
+    parser.add_argument("PROJETO_DIR", nargs="?", metavar="PROJETO",
+                        help=f"diretório analisado (padrão: {PROJETO_DIR})")
+
+    saida = parser.add_argument_group("saída")
+    saida.add_argument("-o", "--saida", dest="RELATORIO_SAIDA", metavar="ARQUIVO",
+                       help=f"relatório JSON (padrão: {RELATORIO_SAIDA})")
+    saida.add_argument("--formato", dest="FORMATO_SAIDA", choices=("json", "jsonl"),
+                       help=f"relatório único ou streaming por arquivo (padrão: {FORMATO_SAIDA})")
+    saida.add_argument("--saida-jsonl", dest="RELATORIO_JSONL", metavar="ARQUIVO",
+                       help=f"relatório do formato jsonl (padrão: {RELATORIO_JSONL})")
+    saida.add_argument("--sem-auto-correcao", dest="AUTO_CORRECAO", action="store_const",
+                       const=False, help="não gera os scripts auto_correcao.sh/.bat")
+    saida.add_argument("--corrigir", dest="CORRIGIR", action="store_const", const=True,
+                       help="aplica autopep8/isort e reanalisa os arquivos corrigidos")
+
+    execucao = parser.add_argument_group("execução")
+    execucao.add_argument("-j", "--workers", dest="MAX_WORKERS", type=int, metavar="N",
+                          help=f"subprocessos flake8/bandit simultâneos (padrão: {MAX_WORKERS})")
+    execucao.add_argument("-p", "--processos", dest="MAX_PROCESSOS", type=int, metavar="N",
+                          help=f"workers das etapas em processo (padrão: {MAX_PROCESSOS})")
+    execucao.add_argument("--modo", dest="MODO_EXECUCAO", choices=("processos", "threads"),
+                          help=f"pool das etapas em processo (padrão: {MODO_EXECUCAO})")
+    execucao.add_argument("--pep8-motor", dest="PEP8_MOTOR", choices=("interno", "flake8"),
+                          help=f"checagem de estilo (padrão: {PEP8_MOTOR})")
+    execucao.add_argument("--limite-complexidade", dest="LIMITE_COMPLEXIDADE", type=int,
+                          metavar="N", help=f"padrão: {LIMITE_COMPLEXIDADE}")
+
+    analises = parser.add_argument_group("análises")
+    analises.add_argument("--somente", "--only", dest="ANALISADORES_SOMENTE",
+                          type=lista_analisadores, metavar="A,B",
+                          help="roda só estas análises (ex: seguranca,complexidade)")
+    analises.add_argument("--pular", "--skip", dest="ANALISADORES_PULAR",
+                          type=lista_analisadores, metavar="A,B",
+                          help="não roda estas análises (ex: duplicacao)")
+    analises.add_argument("--listar-analisadores", dest="listar_analisadores",
+                          action="store_true", help="mostra as análises registradas e sai")
+
+    cache = parser.add_argument_group("cache")
+    cache.add_argument("--sem-cache", dest="ENABLE_CACHE", action="store_const", const=False,
+                       help="analisa tudo de novo e não grava o cache")
+    cache.add_argument("--cache-dir", dest="CACHE_DIR", metavar="DIR",
+                       help=f"padrão: {CACHE_DIR}")
+    cache.add_argument("--cache-info", dest="cache_info", action="store_true",
+                       help="mostra as entradas do cache por tipo e sai")
+    cache.add_argument("--limpar-cache", dest="limpar_cache", action="store_true",
+                       help="apaga o cache e sai")
+
+    modos = parser.add_argument_group("modos")
+    modos.add_argument("--incremental", dest="INCREMENTAL", action="store_const", const=True,
+                       help="reanalisa só o que mudou desde o último relatório")
+    modos.add_argument("--desde", dest="INCREMENTAL_GIT_REF", metavar="REF",
+                       help="incremental, com as alterações vindas de git diff REF")
+    modos.add_argument("--observar", dest="OBSERVAR", action="store_const", const=True,
+                       help="processo contínuo que reanalisa arquivos alterados")
+    modos.add_argument("--shard", dest="SHARD", metavar="I/N",
+                       help="analisa só a fatia I de N e grava um relatório parcial")
+    modos.add_argument("--shard-historico", dest="SHARD_HISTORICO", metavar="RELATORIO",
+                       help="relatório mesclado anterior para balancear as fatias")
+    modos.add_argument("--mesclar", dest="RELATORIOS_MESCLAR", nargs="+",
+                       metavar="PARCIAL", help="une relatórios parciais e sai")
+    modos.add_argument("--servidor", dest="SERVIDOR", action="store_const", const=True,
+                       help="atende pedidos de análise por HTTP")
+    modos.add_argument("--host", dest="SERVIDOR_HOST", help=f"padrão: {SERVIDOR_HOST}")
+    modos.add_argument("--porta", dest="SERVIDOR_PORTA", type=int,
+                       help=f"padrão: {SERVIDOR_PORTA}")
+    modos.add_argument("--socket", dest="SERVIDOR_SOCKET", metavar="CAMINHO",
+                       help="Unix socket no lugar de host/porta")
+
+    perfil = parser.add_argument_group("perfil")
+    perfil.add_argument("--cprofile", dest="PERFIL_CPROFILE", action="store_const", const=True,
+                        help=f"cProfile das etapas em processo, gravado em {PERFIL_SAIDA}")
+    perfil.add_argument("--perfil-inicio", dest="perfil_inicio", action="store_true",
+                        help="mostra o custo da inicialização e das importações por etapa")
+    return parser
+
+
+def mostrar_analisadores():
+    """--listar-analisadores: o registro ANALISADORES, com rota, custo e entradas."""
+    ativos = analisadores_ativos()
+    print("🧩 Analisadores (✔ = ativo nesta configuração)")
+    for nome, analisador in ANALISADORES.items():
+        print(f"   {'✔' if nome in ativos else ' '} {nome}: {analisador.rota}, "
+              f"custo {analisador.custo}, entradas {'/'.join(analisador.entradas)}, "
+              f"peso {PESOS.get(analisador.peso, '-')}")
+
+
+def mostrar_cache():
+    """--cache-info: entradas e volume de dados por tipo."""
+    banco = os.path.join(CACHE_DIR, CACHE_DB)
+    if not os.path.exists(banco):
+        print(f"📦 Sem cache em {CACHE_DIR}")
+        return
+    estatisticas = CacheStore(CACHE_DIR).estatisticas()
+    tamanho = sum(os.path.getsize(os.path.join(CACHE_DIR, nome))
+                  for nome in os.listdir(CACHE_DIR) if nome.startswith(CACHE_DB))
+    print(f"📦 Cache {banco}: {tamanho / 1024 / 1024:.1f} MB")
+    for tipo, (entradas, dados) in sorted(estatisticas.items()):
+        print(f"   • {tipo}: {entradas} entrada(s), {dados / 1024:.0f} KB")
+
+
+def mostrar_perfil_inicio(cpu_inicio):
+    """--perfil-inicio: CPU até o main e importações sob demanda por etapa."""
+    print(f"\n🚀 Inicialização: {cpu_inicio * 1000:.0f} ms de CPU até o main "
+          f"(interpretador + módulo; detalhe: python -X importtime)")
+    if not _importacoes:
+        print("   • Nenhuma biblioteca pesada importada")
+    for etapa, segundos in sorted(_importacoes.items(), key=lambda item: -item[1]):
+        print(f"   • {etapa}: {segundos * 1000:.1f} ms importando")
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando; devolve o código de saída."""
+    cpu_inicio = time.process_time()
+    opcoes = vars(criar_parser().parse_args(argv))
+    if "INCREMENTAL_GIT_REF" in opcoes:
+        # --desde REF já implica o modo incremental
+        opcoes["INCREMENTAL"] = True
+    if "MAX_WORKERS" in opcoes:
+        # Mesma divisão do padrão: metade do teto global para cada ferramenta
+        opcoes["LIMITE_POR_FERRAMENTA"] = {
+            ferramenta: max(1, opcoes["MAX_WORKERS"] // 2) for ferramenta in LIMITE_POR_FERRAMENTA}
+    aplicar_configuracao({nome: valor for nome, valor in opcoes.items() if nome.isupper()})
+
     try:
+        if opcoes.get("limpar_cache"):
+            importar('shutil', 'cache').rmtree(CACHE_DIR, ignore_errors=True)
+            print(f"🧹 Cache removido: {CACHE_DIR}")
+            return 0
+        if opcoes.get("cache_info"):
+            mostrar_cache()
+            return 0
+        if opcoes.get("listar_analisadores"):
+            mostrar_analisadores()
+            return 0
+        if SERVIDOR:
+            return 0 if servir_analises() else 1
+        if RELATORIOS_MESCLAR:
+            return 0 if mesclar_relatorios(RELATORIOS_MESCLAR) else 1
+        if OBSERVAR:
+            return 0 if observar_projeto(PROJETO_DIR) else 1
         resultado = main_pro(PROJETO_DIR)
         if resultado and resultado.get("sucesso"):
             print("\n✅ Análise concluída com sucesso!")
             print(f"📈 Qualidade geral: {resultado['qualidade_percentual']}%")
-        else:
-            print("\n❌ Análise falhou!")
-            exit(1)
+            return 0
+        print("\n❌ Análise falhou!")
+        return 1
     except KeyboardInterrupt:
         print("\n⚠️  Análise interrompida pelo usuário")
-        exit(2)
+        return 2
     except Exception as e:
         print(f"\n💥 Erro crítico: {str(e)}")
-        exit(3)
+        return 3
+    finally:
+        if opcoes.get("perfil_inicio"):
+            mostrar_perfil_inicio(cpu_inicio)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+🧪 Testes do Analisador de Código Pro
+Funções puras são testadas direto; o que depende do pipeline (relatório,
+cache, shards) roda o analisador pela linha de comando, cada teste com seu
+próprio diretório de cache.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+SCRIPT = os.path.join(SRC, "Analise_codigo_pro.py")
+sys.path.insert(0, SRC)
+
+import Analise_codigo_pro as analise  # noqa: E402
+
+# Ferramentas do mesmo ambiente do Python que roda os testes vêm primeiro
+PATH_PADRAO = os.pathsep.join([os.path.dirname(sys.executable), os.environ.get("PATH", "")])
+TEM_BANDIT = shutil.which("bandit", path=PATH_PADRAO) is not None
+
+# Trecho longo o bastante (> DUPLICACAO_MIN_TOKENS) para contar como clone
+TRECHO_DUPLICADO = '''
+def processar(itens, limite):
+    total = 0
+    for indice, item in enumerate(itens):
+        if item > limite:
+            total += item * indice
+        elif item < 0:
+            total -= abs(item)
+        else:
+            total += limite - item
+    resultado = [total, len(itens), limite]
+    media = sum(resultado) / max(1, len(resultado))
+    if media > limite * 2:
+        return round(media - limite, 2)
+    return round(media, 2)
+'''
+
+PROJETO = {
+    "a.py": '"""Módulo a: importa b e fecha um ciclo."""\nimport b\n\n\n'
+            'def dobro(x):\n    return b.soma(x, x)\n',
+    "b.py": '"""Módulo b: importa a e usa eval."""\nimport a\n\n\n'
+            'def soma(x, y):\n    return eval("x + y") + len(a.__name__)\n',
+    "c.py": '"""Módulo c com um trecho repetido em d."""\n' + TRECHO_DUPLICADO,
+    "d.py": '"""Módulo d com um trecho repetido em c."""\n' + TRECHO_DUPLICADO,
+    "e.py": '"""Módulo e, sem problemas e sem dependências."""\n\nVALOR = 1\n',
+}
+
+
+def criar_projeto(raiz, arquivos=PROJETO):
+    raiz.mkdir(exist_ok=True)
+    for nome, texto in arquivos.items():
+        (raiz / nome).write_text(texto, encoding="utf-8")
+    return raiz
+
+
+def executar(projeto, cache, saida, *args, path=PATH_PADRAO):
+    """Roda o analisador em ``projeto`` e devolve o relatório JSON."""
+    env = dict(os.environ, PATH=str(path))
+    cmd = [sys.executable, SCRIPT, "--sem-auto-correcao", "--cache-dir", str(cache),
+           "-o", str(saida), *args]
+    result = subprocess.run(cmd, cwd=projeto, env=env, capture_output=True, text=True,
+                            timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+    with open(saida, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ---------------------------------------------------------------- .gitignore
+
+@pytest.mark.parametrize("padrao, caminho, casa", [
+    ("*.py", "a.py", True),
+    ("*.py", "pasta/sub/a.py", True),
+    ("*.py", "a.pyc", False),
+    ("/build", "build", True),
+    ("/build", "src/build", False),
+    ("docs/*.md", "docs/a.md", True),
+    ("docs/*.md", "docs/sub/a.md", False),
+    ("**/gerado", "x/y/gerado", True),
+    ("**/gerado", "gerado", True),
+    ("saida/**", "saida/a/b.py", True),
+    ("a/**/b", "a/b", True),
+    ("a/**/b", "a/x/y/b", True),
+    ("arquivo?.py", "arquivo1.py", True),
+    ("arquivo?.py", "arquivo10.py", False),
+    ("[!a]*.py", "b.py", True),
+    ("[!a]*.py", "a.py", False),
+    ("\\#nome", "#nome", True),
+])
+def test_regex_gitignore(padrao, caminho, casa):
+    assert bool(analise._regex_gitignore(padrao).fullmatch(caminho)) is casa
+
+
+# ------------------------------------------------------------------ percentis
+
+@pytest.mark.parametrize("valores, fracao, esperado", [
+    ([1, 2], 0.50, 1),
+    ([1, 2, 3], 0.50, 2),
+    ([1, 2, 3, 4], 0.50, 2),
+    (list(range(1, 101)), 0.95, 95),
+    (list(range(1, 101)), 0.99, 99),
+    (list(range(1, 11)), 0.90, 9),
+    ([7], 0.99, 7),
+    ([1, 2, 3], 0.0, 1),
+])
+def test_percentil_posicao_mais_proxima(valores, fracao, esperado):
+    assert analise._percentil(valores, fracao) == esperado
+
+
+# ---------------------------------------------------------- memória limitada
+
+def test_perfil_guarda_amostra_limitada(monkeypatch):
+    monkeypatch.setattr(analise, "PERFIL_AMOSTRAS_ETAPA", 50)
+    medidor = analise.MedidorEtapas()
+    for i in range(1, 1001):
+        medidor.registrar("etapa", i / 1000)
+
+    assert len(medidor.duracoes["etapa"][3]) == 50
+    etapa = medidor.secao()["etapas"]["etapa"]
+    assert etapa["chamadas"] == 1000
+    assert etapa["total_s"] == 500.5
+    assert etapa["max_ms"] == 1000.0
+
+
+def test_cache_lembra_hashes_limitados(tmp_path, monkeypatch):
+    monkeypatch.setattr(analise, "CACHE_HASHES_MEMORIA", 3)
+    cache = analise.CacheStore(str(tmp_path))
+    for i in range(10):
+        arquivo = tmp_path / f"m{i}.py"
+        arquivo.write_text(f"VALOR = {i}\n")
+        cache.salvar(str(arquivo), "resultado", {"i": i})
+        assert cache.obter(str(arquivo), "resultado") == {"i": i}
+
+    assert len(cache._hashes) == 3
+
+
+# ----------------------------------------------------------------- duplicação
+
+def test_detector_de_clones_acha_trecho_repetido(tmp_path):
+    projeto = criar_projeto(tmp_path / "p")
+    impressoes = {nome: analise.impressoes_duplicacao(str(projeto / nome))
+                  for nome in ("c.py", "d.py", "e.py")}
+
+    duplicacoes = analise.detectar_duplicacoes(impressoes)
+
+    assert set(duplicacoes) == {"c.py", "d.py"}
+    for trechos in duplicacoes.values():
+        assert len(trechos) == 1
+        assert trechos[0]["start"] <= 5 and trechos[0]["end"] >= 12
+
+
+def test_detector_de_clones_ignora_trecho_curto(tmp_path):
+    projeto = criar_projeto(tmp_path / "p", {
+        "x.py": "def f(a):\n    return a + 1\n",
+        "y.py": "def f(a):\n    return a + 1\n",
+    })
+    impressoes = {nome: analise.impressoes_duplicacao(str(projeto / nome))
+                  for nome in ("x.py", "y.py")}
+
+    assert analise.detectar_duplicacoes(impressoes) == {}
+
+
+# ------------------------------------------------------------ ciclos de import
+
+def test_ciclos_imports():
+    grafo = {
+        "a.py": ["b.py"],
+        "b.py": ["c.py"],
+        "c.py": ["a.py", "d.py"],
+        "d.py": [],
+        "e.py": ["f.py"],
+        "f.py": ["e.py"],
+        "g.py": ["g.py"],
+    }
+
+    assert analise.ciclos_imports(grafo) == [["a.py", "b.py", "c.py"], ["e.py", "f.py"]]
+
+
+def test_ciclos_imports_sem_recursao():
+    # Cadeia longa fechada em anel: o Tarjan iterativo não estoura a pilha
+    total = sys.getrecursionlimit() * 2
+    grafo = {f"m{i}.py": [f"m{(i + 1) % total}.py"] for i in range(total)}
+
+    ciclos = analise.ciclos_imports(grafo)
+
+    assert len(ciclos) == 1 and len(ciclos[0]) == total
+
+
+def test_ciclo_no_relatorio(tmp_path):
+    projeto = criar_projeto(tmp_path / "p")
+
+    relatorio = executar(projeto, tmp_path / "cache", tmp_path / "r.json", ".")
+
+    ciclos = relatorio["🕸️_GRAFO_IMPORTS"]["ciclos"]
+    assert ciclos == {"total": 1, "arquivos": [["./a.py", "./b.py"]]}
+
+
+# ---------------------------------------------------------------------- cache
+
+def test_cache_invalida_arquivo_alterado(tmp_path):
+    # Sem flake8/bandit o resultado não depende das ferramentas instaladas
+    projeto = criar_projeto(tmp_path / "p")
+    cache = tmp_path / "cache"
+    pular = ("--pular", "pep8,seguranca")
+
+    antes = executar(projeto, cache, tmp_path / "r1.json", *pular, ".")
+    (projeto / "e.py").write_text(
+        '"""Módulo e, agora com um import sem uso."""\nimport json\n\nVALOR = 1\n',
+        encoding="utf-8")
+    depois = executar(projeto, cache, tmp_path / "r2.json", *pular, ".")
+
+    imports_antes = antes["🔍_ANALISE_DETALHADA"]["imports_nao_usados"]
+    imports_depois = depois["🔍_ANALISE_DETALHADA"]["imports_nao_usados"]
+    assert "./e.py" not in imports_antes
+    assert [item["import"] for item in imports_depois["./e.py"]] == ["json"]
+
+    # Os arquivos intocados vêm do cache com o mesmo resultado
+    cache_resultado = depois["⏱️_PERFIL_EXECUCAO"]["cache"]["resultado"]
+    assert cache_resultado["acertos"] == len(PROJETO) - 1
+    for secao in ("complexidade_alta", "documentacao_fraca", "codigo_duplicado"):
+        intocados = [{arquivo: achados
+                      for arquivo, achados in relatorio["🔍_ANALISE_DETALHADA"][secao].items()
+                      if arquivo != "./e.py"} for relatorio in (antes, depois)]
+        assert intocados[0] == intocados[1], secao
+
+
+def test_ferramenta_ausente_vai_para_o_cache(tmp_path):
+    # PATH vazio: nem flake8 nem bandit; é um estado estável, não uma falha
+    projeto = criar_projeto(tmp_path / "p")
+    cache = tmp_path / "cache"
+    vazio = tmp_path / "vazio"
+    vazio.mkdir()
+
+    primeiro = executar(projeto, cache, tmp_path / "r1.json", ".", path=vazio)
+    segundo = executar(projeto, cache, tmp_path / "r2.json", ".", path=vazio)
+
+    assert "falhas" not in primeiro["⏱️_PERFIL_EXECUCAO"]
+    assert segundo["⏱️_PERFIL_EXECUCAO"]["cache"]["resultado"] == {
+        "acertos": len(PROJETO), "faltas": 0}
+
+
+@pytest.mark.skipif(not TEM_BANDIT, reason="bandit não instalado")
+def test_falha_do_bandit_nao_vai_para_o_cache(tmp_path):
+    projeto = criar_projeto(tmp_path / "p")
+    cache = tmp_path / "cache"
+    falso = tmp_path / "bin"
+    falso.mkdir()
+    bandit = falso / "bandit"
+    bandit.write_text("#!/bin/sh\nexit 2\n", encoding="utf-8")
+    bandit.chmod(0o755)
+
+    falhou = executar(projeto, cache, tmp_path / "r1.json", ".",
+                      path=os.pathsep.join([str(falso), PATH_PADRAO]))
+    assert falhou["⏱️_PERFIL_EXECUCAO"]["falhas"]["seguranca"] == sorted(
+        f"./{nome}" for nome in PROJETO)
+    assert falhou["🔍_ANALISE_DETALHADA"]["problemas_seguranca"] == {}
+
+    # Com o bandit de verdade, os arquivos são reanalisados e o eval aparece
+    refeito = executar(projeto, cache, tmp_path / "r2.json", ".")
+    assert "falhas" not in refeito["⏱️_PERFIL_EXECUCAO"]
+    achados = refeito["🔍_ANALISE_DETALHADA"]["problemas_seguranca"]["./b.py"]
+    assert "B307" in {item["tipo"] for item in achados}
+
+
+# ------------------------------------------------------------- bandit em lote
+
+@pytest.mark.skipif(not TEM_BANDIT, reason="bandit não instalado")
+def test_bandit_em_lote_separa_achados_por_arquivo(tmp_path):
+    projeto = criar_projeto(tmp_path / "p", dict(PROJETO, **{
+        "f.py": '"""Módulo f, também com eval."""\n\nVALOR = eval("1 + 1")\n'}))
+
+    relatorio = executar(projeto, tmp_path / "cache", tmp_path / "r.json",
+                         "--somente", "seguranca", ".")
+
+    # Um único bandit para todos os arquivos; cada achado volta ao seu arquivo
+    perfil = relatorio["⏱️_PERFIL_EXECUCAO"]
+    assert perfil["subprocessos"]["bandit"]["execucoes"] == 1
+    seguranca = relatorio["🔍_ANALISE_DETALHADA"]["problemas_seguranca"]
+    assert sorted(seguranca) == ["./b.py", "./f.py"]
+    assert [item["linha"] for item in seguranca["./f.py"]] == [3]
+
+
+# --------------------------------------------------------------------- shards
+
+def test_mescla_de_shards_igual_a_execucao_completa(tmp_path):
+    projeto = criar_projeto(tmp_path / "p")
+
+    completo = executar(projeto, tmp_path / "cache0", tmp_path / "completo.json", ".")
+    parciais = []
+    for i in (1, 2):
+        saida = tmp_path / f"shard{i}.json"
+        executar(projeto, tmp_path / f"cache{i}", saida, "--shard", f"{i}/2", ".")
+        parciais.append(str(saida))
+    mesclado = executar(projeto, tmp_path / "cache0", tmp_path / "mesclado.json",
+                        "--mesclar", *parciais)
+
+    for secao in ("📈_RANKING_ARQUIVOS_PRO", "🔍_ANALISE_DETALHADA",
+                  "📊_METRICAS_MAINTAINABILITY", "🕸️_GRAFO_IMPORTS"):
+        assert mesclado[secao] == completo[secao], secao
+    estatisticas = [relatorio["🎯_RESUMO_EXECUTIVO_PRO"]["📊_estatisticas_gerais"]
+                    for relatorio in (mesclado, completo)]
+    for chave in ("total_arquivos_analisados", "arquivos_com_problemas"):
+        assert estatisticas[0][chave] == estatisticas[1][chave], chave